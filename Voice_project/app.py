@@ -1,15 +1,29 @@
+import time
+_startup_begin = time.perf_counter()
+import queue
+import threading
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 from threading import Thread
-from config import MODEL_PATH
-from core.asr_transcriber import transcribe_audio
-from core.nlp_parser import generate_response
-from memory.memory_manager import MemoryManager
-from core.task_executor import execute_os_action
-from utils.audio_utils import record_until_silence
-from utils.speech import speak
+from utils.model_registry import registry
+from config import MEMORY_BACKEND, STREAMING_ASR
+# Heavy libraries (torch, transformers, sentence-transformers) are imported by the model loaders,
+# so these imports stay cheap; the timings feed --startup-report
+with registry.timed_import("core.asr_transcriber"):
+    from core.asr_transcriber import transcribe_audio
+    from core.streaming_asr import StreamingTranscriber
+with registry.timed_import("core.nlp_parser"):
+    from core.nlp_parser import generate_response
+with registry.timed_import("memory.memory_manager"):
+    from memory.memory_manager import MemoryManager
+with registry.timed_import("core.task_executor"):
+    from core.task_executor import execute_os_action
+with registry.timed_import("utils.audio_utils"):
+    from utils.audio_utils import record_until_silence
+with registry.timed_import("utils.speech"):
+    from utils.speech import speak, stop_speaking
+from core.turn_worker import TurnWorker, TurnCancelled
 from utils.text_utils import estimate_tokens
-import torch
 import sys
 import os
 import numpy as np
@@ -17,11 +31,17 @@ if sys.platform.startswith('win'):
     os.system('chcp 65001 > nul')
 
 # Initialize memory manager
-memory_manager = MemoryManager()
+with registry.timed_import("MemoryManager()"):
+    memory_manager = MemoryManager(backend=MEMORY_BACKEND)
 
+# Only written on the turn worker thread
 pending_os_action = None
 actions_requiring_confirmation = ["delete_file", "delete_folder", "system_command"]
-is_text_input = False  # Track input mode
+
+# Turns run one at a time off the Tk thread; a newer input cancels the one in flight
+turn_worker = TurnWorker()
+ui_queue = queue.Queue()
+UI_POLL_MS = 30
 
 def safe_print(message):
     try:
@@ -30,8 +50,37 @@ def safe_print(message):
         safe_message = message.encode('ascii', 'ignore').decode('ascii')
         print(safe_message)
 
+def on_ui_thread(fn, *args):
+    """Run a widget update on the Tk thread; worker threads queue it for drain_ui_queue."""
+    if threading.current_thread() is threading.main_thread():
+        fn(*args)
+    else:
+        ui_queue.put((fn, args))
+
+def drain_ui_queue():
+    while True:
+        try:
+            fn, args = ui_queue.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            fn(*args)
+        except Exception as e:
+            safe_print(f"❌ UI update failed: {e}")
+    app.after(UI_POLL_MS, drain_ui_queue)
+
+def set_status(text):
+    on_ui_thread(lambda: status_label.config(text=text))
+
+def show_partial_transcript(text):
+    """What streaming ASR has understood so far, under the status line; empty text clears it."""
+    on_ui_thread(lambda: partial_label.config(text=f"📝 {text}" if text else ""))
+
 def add_to_conversation(sender, message, message_type="normal"):
-    """Add message to conversation display"""
+    """Add message to conversation display (from any thread)"""
+    on_ui_thread(_show_message, sender, message, message_type)
+
+def _show_message(sender, message, message_type):
     conversation_display.config(state=tk.NORMAL)
     
     # Color coding based on sender and type
@@ -53,6 +102,66 @@ def add_to_conversation(sender, message, message_type="normal"):
     conversation_display.config(state=tk.DISABLED)
     conversation_display.see(tk.END)
 
+class StreamedReply:
+    """Shows and speaks an assistant reply sentence by sentence as generate_response streams it."""
+
+    def __init__(self, turn_start, speak_aloud):
+        self.turn_start = turn_start
+        self.speak_aloud = speak_aloud
+        self.started = False
+        self.last_utterance = None
+
+    def on_sentence(self, sentence):
+        on_ui_thread(self._show, sentence, not self.started)
+        self.started = True
+        if self.speak_aloud:
+            self.last_utterance = speak(sentence, wait=False,
+                                        on_start=None if self.last_utterance else self.report_first_audio)
+
+    def _show(self, sentence, first):
+        conversation_display.config(state=tk.NORMAL)
+        if first:
+            conversation_display.insert(tk.END, "🤖 Spark: ", "assistant")
+        conversation_display.insert(tk.END, f"{sentence} ", "message")
+        conversation_display.config(state=tk.DISABLED)
+        conversation_display.see(tk.END)
+
+    def report_first_audio(self):
+        record_first_audio(self.turn_start)
+
+    def _close(self, suffix):
+        conversation_display.config(state=tk.NORMAL)
+        conversation_display.insert(tk.END, f"{suffix}\n\n", "message")
+        conversation_display.config(state=tk.DISABLED)
+
+    def finish(self, cancel_event=None):
+        """Close the message in the display and wait for speech, so the mic does not hear it.
+        Raises TurnCancelled if a newer input arrives while the reply is still being spoken."""
+        if self.started:
+            on_ui_thread(self._close, "")
+        while self.last_utterance and not self.last_utterance.wait(0.1):
+            if cancel_event and cancel_event.is_set():
+                raise TurnCancelled()
+
+    def interrupt(self):
+        """The turn was superseded: mark the partial message and drop its queued sentences."""
+        if self.started:
+            on_ui_thread(self._close, "…")
+        stop_speaking()
+
+first_audio_ms = []
+
+def record_first_audio(turn_start):
+    """Time from the user's input to the start of Spark's spoken reply."""
+    first_audio_ms.append((time.perf_counter() - turn_start) * 1000)
+    median = sorted(first_audio_ms)[len(first_audio_ms) // 2]
+    safe_print(f"⏱️ Time to first audio: {first_audio_ms[-1]:.0f} ms (median {median:.0f} ms over {len(first_audio_ms)} turns)")
+
+def remember_exchange(user_text, reply):
+    """Store the user's message and Spark's reply as two messages, so each keeps its real role."""
+    memory_manager.add_message("user", user_text)
+    memory_manager.add_message("assistant", reply)
+
 def get_confirmation_message(parsed_action):
     action = parsed_action.get("action")
     target = parsed_action.get("target")
@@ -81,7 +190,7 @@ def get_confirmation_message(parsed_action):
     else:
         return f"Do you want to perform the action: {action}?"
 
-def handle_confirmation_response(user_text):
+def handle_confirmation_response(user_text, speak_aloud):
     global pending_os_action
     user_text_lower = user_text.lower().strip()
     positive_responses = ['yes', 'yeah', 'yep', 'sure', 'ok', 'okay', 'go ahead', 'proceed', 'do it']
@@ -93,25 +202,32 @@ def handle_confirmation_response(user_text):
         add_to_conversation("Spark", "Executing action...", "action")
         result = execute_os_action(pending_os_action)
         add_to_conversation("Spark", result, "action")
-        memory_manager.add_message(user_text, "Action executed.")
+        remember_exchange(user_text, "Action executed.")
         pending_os_action = None
         return True
     elif is_negative:
         add_to_conversation("Spark", "Action cancelled.", "normal")
-        if not is_text_input:
+        if speak_aloud:
             speak("Action cancelled. What else can I help you with?")
-        memory_manager.add_message(user_text, "Action cancelled.")
+        remember_exchange(user_text, "Action cancelled.")
         pending_os_action = None
         return True
     else:
         add_to_conversation("Spark", "Please say 'yes' to confirm or 'no' to cancel.", "confirmation")
-        if not is_text_input:
+        if speak_aloud:
             speak("I didn't understand. Please say yes to confirm or no to cancel.")
         return False
 
-def process_user_input(user_text, input_mode="voice"):
-    global pending_os_action, is_text_input
-    is_text_input = (input_mode == "text")
+def process_user_input(user_text, input_mode="voice", turn_start=None, cancel_event=None):
+    """One conversation turn; runs on the turn worker, never on the Tk thread."""
+    global pending_os_action
+    speak_aloud = input_mode != "text"
+    turn_start = turn_start or time.perf_counter()
+    streamed_reply = None
+
+    def check_cancelled():
+        if cancel_event and cancel_event.is_set():
+            raise TurnCancelled()
     
     try:
         # Add user message to conversation
@@ -119,26 +235,29 @@ def process_user_input(user_text, input_mode="voice"):
         
         if len(user_text.strip()) < 3:
             add_to_conversation("Spark", "Your input was too short or unclear. Please try again.", "error")
-            if not is_text_input:
+            if speak_aloud:
                 speak("Your speech was too short or unclear. Please try again.")
             return
         
         if pending_os_action:
-            if handle_confirmation_response(user_text):
+            if handle_confirmation_response(user_text, speak_aloud):
                 return
             else:
                 return
         
         # Update status
-        status_label.config(text="Processing...")
-        app.update()
+        set_status("Processing...")
         
-        parsed = generate_response(user_text, memory_manager)
+        streamed_reply = StreamedReply(turn_start, speak_aloud=speak_aloud)
+        parsed = generate_response(user_text, memory_manager, on_sentence=streamed_reply.on_sentence,
+                                   cancel_event=cancel_event)
+        check_cancelled()  # Superseded while the reply was parsed; do not act on it
+        streamed_reply.finish(cancel_event)
         if not parsed or not isinstance(parsed, dict):
             safe_print("❌ Invalid response from LLM parser")
             safe_print(f"Raw response: {parsed}")
             add_to_conversation("Spark", "Sorry, I couldn't process that request.", "error")
-            if not is_text_input:
+            if speak_aloud:
                 speak("Sorry, I couldn't process that request.")
             return
         
@@ -146,57 +265,59 @@ def process_user_input(user_text, input_mode="voice"):
         message = parsed.get("message", "No response generated.")
         
         if response_type == "assistant":
-            add_to_conversation("Spark", message)
-            if not is_text_input:
-                speak(message)
-            memory_manager.add_message(user_text, message)
+            if not parsed.get("streamed"):
+                add_to_conversation("Spark", message)
+                if speak_aloud:
+                    speak(message, on_start=lambda: record_first_audio(turn_start))
+            remember_exchange(user_text, message)
         
         elif response_type == "os":
             if parsed.get("action") in actions_requiring_confirmation:
                 pending_os_action = parsed
                 confirmation_message = get_confirmation_message(parsed)
                 add_to_conversation("Spark", confirmation_message, "confirmation")
-                if not is_text_input:
+                if speak_aloud:
                     speak(confirmation_message)
                 safe_print(f"Awaiting confirmation for: {parsed}")
             else:
                 result = execute_os_action(parsed)
                 add_to_conversation("Spark", result, "action")
-                memory_manager.add_message(user_text, f"Executed {parsed['action']}")
+                remember_exchange(user_text, f"Executed {parsed['action']}")
         
         elif response_type == "sequence":
             # Speak the overall sequence message
             overall_message = parsed.get("message", "Performing sequence of actions.")
             add_to_conversation("Spark", overall_message, "action")
-            if not is_text_input:
+            if speak_aloud:
                 speak(overall_message)
             
             # Execute each action in the sequence
             for action in parsed["actions"]:
+                check_cancelled()
                 action_message = action.get("message", "Performing action.")
                 add_to_conversation("Spark", action_message, "action")
-                if not is_text_input:
+                if speak_aloud:
                     speak(action_message)
                 result = execute_os_action(action)
                 add_to_conversation("Spark", result, "action")
                 # Check for failure
                 if result.lower().startswith(("error", "failed")):
-                    if not is_text_input:
+                    if speak_aloud:
                         speak(result)
                     break  # Stop sequence on failure
                 else:
-                    if not is_text_input:
+                    if speak_aloud:
                         speak(result)
         
         elif response_type == "code":
             add_to_conversation("Spark", message, "action")
-            if not is_text_input:
+            if speak_aloud:
                 speak(message)
             target_file = parsed.get("target", "generated_code.py")
             code = parsed.get("code", "")
             if not code:
                 add_to_conversation("Spark", "No code was generated", "error")
-                if not is_text_input:
+                if speak_aloud:
                     speak("No code was generated.")
                 return
             try:
@@ -207,40 +328,56 @@ def process_user_input(user_text, input_mode="voice"):
                 success_msg = f"Code written to {target_file}"
                 add_to_conversation("Spark", success_msg, "action")
                 safe_print(success_msg)
-                memory_manager.add_message(user_text, success_msg)
+                remember_exchange(user_text, success_msg)
             except Exception as write_error:
                 error_msg = f"Failed to write code: {write_error}"
                 add_to_conversation("Spark", error_msg, "error")
-                if not is_text_input:
+                if speak_aloud:
                     speak("Failed to write the code.")
                 safe_print(error_msg)
     
+    except TurnCancelled:
+        if streamed_reply:
+            streamed_reply.interrupt()
+        raise
     except Exception as e:
         error_msg = f"An error occurred: {str(e)}"
         safe_print(error_msg)
         add_to_conversation("Spark", "An error occurred while processing your request.", "error")
-        if not is_text_input:
+        if speak_aloud:
             speak("An error occurred while processing your request.")
     finally:
-        status_label.config(text="Ready" if not pending_os_action else "Awaiting confirmation")
+        set_status("Ready" if not pending_os_action else "Awaiting confirmation")
 
 def handle_voice():
+    """Record and transcribe on the recording thread, then hand the turn to the worker."""
+    submitted = False
+    streamer = None
     try:
-        status_label.config(text="Recording...")
-        app.update()
-        audio_path = record_until_silence()
-        if not audio_path:
+        set_status("Recording...")
+        # Segments are transcribed while the user keeps talking; only the last one is left at the end
+        streamer = StreamingTranscriber(transcribe_audio, on_partial=show_partial_transcript) if STREAMING_ASR else None
+        recording = record_until_silence(on_segment=streamer.add_segment if streamer else None)
+        turn_start = time.perf_counter()  # The user has stopped speaking
+        if not recording:
             add_to_conversation("System", "Recording failed. Please check your microphone.", "error")
             speak("Recording failed. Please check your microphone.")
             return
         
-        user_text = transcribe_audio(audio_path)
+        set_status("Transcribing...")
+        audio, fs = recording
+        if streamer and streamer.segments:
+            user_text = streamer.finish()
+        else:
+            user_text = transcribe_audio(audio, fs)
         if not user_text:
             add_to_conversation("System", "Could not understand audio. Please speak more clearly.", "error")
             speak("I couldn't understand what you said. Please try speaking more clearly.")
             return
         
-        process_user_input(user_text, "voice")
+        stop_speaking()  # The new input supersedes whatever the previous turn is still saying
+        turn_worker.submit(process_user_input, user_text, "voice", turn_start)
+        submitted = True
         
     except Exception as e:
         error_msg = f"An error occurred: {str(e)}"
@@ -248,8 +385,12 @@ def handle_voice():
         add_to_conversation("System", "An error occurred while processing your voice input.", "error")
         speak("An error occurred while processing your voice input.")
     finally:
-        record_button.config(state="normal", text="🎙️ Voice Input")
-        status_label.config(text="Ready" if not pending_os_action else "Awaiting confirmation")
+        on_ui_thread(lambda: record_button.config(state="normal", text="🎙️ Voice Input"))
+        if streamer:
+            streamer.cancel()  # Recording failed or nothing was understood: no partials after the label is cleared
+        show_partial_transcript("")
+        if not submitted:
+            set_status("Ready" if not pending_os_action else "Awaiting confirmation")
 
 def handle_text_input(event=None):
     user_text = text_input.get().strip()
@@ -257,7 +398,8 @@ def handle_text_input(event=None):
         return
     
     text_input.delete(0, tk.END)
-    process_user_input(user_text, "text")
+    stop_speaking()  # The new input supersedes whatever the previous turn is still saying
+    turn_worker.submit(process_user_input, user_text, "text", time.perf_counter())
 
 def start_recording():
     global pending_os_action
@@ -273,15 +415,23 @@ def start_recording():
     Thread(target=recording_thread, daemon=True).start()
 
 def cancel_pending_action():
+    """Cancel button: abort the turn in flight and drop any action awaiting confirmation."""
+    interrupted = turn_worker.busy()
+    stop_speaking()
+    turn_worker.submit(clear_pending_action, interrupted)
+
+def clear_pending_action(interrupted, cancel_event=None):
     global pending_os_action
     if pending_os_action:
         pending_os_action = None
         add_to_conversation("System", "Pending action cancelled.", "normal")
         speak("Pending action cancelled. What else can I help you with?")
-        status_label.config(text="Ready")
+    elif interrupted:
+        add_to_conversation("System", "Request cancelled.", "normal")
+    set_status("Ready")
 
 def test_microphone():
-    status_label.config(text="Testing microphone...")
+    set_status("Testing microphone...")
     def test_thread():
         try:
             import sounddevice as sd
@@ -298,14 +448,14 @@ def test_microphone():
             level = np.abs(recording).mean()
             print(f"📊 Microphone test - Audio level: {level:.6f}")
             if level < 0.001:
-                status_label.config(text="⚠️ Microphone seems quiet or not working")
+                set_status("⚠️ Microphone seems quiet or not working")
                 add_to_conversation("System", "Microphone seems quiet or not working", "error")
             else:
-                status_label.config(text="✅ Microphone test successful")
+                set_status("✅ Microphone test successful")
                 add_to_conversation("System", f"Microphone test successful - Audio level: {level:.6f}", "normal")
         except Exception as test_error:
             print(f"❌ Microphone test failed: {test_error}")
-            status_label.config(text="❌ Microphone test failed")
+            set_status("❌ Microphone test failed")
             add_to_conversation("System", f"Microphone test failed: {test_error}", "error")
     Thread(target=test_thread, daemon=True).start()
 
@@ -411,6 +561,10 @@ status_label = tk.Label(bottom_frame, text="Ready", fg="#4CAF50", bg="#1e1e1e",
                        font=("Helvetica", 11, "bold"))
 status_label.pack(pady=(0, 5))
 
+partial_label = tk.Label(bottom_frame, text="", fg="#999", bg="#1e1e1e",
+                        font=("Helvetica", 10, "italic"), wraplength=850)
+partial_label.pack(pady=(0, 5))
+
 instructions_text = "💡 Tips: Use text input for silent operation, voice input for hands-free operation. Confirm OS actions with 'yes' or 'no'"
 instructions_label = tk.Label(bottom_frame, text=instructions_text, fg="#666", bg="#1e1e1e",
                             font=("Helvetica", 9), wraplength=850)
@@ -419,11 +573,26 @@ instructions_label.pack()
 # Initialize conversation
 add_to_conversation("System", "Voice Assistant - Spark initialized. You can use text input or voice input.", "normal")
 
-if __name__ == "__main__":
-    safe_print("🚀 Starting Voice Assistant - Spark")
-    safe_print("Make sure Ollama is running with phi3:3.8b and codellama:13b models")
+def report_cuda():
+    import torch
     if torch.cuda.is_available():
         safe_print(f"✅ CUDA available - using GPU: {torch.cuda.get_device_name()}")
     else:
         safe_print("⚠️ CUDA not available - using CPU")
+
+def start_warmup(startup_report=False):
+    """Load models in the background once the window is up; the first text turn only needs the embedder."""
+    def on_done():
+        report_cuda()
+        if startup_report:
+            safe_print(registry.report())
+    registry.warmup(["tokenizer", "embedder", "tts", "vad", "whisper"], on_done=on_done)
+
+if __name__ == "__main__":
+    startup_report = "--startup-report" in sys.argv[1:]
+    safe_print("🚀 Starting Voice Assistant - Spark")
+    safe_print("Make sure Ollama is running with phi3:3.8b and codellama:13b models")
+    registry.import_timings["window ready"] = time.perf_counter() - _startup_begin
+    app.after(0, start_warmup, startup_report)
+    app.after(UI_POLL_MS, drain_ui_queue)
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""Recall@k vs latency for the vector memory index tiers.
+
+Generates synthetic 384-d data shaped like all-MiniLM-L6-v2 output: unit-norm vectors drawn
+around topic centroids, so neighbours are clustered the way conversation turns are. Ground
+truth comes from the exact index; every approximate configuration is built through
+TieredIndex, the same code path VectorDB promotes with.
+
+    python benchmarks/bench_ann_index.py --size 100000 --k 2 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from memory.tiered_index import TieredIndex
+
+DIM = 384
+
+def minilm_like(rng, count, centroids, spread):
+    """Unit vectors scattered around random topic centroids."""
+    topics = rng.integers(0, len(centroids), size=count)
+    vectors = centroids[topics] + spread * rng.standard_normal((count, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+def recall_at_k(found, truth, k):
+    hits = sum(len(set(f[:k]) & set(t[:k])) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+def time_queries(index, queries, k):
+    """Single-query latency, which is how search_similar calls the index."""
+    results, latencies = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - t0)
+        results.append(ids[0])
+    return np.asarray(results), np.asarray(latencies) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000, help="stored vectors")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--topics", type=int, default=500, help="number of topic centroids")
+    parser.add_argument("--spread", type=float, default=0.1, help="per-dimension noise around a centroid")
+    parser.add_argument("--k", type=int, nargs="+", default=[2, 10])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centroids = rng.standard_normal((args.topics, DIM)).astype(np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    data = minilm_like(rng, args.size, centroids, args.spread)
+    queries = minilm_like(rng, args.queries, centroids, args.spread)
+    max_k = max(args.k)
+
+    exact = TieredIndex(DIM, promote_threshold=args.size + 1)
+    exact.add(data)
+    truth, flat_ms = time_queries(exact, queries, max_k)
+
+    rows = [("flat", "-", 0.0, truth, flat_ms)]
+    for index_type, param_name, values in (("ivf", "nprobe", args.nprobe), ("hnsw", "efSearch", args.ef_search)):
+        tiered = TieredIndex(DIM, promote_threshold=0, index_type=index_type)
+        tiered.add(data)
+        t0 = time.perf_counter()
+        promoted, built_from = tiered.build_promoted()
+        tiered.swap(promoted, built_from)
+        build_s = time.perf_counter() - t0
+        for value in values:
+            if index_type == "ivf":
+                tiered.set_search_params(nprobe=value)
+            else:
+                tiered.set_search_params(ef_search=value)
+            found, ms = time_queries(tiered, queries, max_k)
+            rows.append((index_type, f"{param_name}={value}", build_s, found, ms))
+
+    recall_headers = " ".join(f"{f'R@{k}':>7}" for k in args.k)
+    print(f"{args.size} vectors, {args.queries} queries, dim {DIM}")
+    print(f"{'index':>6} {'param':>13} {'build s':>8} {recall_headers} {'mean ms':>8} {'p99 ms':>8}")
+    for name, param, build_s, found, ms in rows:
+        recalls = " ".join(f"{recall_at_k(found, truth, k):>7.3f}" for k in args.k)
+        print(f"{name:>6} {param:>13} {build_s:>8.2f} {recalls} {ms.mean():>8.3f} {np.percentile(ms, 99):>8.3f}")
+
+if __name__ == "__main__":
+    main()
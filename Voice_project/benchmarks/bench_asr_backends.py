@@ -0,0 +1,108 @@
+"""Real-time factor and WER of each ASR backend and model size on the recorded WAV fixtures.
+
+For every backend/size pair, the model is loaded the way the app loads it (ASRTranscriber,
+including the warmup inference), then each fixture in data/asr/manifest.jsonl is transcribed
+from memory. RTF is processing time over audio duration (below 1 is faster than real time;
+for a voice turn, lower is better), WER is word error rate against the manifest text after
+lower-casing and stripping punctuation. The fixtures are real speech; see data/asr/README.md
+for where they come from and how to add your own recordings.
+
+Models are taken from --models-dir when it has a whisper-<size> (transformers) or
+faster-whisper-<size> (CTranslate2) directory, the layout MODEL_PATH defaults to, and from the
+Hugging Face cache otherwise.
+
+    python benchmarks/bench_asr_backends.py --backends transformers transformers-int8 faster-whisper --sizes tiny base small
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import wave
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import config
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "asr")
+FS = 16000
+SPELLINGS = {"mr": "mister", "mrs": "missus"}  # Whisper abbreviates, the reference transcripts do not
+
+def read_wav(path):
+    """Float32 mono samples from a 16 kHz 16-bit PCM WAV, the format the recorder writes."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2 or f.getframerate() != FS:
+            raise ValueError(f"{path} is {f.getsampwidth() * 8}-bit at {f.getframerate()} Hz, "
+                             f"expected 16-bit PCM at {FS} Hz")
+        channels, frames = f.getnchannels(), f.readframes(f.getnframes())
+    audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768
+    return audio.reshape(-1, channels).mean(axis=1)
+
+def normalize(text):
+    return [SPELLINGS.get(word, word) for word in re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()]
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance (substitutions + insertions + deletions)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+def load_fixtures(data_dir):
+    with open(os.path.join(data_dir, "manifest.jsonl"), 'r', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    missing = [row["file"] for row in rows if not os.path.exists(os.path.join(data_dir, row["file"]))]
+    if missing:
+        sys.exit(f"❌ {len(missing)} fixture(s) listed in the manifest are missing: {', '.join(missing)}")
+    return [(read_wav(os.path.join(data_dir, row["file"])), row["text"]) for row in rows]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["transformers", "transformers-int8", "faster-whisper"])
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "base", "small", "medium"])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--models-dir", default=os.path.join(ROOT, "models"))
+    parser.add_argument("--cpu", action="store_true", help="ignore the GPU even if one is available")
+    parser.add_argument("--compute-type", default=config.ASR_COMPUTE_TYPE, help="for faster-whisper")
+    args = parser.parse_args()
+
+    from core.asr_transcriber import ASRTranscriber, resolve_whisper_model
+    fixtures = load_fixtures(args.data_dir)
+    audio_seconds = sum(len(audio) for audio, _ in fixtures) / FS
+    print(f"{len(fixtures)} fixtures, {audio_seconds:.1f}s of audio")
+
+    rows = []
+    for backend in args.backends:
+        for size in args.sizes:
+            try:
+                start = time.perf_counter()
+                prefix = "faster-whisper" if backend == "faster-whisper" else "whisper"
+                model = resolve_whisper_model(backend, size, path=os.path.join(args.models_dir, f"{prefix}-{size}"))
+                asr = ASRTranscriber(model, backend=backend,
+                                     use_cuda=not args.cpu, compute_type=args.compute_type)
+                load_s = time.perf_counter() - start
+            except Exception as e:
+                print(f"⚠️ Skipping {backend}/{size}: {e}")
+                continue
+            errors = words = 0
+            start = time.perf_counter()
+            for audio, reference in fixtures:
+                hypothesis = asr.transcribe_audio(audio, FS) or ""
+                errors += word_errors(normalize(reference), normalize(hypothesis))
+                words += len(normalize(reference))
+            elapsed = time.perf_counter() - start
+            rows.append((backend, size, load_s, elapsed / audio_seconds, errors / max(words, 1)))
+            del asr
+
+    print(f"\n{'backend':<20}{'size':<8}{'load s':>8}{'RTF':>8}{'WER':>8}")
+    for backend, size, load_s, rtf, wer in rows:
+        print(f"{backend:<20}{size:<8}{load_s:>8.1f}{rtf:>8.3f}{wer:>8.1%}")
+
+if __name__ == "__main__":
+    main()
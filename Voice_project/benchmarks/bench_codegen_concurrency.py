@@ -0,0 +1,76 @@
+"""Wall-clock time of a code-generation turn: sequential calls vs concurrent vs speculative.
+
+The stub server answers every mistral:7b call with a "code" intent and sleeps a configurable
+time per model, standing in for generation. "sequential" replays the old three round-trips
+one after another; the other two rows run the real generate_response, first with only the
+code and summary calls overlapped, then with code generation started before the intent call.
+
+    python benchmarks/bench_codegen_concurrency.py --delay mistral:7b=1.5 --delay phi3:3.8b=0.6
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import config
+from stub_ollama import StubOllamaServer
+
+CODE_REPLY = '{"type": "code", "target": "fib.py", "message": "Writing a Fibonacci script"}'
+PROMPT = "write a python script that prints the first ten fibonacci numbers"
+
+class FixedContextMemory:
+    """Just enough of MemoryManager for generate_response."""
+
+    def get_context_for_llm(self, query):
+        return {"user_profile": {}, "recent_messages": [], "summary": "", "relevant_past": []}
+
+def sequential(client):
+    from core.nlp_parser import _generate_code, _summarize_code_task
+    client.chat_content("mistral:7b", [{"role": "user", "content": PROMPT}])
+    _generate_code(client, PROMPT)
+    _summarize_code_task(client, PROMPT)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", action="append", default=[], help="MODEL=SECONDS per call")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    delays = {"mistral:7b": 1.0, "phi3:3.8b": 0.5}
+    delays.update({model: float(seconds) for model, _, seconds in (d.partition("=") for d in args.delay)})
+
+    server = StubOllamaServer(delays=delays, replies={"mistral:7b": CODE_REPLY}).start()
+    config.OLLAMA_URL = server.url  # Read when the shared client is first created
+    import core.nlp_parser as nlp_parser
+    nlp_parser.INTENT_ROUTER_ENABLED = False
+    nlp_parser.RESPONSE_CACHE_ENABLED = False  # Every run must reach the models
+    client = nlp_parser.get_client()
+    memory = FixedContextMemory()
+
+    def concurrent(speculative):
+        def run(_client):
+            nlp_parser.SPECULATIVE_CODEGEN = speculative
+            result = nlp_parser.generate_response(PROMPT, memory)
+            assert result.get("type") == "code" and result.get("code"), result
+        return run
+
+    modes = (("sequential", sequential), ("concurrent", concurrent(False)), ("speculative", concurrent(True)))
+    rows = []
+    for name, run in modes:
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            run(client)
+            times.append(time.perf_counter() - start)
+        rows.append((name, sum(times) / len(times)))
+
+    print(f"\ndelays: {delays}")
+    print(f"{'mode':<14}{'turn ms':>10}{'saved':>10}")
+    baseline = rows[0][1]
+    for name, seconds in rows:
+        print(f"{name:<14}{seconds * 1000:>10.0f}{(1 - seconds / baseline) * 100:>9.0f}%")
+    server.stop()
+
+if __name__ == "__main__":
+    main()
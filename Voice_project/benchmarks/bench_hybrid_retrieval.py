@@ -0,0 +1,95 @@
+"""Retrieval latency of the hybrid (dense + BM25) memory search.
+
+Builds a synthetic store of N messages with MiniLM-shaped vectors, Zipf-distributed words
+and session/role/timestamp metadata, then times dense-only, BM25-only and fused searches,
+unfiltered and with the prefilters get_context_for_llm can pass.
+
+    python benchmarks/bench_hybrid_retrieval.py --size 100000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from memory.hybrid_retriever import HybridRetriever, LexicalIndex
+from memory.tiered_index import TieredIndex
+
+DIM = 384
+
+def build_store(size, sessions, vocab_size, rng):
+    centroids = rng.standard_normal((200, DIM)).astype(np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    topics = rng.integers(0, len(centroids), size=size)
+    vectors = centroids[topics] + 0.1 * rng.standard_normal((size, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    start = datetime(2025, 1, 1)
+    lexical = LexicalIndex()
+    word_ids = np.minimum(rng.zipf(1.3, size=size * 12), vocab_size) - 1
+    lengths = rng.integers(4, 20, size=size)
+    offset = 0
+    for i in range(size):
+        words = [vocab[w] for w in word_ids[offset:offset + lengths[i]]]
+        offset += lengths[i]
+        lexical.add(" ".join(words), {
+            "session_id": f"session_{i * sessions // size}",
+            "role": "user" if i % 2 == 0 else "assistant",
+            "timestamp": (start + timedelta(minutes=5 * i)).isoformat(),
+        })
+    return vectors, lexical, vocab, start
+
+def timed(fn, queries):
+    latencies = []
+    for query in queries:
+        t0 = time.perf_counter()
+        fn(*query)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return np.asarray(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--vocab", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=2)
+    parser.add_argument("--index-type", choices=["flat", "ivf", "hnsw"], default="flat")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    t0 = time.perf_counter()
+    vectors, lexical, vocab, start = build_store(args.size, args.sessions, args.vocab, rng)
+    index = TieredIndex(DIM, promote_threshold=0 if args.index_type != "flat" else args.size + 1,
+                        index_type=args.index_type if args.index_type != "flat" else "ivf")
+    index.add(vectors)
+    if index.needs_promotion():
+        index.swap(*index.build_promoted())
+    print(f"built {args.size} messages ({args.index_type}) in {time.perf_counter() - t0:.1f}s")
+
+    retriever = HybridRetriever(index, lexical)
+    query_vectors = vectors[rng.integers(0, args.size, size=args.queries)]
+    query_texts = [" ".join(vocab[w] for w in rng.integers(0, 200, size=4)) for _ in range(args.queries)]
+    last_week = (start + timedelta(minutes=5 * args.size) - timedelta(days=7)).isoformat()
+    sessions = [f"session_{s}" for s in rng.integers(0, args.sessions, size=args.queries)]
+    queries = list(zip(query_texts, query_vectors, sessions))
+
+    cases = [
+        ("dense only", lambda q, v, s: index.search(v[None, :], args.k)),
+        ("bm25 only", lambda q, v, s: lexical.search(q, args.k)),
+        ("hybrid", lambda q, v, s: retriever.search(q, v, args.k)),
+        ("hybrid + session", lambda q, v, s: retriever.search(q, v, args.k, session_id=s)),
+        ("hybrid + last week", lambda q, v, s: retriever.search(q, v, args.k, since=last_week)),
+        ("hybrid + role", lambda q, v, s: retriever.search(q, v, args.k, role="user")),
+    ]
+    print(f"{'search':>20} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, fn in cases:
+        ms = timed(fn, queries)
+        print(f"{name:>20} {ms.mean():>9.3f} {np.percentile(ms, 50):>9.3f} {np.percentile(ms, 99):>9.3f}")
+
+if __name__ == "__main__":
+    main()
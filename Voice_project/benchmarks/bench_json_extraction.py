@@ -0,0 +1,87 @@
+"""JSON extraction from model output: the old regex fallbacks vs the single-pass brace scanner.
+
+The corpus mixes replies shaped like real mistral/phi3 output (fenced JSON, prose around it,
+nested sequences, trailing commas, single quotes, truncated streams) with adversarial text:
+long chatty replies full of unmatched braces, many small brace pairs that are not JSON, and
+deep nesting. "legacy" is the regex strategy extract_json_from_text used before; "scanner"
+is find_json_object, which replaced it. Both report how many inputs produced an object with
+a "type"; the keyword fallbacks that run after either are left out.
+
+    python benchmarks/bench_json_extraction.py --size 20000
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.helpers import find_json_object
+
+def legacy_extract(text):
+    """Strategies 1 and 2 of the previous implementation."""
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    for pattern in [r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', r'\{.*?\}']:
+        for match in re.findall(pattern, text, re.DOTALL):
+            try:
+                parsed = json.loads(match.strip())
+                if isinstance(parsed, dict):
+                    return parsed
+            except json.JSONDecodeError:
+                continue
+    return None
+
+REAL = [
+    '{"type": "assistant", "message": "Hello! How can I help you today?"}',
+    'Sure! Here is the JSON:\n```json\n{"type": "os", "action": "open_website", "url": "youtube.com", "message": "Opening YouTube"}\n```',
+    '{"type": "sequence", "message": "Setting up", "actions": [{"type": "os", "action": "create_folder", "target": "backup", '
+    '"message": "Creating backup"}, {"type": "os", "action": "copy_file", "source": "a.txt", "destination": "backup/a.txt", '
+    '"message": "Copying"}]}',
+    "{'type': 'assistant', 'message': 'Single quotes everywhere'}",
+    '{"type": "os", "action": "search_platform", "platform": "amazon", "query": "laptops", "message": "Searching",}',
+    '{"type": "assistant", "message": "Use a dict like {\\"a\\": 1} in Python"}',
+    '{"type": "code", "target": "fib.py", "message": "Writing code"} I hope this helps {smile}',
+    '{"type": "assistant", "message": "This reply was cut off by the token lim',
+    '{type: "os", action: "open_application", app_name: "chrome", message: "Opening Chrome"}',
+    '{"type": "assistant", "message": "Done", "confident": True}',
+]
+
+def adversarial(size):
+    return {
+        "unmatched braces": "I think { you mean { something like { this " * (size // 40) + REAL[0],
+        "never closed": "let me think { " * (size // 15),
+        "brace pairs in prose": "use {x} or {y} here, " * (size // 20) + REAL[1],
+        "deep nesting": "{" * (size // 10) + '"type": "x"' + "}" * (size // 10 - 1),
+        "long message": '{"type": "assistant", "message": "' + "word " * (size // 5) + '"}',
+        "long truncated": '{"type": "assistant", "message": "' + "word " * (size // 5),
+    }
+
+def run(extract, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [extract(t) for t in texts]
+    elapsed = (time.perf_counter() - start) / repeat
+    found = sum(isinstance(r, dict) and "type" in r for r in results)
+    return elapsed, found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000, help="approximate characters per adversarial input")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = {"real outputs": REAL, **{name: [text] for name, text in adversarial(args.size).items()}}
+    print(f"{'case':<22}{'legacy ms':>12}{'found':>7}{'scanner ms':>12}{'found':>7}")
+    for name, texts in cases.items():
+        legacy_s, legacy_found = run(legacy_extract, texts, args.repeat)
+        scanner_s, scanner_found = run(find_json_object, texts, args.repeat)
+        print(f"{name:<22}{legacy_s * 1000:>12.2f}{legacy_found:>4}/{len(texts):<2}"
+              f"{scanner_s * 1000:>12.2f}{scanner_found:>4}/{len(texts):<2}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Turn latency with every turn on mistral:7b vs routing between phi3:3.8b and mistral:7b.
+
+Runs generate_response over a mixed prompt set (the short commands of the intent eval set plus
+longer reasoning and multi-step requests) against the stub server, with the intent router and
+response cache off so every turn reaches a model. The stub's phi3 answers a configurable share
+of prompts with prose instead of JSON, which the router must catch and escalate.
+
+    python benchmarks/bench_model_tiering.py --delay mistral:7b=1.2 --delay phi3:3.8b=0.4 --small-failure-rate 0.1
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import config
+from stub_ollama import StubOllamaServer
+
+EVAL_SET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intent_eval.jsonl")
+COMPLEX = [
+    "explain how the memory summarizer decides when to compress the conversation",
+    "compare python and javascript for writing small desktop automation tools",
+    "create a folder called reports and then copy notes.txt into it and after that open it",
+    "why does my laptop get slower the longer it runs without a restart",
+    "summarize what we talked about yesterday regarding the project deadline",
+    "plan a three day study schedule for my algorithms exam next week",
+]
+GOOD_REPLY = '{"type": "assistant", "message": "Done."}'
+BAD_REPLY = "Sure! I would open that for you, but I am not sure which one you mean."
+
+class FixedContextMemory:
+    """Just enough of MemoryManager for generate_response."""
+
+    def get_context_for_llm(self, query):
+        return {"user_profile": {}, "recent_messages": [], "summary": "", "relevant_past": []}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", action="append", default=[], help="MODEL=SECONDS per call")
+    parser.add_argument("--small-failure-rate", type=float, default=0.1, help="share of phi3 replies that are not JSON")
+    parser.add_argument("--target-ms", type=float, default=config.MODEL_TARGET_LATENCY_MS)
+    args = parser.parse_args()
+    delays = {"mistral:7b": 1.2, "phi3:3.8b": 0.4}
+    delays.update({model: float(seconds) for model, _, seconds in (d.partition("=") for d in args.delay)})
+
+    def small_reply(payload):
+        # Deterministic per prompt so both modes see the same failures
+        prompt = payload["messages"][-1]["content"]
+        return BAD_REPLY if zlib.crc32(prompt.encode()) % 1000 < args.small_failure_rate * 1000 else GOOD_REPLY
+
+    server = StubOllamaServer(delays=delays, replies={"mistral:7b": GOOD_REPLY, "phi3:3.8b": small_reply}).start()
+    config.OLLAMA_URL = server.url  # Read when the shared client is first created
+    import core.nlp_parser as nlp_parser
+    from core.model_router import ModelRouter
+    nlp_parser.INTENT_ROUTER_ENABLED = False
+    nlp_parser.RESPONSE_CACHE_ENABLED = False
+    nlp_parser.SPECULATIVE_CODEGEN = False
+
+    with open(EVAL_SET, 'r', encoding='utf-8') as f:
+        prompts = [json.loads(line)["text"] for line in f if line.strip()] + COMPLEX
+    memory = FixedContextMemory()
+
+    rows = []
+    for name, tiering in (("mistral only", False), ("tiered", True)):
+        nlp_parser.MODEL_TIERING = tiering
+        nlp_parser._model_router = ModelRouter(nlp_parser.get_client(), config.SMALL_MODEL, config.LARGE_MODEL,
+                                               target_latency_ms=args.target_ms)
+        times = []
+        for prompt in prompts:
+            start = time.perf_counter()
+            nlp_parser.generate_response(prompt, memory)
+            times.append((time.perf_counter() - start) * 1000)
+        rows.append((name, times, nlp_parser._model_router.stats()))
+
+    print(f"\ndelays: {delays}, {len(prompts)} prompts, small failure rate {args.small_failure_rate:.0%}")
+    print(f"{'mode':<14}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'small':>7}{'large':>7}{'escalated':>11}")
+    for name, times, stats in rows:
+        p95 = sorted(times)[int(0.95 * (len(times) - 1))]
+        print(f"{name:<14}{statistics.mean(times):>9.0f}{statistics.median(times):>9.0f}{p95:>9.0f}"
+              f"{stats['small_turns']:>7}{stats['large_turns'] if name == 'tiered' else len(times):>7}"
+              f"{stats['escalations']:>5} ({stats['escalation_rate']:.0%})")
+    print(f"per-model latency: {rows[-1][2]['latency_ms']}")
+    server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Per-call overhead of bare requests.post vs the shared pooled OllamaClient.
+
+Runs against the in-process stub server, so the numbers are pure client and connection cost
+with no model time. Also checks that a server failing its first requests is retried.
+
+    python benchmarks/bench_ollama_client.py --calls 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from core.ollama_client import OllamaClient
+from stub_ollama import StubOllamaServer
+
+MESSAGES = [{"role": "system", "content": "You are Spark."}, {"role": "user", "content": "hello"}]
+
+def time_calls(call, count):
+    latencies = []
+    for _ in range(count):
+        t0 = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300)
+    args = parser.parse_args()
+
+    server = StubOllamaServer().start()
+    url = f"{server.url}/api/chat"
+    client = OllamaClient(server.url)
+
+    def bare():
+        requests.post(url, json={"model": "mistral:7b", "messages": MESSAGES, "stream": False}, timeout=30).json()
+
+    def pooled():
+        client.chat("mistral:7b", MESSAGES)
+
+    print(f"{'client':<16}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, call in (("requests.post", bare), ("OllamaClient", pooled)):
+        call()
+        p50, p95 = time_calls(call, args.calls)
+        print(f"{name:<16}{p50:>10.2f}{p95:>10.2f}")
+
+    server.fail_remaining = 2
+    retry_client = OllamaClient(server.url, max_retries=2, backoff_base=0.01)
+    retry_client.chat("mistral:7b", MESSAGES)
+    print(f"retries after 2 injected 503s: {retry_client.stats()['mistral:7b']['retries']}")
+    server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Prompt tokens Ollama must evaluate per turn: volatile-first layout vs the prefix-stable one.
+
+Replays a synthetic conversation through the stub server, which reports prompt_eval_count
+for only the part of each prompt that differs from the previous one, the way Ollama reuses
+its KV cache for a shared prefix. "legacy" is the old SYSTEM_PROMPT order (summary, history,
+memory hits, the query and the directory listing ahead of the instructions); "stable" is
+build_system_prompt, which puts the instructions first and the sections by volatility.
+
+    python benchmarks/bench_prompt_prefix.py --turns 20
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from core.ollama_client import OllamaClient
+from stub_ollama import StubOllamaServer
+from utils.prompt_templates import INSTRUCTIONS, build_system_prompt
+
+LEGACY_HEADER = """You are Spark, a voice assistant.
+User summary: {summary}
+Recent history: {recent}
+Relevant memory: {relevant_past}
+User said: {query}
+{os_context}
+"""
+
+def legacy_prompt(query, sections):
+    return LEGACY_HEADER.format(query=query, **sections) + INSTRUCTIONS.split("\n", 1)[1]
+
+TOPICS = ["the weather in Lisbon", "a python sorting bug", "my sister's birthday", "train times to Porto",
+          "the memory usage of faiss", "a pasta recipe", "jazz playlists", "the Q3 budget spreadsheet"]
+
+def conversation(turns, seed=0):
+    """Per-turn sections shaped like what MemoryManager returns."""
+    rng = random.Random(seed)
+    history, summary = [], "No summary available"
+    os_context = "Current working directory is: C:\\Users\\me\\Voice_project\nFolders: ['core', 'memory', 'utils']\nFiles: ['app.py', 'config.py']"
+    for turn in range(turns):
+        query = f"Tell me more about {rng.choice(TOPICS)}, point {turn}"
+        if turn and turn % 8 == 0:
+            summary = f"The user asked about {', '.join(rng.sample(TOPICS, 3))} (checkpoint {turn // 8})."
+        yield query, {
+            "user_profile": '{"name": "Sam", "city": "Porto"}',
+            "summary": summary,
+            "os_context": os_context,
+            "recent": "\n".join(history[-6:]) or "No recent messages",
+            "relevant_past": "\n".join(rng.sample(history, min(2, len(history)))) or "No relevant past messages",
+        }
+        history += [f"user: {query}", f"assistant: Here is what I know about that topic, turn {turn}."]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=16)
+    args = parser.parse_args()
+
+    server = StubOllamaServer().start()
+    client = OllamaClient(server.url)
+    layouts = {
+        "legacy": lambda query, sections: [{"role": "system", "content": legacy_prompt(query, sections)}],
+        "stable": lambda query, sections: [{"role": "system", "content": build_system_prompt(sections)},
+                                           {"role": "user", "content": query}],
+    }
+    results = {}
+    for name, build in layouts.items():
+        evaluated, total = [], []
+        for query, sections in conversation(args.turns):
+            messages = build(query, sections)
+            data = client.chat(f"bench-{name}", messages)  # Separate model name, separate cache in the stub
+            evaluated.append(data["prompt_eval_count"])
+            total.append(sum(len(m["content"]) for m in messages) // 4)
+        results[name] = (evaluated, total)
+
+    print(f"{'turn':>4}" + "".join(f"{name + ' eval/total':>22}" for name in results))
+    for turn in range(args.turns):
+        print(f"{turn:>4}" + "".join(f"{f'{ev[turn]}/{tot[turn]}':>22}" for ev, tot in results.values()))
+    for name, (evaluated, total) in results.items():
+        later = slice(1, None)  # The first turn is a cold cache for both
+        reused = 1 - sum(evaluated[later]) / sum(total[later])
+        print(f"{name:<8} mean prompt eval after turn 0: {sum(evaluated[later]) / (args.turns - 1):7.0f} tokens "
+              f"({reused:.0%} of the prompt reused)")
+    server.stop()
+
+if __name__ == "__main__":
+    main()
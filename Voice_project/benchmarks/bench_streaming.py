@@ -0,0 +1,68 @@
+"""Time to the first speakable sentence: streamed parsing vs waiting for the whole reply.
+
+The stub server streams a canned assistant reply in 4-character chunks with a fixed delay
+between them, roughly like a 7B model on CPU. The streamed path feeds chunks through
+StreamingResponseParser, the same one generate_response uses; the blocking path waits for
+the complete body, as every call did before streaming.
+
+    python benchmarks/bench_streaming.py --token-delay 0.02 --runs 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from core.ollama_client import OllamaClient
+from core.stream_parser import StreamingResponseParser
+from stub_ollama import StubOllamaServer
+
+REPLY = json.dumps({
+    "type": "assistant",
+    "message": "Sure, here is a quick overview of how the memory system works. Every message is stored in "
+               "the session log and embedded into the vector index. When you ask something, the most "
+               "relevant past messages are retrieved and packed into the prompt with a rolling summary. "
+               "That way I can remember what we talked about without resending the whole history."
+})
+MESSAGES = [{"role": "user", "content": "How does your memory work?"}]
+
+def streamed(client):
+    start = time.perf_counter()
+    parser, first = StreamingResponseParser(), None
+    for chunk in client.chat_stream("mistral:7b", MESSAGES):
+        if parser.feed(chunk.get("message", {}).get("content", "")) and first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+def blocking(client):
+    start = time.perf_counter()
+    client.chat("mistral:7b", MESSAGES)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds of generation per 4-character chunk")
+    parser.add_argument("--prefill", type=float, default=0.3, help="seconds before the first chunk")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    server = StubOllamaServer(delays={"mistral:7b": args.prefill}, replies={"mistral:7b": REPLY},
+                              token_delay=args.token_delay).start()
+    client = OllamaClient(server.url)
+
+    print(f"{'mode':<12}{'first sentence ms':>20}{'complete ms':>14}")
+    for name, run in (("streamed", streamed), ("blocking", blocking)):
+        firsts, totals = [], []
+        for _ in range(args.runs):
+            first, total = run(client)
+            firsts.append(first * 1000)
+            totals.append(total * 1000)
+        print(f"{name:<12}{sum(firsts) / len(firsts):>20.0f}{sum(totals) / len(totals):>14.0f}")
+    print(f"client first-token p50: {client.stats()['mistral:7b']['p50_first_token_ms']:.0f} ms")
+    server.stop()
+
+if __name__ == "__main__":
+    main()
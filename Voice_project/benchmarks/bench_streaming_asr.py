@@ -0,0 +1,69 @@
+"""Time from end of recording to final transcript: transcribe after recording vs streaming segments.
+
+Synthetic utterances (voiced stretches with pauses, then trailing silence) are fed to the
+StreamingEndpointer in 100 ms chunks at real-time pace, divided by --speed. "batch" waits for
+recording to stop and then transcribes everything, as before. "streaming" hands each
+pause-delimited segment to StreamingTranscriber as it closes, so at the stop only what is
+still in flight remains. --asr fake stands in for Whisper with a sleep of --rtf seconds per
+second of audio; --asr whisper uses the configured model (needs transformers and torch).
+
+    python benchmarks/bench_streaming_asr.py --durations 5 10 20 --rtf 0.3 --speed 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_vad import CHUNK, FS, energy_prob, synth_utterance
+from core.streaming_asr import StreamingTranscriber
+from utils.vad import StreamingEndpointer
+
+def record(audio, speed, on_segment=None):
+    """Feed the utterance at (sped-up) real time until the endpointer stops; returns the recording."""
+    endpointer = StreamingEndpointer(energy_prob, fs=FS, max_duration=len(audio) / FS + 1, on_segment=on_segment)
+    for offset in range(0, len(audio), CHUNK):
+        time.sleep(CHUNK / FS / speed)
+        if endpointer.feed(audio[offset:offset + CHUNK]):
+            break
+    endpointer.close()
+    return endpointer.audio()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--asr", choices=["fake", "whisper"], default="fake")
+    parser.add_argument("--rtf", type=float, default=0.3, help="fake ASR seconds per second of audio")
+    parser.add_argument("--speed", type=float, default=4.0, help="play audio and fake ASR this much faster")
+    args = parser.parse_args()
+
+    if args.asr == "whisper":
+        from core.asr_transcriber import transcribe_audio
+        speed = 1.0  # Real inference cannot be sped up
+    else:
+        speed = args.speed
+
+        def transcribe_audio(audio, sampling_rate):
+            time.sleep(len(audio) / sampling_rate * args.rtf / speed)
+            return f"words for {len(audio) / sampling_rate:.1f}s"
+
+    print(f"asr: {args.asr}, speed x{speed:g} (latencies scaled back to real time)")
+    print(f"{'audio s':>8}{'batch ms':>10}{'streaming ms':>14}{'segments':>10}")
+    for duration in args.durations:
+        audio = synth_utterance(duration)
+
+        recording = record(audio, speed)
+        start = time.perf_counter()
+        transcribe_audio(recording, FS)
+        batch = (time.perf_counter() - start) * speed
+
+        streamer = StreamingTranscriber(transcribe_audio, FS)
+        record(audio, speed, on_segment=streamer.add_segment)
+        start = time.perf_counter()
+        streamer.finish()
+        streaming = (time.perf_counter() - start) * speed
+        print(f"{duration:>8.0f}{batch * 1000:>10.0f}{streaming * 1000:>14.0f}{streamer.segments:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""How long a newer input waits behind a slow turn: queued behind it vs cancelling it.
+
+The stub server streams a long mistral reply slowly enough that one turn takes several
+seconds. A first prompt is submitted to the TurnWorker, and a second one arrives while the
+first is mid-stream. Without cancellation the second turn waits for the first to finish, as
+it did when turns ran back to back on the Tk thread; with it, the first stream is closed at
+the next chunk and the second starts right away.
+
+    python benchmarks/bench_turn_cancellation.py --token-delay 0.05 --interrupt-after 1.0
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import config
+from stub_ollama import StubOllamaServer
+
+LONG_REPLY = json.dumps({"type": "assistant", "message": "This is a long, slowly generated answer. " * 8})
+SHORT_REPLY = json.dumps({"type": "assistant", "message": "It is noon."})
+
+class FixedContextMemory:
+    """Just enough of MemoryManager for generate_response."""
+
+    def get_context_for_llm(self, query):
+        return {"user_profile": {}, "recent_messages": [], "summary": "", "relevant_past": []}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--token-delay", type=float, default=0.05, help="seconds per 4-character chunk")
+    parser.add_argument("--interrupt-after", type=float, default=1.0, help="seconds before the second input")
+    args = parser.parse_args()
+
+    def reply(payload):
+        return LONG_REPLY if "story" in payload["messages"][-1]["content"] else SHORT_REPLY
+
+    server = StubOllamaServer(replies={"mistral:7b": reply}, token_delay=args.token_delay).start()
+    config.OLLAMA_URL = server.url  # Read when the shared client is first created
+    import core.nlp_parser as nlp_parser
+    from core.turn_worker import TurnWorker
+    nlp_parser.INTENT_ROUTER_ENABLED = False
+    nlp_parser.RESPONSE_CACHE_ENABLED = False
+    nlp_parser.MODEL_TIERING = False
+    memory = FixedContextMemory()
+
+    def turn(prompt, done, cancel_event=None):
+        nlp_parser.generate_response(prompt, memory, cancel_event=cancel_event if cancelling else None)
+        done.set()
+
+    print(f"{'mode':<14}{'second turn done after ms':>28}")
+    for cancelling in (False, True):
+        worker = TurnWorker(name="bench")
+        first_done, second_done = threading.Event(), threading.Event()
+        worker.submit(turn, "tell me a long story", first_done)
+        time.sleep(args.interrupt_after)
+        start = time.perf_counter()
+        worker.submit(turn, "what time is it", second_done, supersede=cancelling)
+        second_done.wait()
+        print(f"{'cancelling' if cancelling else 'queued':<14}{(time.perf_counter() - start) * 1000:>28.0f}")
+    server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""CPU time per second of audio: re-scanning the whole recording vs the streaming endpointer.
+
+Feeds synthetic utterances (voiced tones with pauses, then trailing silence) in 100 ms chunks,
+the way sounddevice delivers them. "rescan" is what record_until_silence did before: on every
+chunk, concatenate everything so far and run the VAD over all of it. "streaming" is
+StreamingEndpointer, which scores each 512-sample window once. Both report the CPU seconds
+spent per second of audio and where they decided the utterance ended.
+
+--vad silero uses the real model (needs torch and the silero hub download); --vad energy uses
+an RMS score with the same per-window call, which shows the scaling without torch.
+
+    python benchmarks/bench_vad.py --vad silero --durations 5 10 20 30
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.vad import VAD_WINDOW, StreamingEndpointer, silero_speech_prob
+
+FS = 16000
+CHUNK = FS // 10
+
+def synth_utterance(seconds, trailing_silence=2.5, seed=0):
+    """Voiced segments of 0.4-1.2 s separated by short pauses (and now and then a phrase break), then silence."""
+    rng = np.random.default_rng(seed)
+    speech_samples = int((seconds - trailing_silence) * FS)
+    audio = rng.normal(0, 0.002, int(seconds * FS)).astype(np.float32)
+    pos = 0
+    while pos < speech_samples:
+        length = min(int(rng.uniform(0.4, 1.2) * FS), speech_samples - pos)
+        t = np.arange(length) / FS
+        pitch = rng.uniform(110, 250)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        audio[pos:pos + length] += (0.2 * voiced * np.hanning(length)).astype(np.float32)
+        pause = rng.uniform(0.6, 0.9) if rng.random() < 0.25 else rng.uniform(0.05, 0.25)
+        pos += length + int(pause * FS)
+    return audio
+
+def energy_prob(window):
+    return min(1.0, float(np.sqrt(np.mean(window ** 2))) / 0.05)
+
+def legacy_timestamps(prob_fn):
+    """A whole-buffer pass in the shape of get_speech_timestamps: score every window, then segment."""
+    def get_speech_timestamps(audio, min_silence_samples=FS // 2):
+        segments, start, silence = [], None, 0
+        for i in range(0, len(audio) - VAD_WINDOW + 1, VAD_WINDOW):
+            if prob_fn(audio[i:i + VAD_WINDOW]) >= 0.5:
+                start = i if start is None else start
+                silence = 0
+            elif start is not None:
+                silence += VAD_WINDOW
+                if silence >= min_silence_samples:
+                    segments.append({"start": start, "end": i + VAD_WINDOW - silence})
+                    start, silence = None, 0
+        if start is not None:
+            segments.append({"start": start, "end": len(audio)})
+        return segments
+    return get_speech_timestamps
+
+def run_rescan(audio, timestamps_fn, max_silence_time=2.0):
+    chunks = []
+    for offset in range(0, len(audio), CHUNK):
+        chunks.append(audio[offset:offset + CHUNK])
+        if len(chunks) > 10:
+            buffer = np.concatenate(chunks)
+            timestamps = timestamps_fn(buffer)
+            if timestamps and (len(buffer) - timestamps[-1]["end"]) / FS > max_silence_time:
+                return offset + CHUNK
+    return len(audio)
+
+def run_streaming(audio, prob_fn, duration):
+    endpointer = StreamingEndpointer(prob_fn, fs=FS, max_duration=duration + 1)
+    for offset in range(0, len(audio), CHUNK):
+        if endpointer.feed(audio[offset:offset + CHUNK]):
+            return offset + CHUNK
+    return len(audio)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vad", choices=["silero", "energy"], default="silero")
+    parser.add_argument("--durations", type=float, nargs="+", default=[5, 10, 20, 30])
+    args = parser.parse_args()
+
+    if args.vad == "silero":
+        import torch
+        model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False)
+        get_speech_timestamps = utils[0]
+        make_prob = lambda: silero_speech_prob(model, FS)
+        timestamps_fn = lambda audio: get_speech_timestamps(torch.from_numpy(audio), model, sampling_rate=FS,
+                                                            min_speech_duration_ms=100, min_silence_duration_ms=500)
+    else:
+        make_prob = lambda: energy_prob
+        timestamps_fn = legacy_timestamps(energy_prob)
+
+    print(f"vad: {args.vad}")
+    print(f"{'audio s':>8}{'rescan cpu/s':>14}{'stop s':>8}{'streaming cpu/s':>17}{'stop s':>8}{'speedup':>9}")
+    for duration in args.durations:
+        audio = synth_utterance(duration)
+        start = time.process_time()
+        rescan_stop = run_rescan(audio, timestamps_fn)
+        rescan_cpu = time.process_time() - start
+        start = time.process_time()
+        stream_stop = run_streaming(audio, make_prob(), duration)
+        stream_cpu = time.process_time() - start
+        print(f"{duration:>8.0f}{rescan_cpu / duration:>14.4f}{rescan_stop / FS:>8.1f}"
+              f"{stream_cpu / duration:>17.4f}{stream_stop / FS:>8.1f}{rescan_cpu / max(stream_cpu, 1e-9):>8.0f}x")
+
+if __name__ == "__main__":
+    main()
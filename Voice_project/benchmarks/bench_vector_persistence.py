@@ -0,0 +1,91 @@
+"""Per-insert persistence cost of the vector memory as the corpus grows.
+
+Pre-fills a fresh SegmentStore with N messages, then times single-message appends
+(what one conversation turn costs). Optionally compares against the old layout, which
+rewrote index.faiss and texts.json on every message.
+
+    python benchmarks/bench_vector_persistence.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from memory.segment_store import SegmentStore
+
+DIM = 384
+PREFILL_CHUNK = 10000
+
+def make_records(start, count):
+    return [{"text": f"message {i}", "metadata": {"session_id": "bench", "message_id": i}} for i in range(start, start + count)]
+
+def percentile(values, p):
+    return float(np.percentile(np.asarray(values), p))
+
+def bench_segments(size, inserts, fsync, rng):
+    workdir = tempfile.mkdtemp(prefix="bench_segments_")
+    try:
+        store = SegmentStore(workdir, dim=DIM, fsync=fsync)
+        store.load()
+        for start in range(0, size, PREFILL_CHUNK):
+            count = min(PREFILL_CHUNK, size - start)
+            store.append(rng.standard_normal((count, DIM), dtype=np.float32), make_records(start, count))
+        timings = []
+        for i in range(inserts):
+            vector = rng.standard_normal((1, DIM), dtype=np.float32)
+            t0 = time.perf_counter()
+            store.append(vector, make_records(size + i, 1))
+            timings.append(time.perf_counter() - t0)
+        store.close()
+        return timings
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def bench_legacy(size, inserts, rng):
+    workdir = tempfile.mkdtemp(prefix="bench_legacy_")
+    try:
+        index = faiss.IndexFlatL2(DIM)
+        index.add(rng.standard_normal((size, DIM), dtype=np.float32))
+        texts = make_records(0, size)
+        timings = []
+        for i in range(inserts):
+            vector = rng.standard_normal((1, DIM), dtype=np.float32)
+            t0 = time.perf_counter()
+            index.add(vector)
+            texts.extend(make_records(size + i, 1))
+            faiss.write_index(index, os.path.join(workdir, "index.faiss"))
+            with open(os.path.join(workdir, "texts.json"), 'w', encoding='utf-8') as f:
+                json.dump(texts, f)
+            timings.append(time.perf_counter() - t0)
+        return timings
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--inserts", type=int, default=200, help="timed single-message inserts per size")
+    parser.add_argument("--no-fsync", action="store_true", help="skip fsync on append")
+    parser.add_argument("--legacy-max", type=int, default=100000,
+                        help="also time the old full-rewrite path for sizes up to this (0 to skip)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'stored':>10} {'layout':>9} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for size in args.sizes:
+        rows = [("segments", bench_segments(size, args.inserts, not args.no_fsync, rng))]
+        if size <= args.legacy_max:
+            rows.append(("rewrite", bench_legacy(size, min(args.inserts, 20), rng)))
+        for layout, timings in rows:
+            ms = [t * 1000 for t in timings]
+            print(f"{size:>10} {layout:>9} {np.mean(ms):>9.3f} {percentile(ms, 50):>9.3f} {percentile(ms, 99):>9.3f}")
+
+if __name__ == "__main__":
+    main()
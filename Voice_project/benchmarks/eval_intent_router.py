@@ -0,0 +1,72 @@
+"""Precision, coverage and latency of the local intent router on a labeled set.
+
+Each line of the eval file is {"text": ..., "expected": {...} or null}; null means the
+utterance must go to the LLM. A routed utterance counts as correct only if its action and
+every expected argument match. Precision is what matters most: a wrong local dispatch is
+worse than a slower LLM round-trip.
+
+    python benchmarks/eval_intent_router.py --threshold 0.55
+    python benchmarks/eval_intent_router.py --patterns-only
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.intent_router import IntentRouter
+
+DEFAULT_SET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intent_eval.jsonl")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval-set", default=DEFAULT_SET)
+    parser.add_argument("--threshold", type=float, default=0.55)
+    parser.add_argument("--patterns-only", action="store_true", help="skip the embedding classifier")
+    parser.add_argument("--verbose", action="store_true", help="print every routing decision")
+    args = parser.parse_args()
+
+    embed_fn = None
+    if not args.patterns_only:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer("all-MiniLM-L6-v2")
+        embed_fn = lambda texts: model.encode(texts, convert_to_numpy=True)
+    router = IntentRouter(embed_fn=embed_fn, threshold=args.threshold)
+    if embed_fn:
+        router.route("open youtube")  # Embed the examples outside the timed loop
+
+    with open(args.eval_set, 'r', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    routed = correct = routable = routable_hit = 0
+    latencies, mistakes = [], []
+    for row in rows:
+        intent = router.route(row["text"])
+        latencies.append(router.last_latency_ms)
+        expected = row["expected"]
+        if expected:
+            routable += 1
+        if intent is None:
+            if args.verbose:
+                print(f"  LLM     {row['text']!r}")
+            continue
+        routed += 1
+        ok = expected is not None and all(intent.get(k) == v for k, v in expected.items())
+        correct += ok
+        routable_hit += ok
+        if not ok:
+            mistakes.append((row["text"], intent, expected))
+        if args.verbose:
+            print(f"  {'ok' if ok else 'WRONG':<7} {row['text']!r} -> {intent} ({router.last_confidence:.2f})")
+
+    latencies.sort()
+    mode = "patterns only" if args.patterns_only else f"patterns + MiniLM classifier, threshold {args.threshold}"
+    print(f"\n{mode}: {len(rows)} utterances, {routable} routable")
+    print(f"{'precision':<12}{correct / routed if routed else 0.0:>8.1%}  ({correct}/{routed} routed correctly)")
+    print(f"{'coverage':<12}{routable_hit / routable if routable else 0.0:>8.1%}  ({routable_hit}/{routable} routable handled locally)")
+    print(f"{'latency':<12}p50 {latencies[len(latencies) // 2]:.2f} ms, p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms")
+    for text, intent, expected in mistakes:
+        print(f"  wrong: {text!r} -> {intent} (expected {expected})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Parse failures and retries with free-text output vs schema-constrained output.
+
+Sends every utterance of the intent eval set to mistral:7b twice: once as before (free text,
+parsed with the extraction and repair chain) and once with RESPONSE_FORMAT_SCHEMA passed as
+Ollama's ``format``, validated strictly and retried up to --retries times. Needs a running
+Ollama with the model pulled; --stub runs the same loop against the local stub server as a
+smoke test, where both modes trivially succeed.
+
+    python benchmarks/eval_structured_output.py --retries 1
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import config
+
+DEFAULT_SET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intent_eval.jsonl")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval-set", default=DEFAULT_SET)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=0, help="only the first N utterances")
+    parser.add_argument("--stub", action="store_true", help="use the local stub server instead of Ollama")
+    args = parser.parse_args()
+
+    server = None
+    if args.stub:
+        from stub_ollama import StubOllamaServer
+        server = StubOllamaServer().start()
+        config.OLLAMA_URL = server.url
+    from core.nlp_parser import _request_reply, parse_strict
+    from core.ollama_client import get_client
+    from core.response_schema import RESPONSE_FORMAT_SCHEMA
+    from utils.helpers import find_json_object
+    from utils.prompt_templates import build_system_prompt
+
+    with open(args.eval_set, 'r', encoding='utf-8') as f:
+        texts = [json.loads(line)["text"] for line in f if line.strip()]
+    if args.limit:
+        texts = texts[:args.limit]
+    client = get_client()
+    system = build_system_prompt({"user_profile": "No user profile available", "summary": "No summary available",
+                                  "os_context": "Current working directory is: C:\\Users\\me", "recent": "No recent messages",
+                                  "relevant_past": "No relevant past messages"})
+
+    print(f"{'mode':<12}{'valid 1st':>10}{'repaired':>10}{'retries':>9}{'failed':>8}{'mean ms':>10}")
+    for mode in ("free_text", "structured"):
+        valid = repaired = retries = failed = 0
+        elapsed = 0.0
+        for text in texts:
+            messages = [{"role": "system", "content": system}, {"role": "user", "content": text}]
+            start = time.perf_counter()
+            for attempt in range(1 + (args.retries if mode == "structured" else 0)):
+                content, _, _ = _request_reply(client, messages, format=RESPONSE_FORMAT_SCHEMA if mode == "structured" else None)
+                if parse_strict(content):
+                    valid += attempt == 0
+                    break
+                if mode == "free_text":
+                    if find_json_object(content) is not None:
+                        repaired += 1
+                    else:
+                        failed += 1
+                    break
+                if attempt < args.retries:
+                    retries += 1
+            else:
+                failed += 1
+            elapsed += time.perf_counter() - start
+        print(f"{mode:<12}{valid:>6}/{len(texts):<3}{repaired:>10}{retries:>9}{failed:>8}{elapsed / len(texts) * 1000:>10.0f}")
+    if server:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
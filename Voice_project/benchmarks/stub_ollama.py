@@ -0,0 +1,147 @@
+"""Minimal stand-in for the Ollama HTTP API, for exercising the client without real models.
+
+Serves /api/chat (streaming NDJSON or a single JSON body) with per-model delays and canned
+replies (a string, or a callable taking the request payload), can fail the first N requests
+with 503 to exercise retries, and reports a prompt_eval_count that only counts the part of
+the prompt not shared with the previous request for the same model, the way Ollama's
+KV-cache reuse behaves.
+
+    python benchmarks/stub_ollama.py --port 11500 --delay mistral:7b=1.5 --delay phi3:3.8b=0.5
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+DEFAULT_REPLY = '{"type": "assistant", "message": "This is the stub server. Nothing was generated."}'
+
+class StubOllamaServer:
+    def __init__(self, port: int = 0, delays: Optional[Dict[str, float]] = None, replies: Optional[Dict[str, object]] = None,
+                 token_delay: float = 0.0, fail_first: int = 0):
+        self.delays = delays or {}
+        self.replies = replies or {}
+        self.token_delay = token_delay
+        self.fail_remaining = fail_first
+        self.requests = []
+        self._last_prompt: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def _prompt_eval_count(self, model: str, prompt: str) -> int:
+        with self._lock:
+            previous = self._last_prompt.get(model, "")
+            self._last_prompt[model] = prompt
+        shared = 0
+        for a, b in zip(previous, prompt):
+            if a != b:
+                break
+            shared += 1
+        return max(1, (len(prompt) - shared) // 4)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests.append(payload)
+                    fail = stub.fail_remaining > 0
+                    if fail:
+                        stub.fail_remaining -= 1
+                if fail:
+                    return self._send_json(503, {"error": "stub failure"})
+                if self.path != "/api/chat":
+                    return self._send_json(404, {"error": "not found"})
+
+                model = payload.get("model", "")
+                prompt = "".join(m.get("content", "") for m in payload.get("messages", []))
+                prompt_eval_count = stub._prompt_eval_count(model, prompt)
+                reply = stub.replies.get(model, DEFAULT_REPLY)
+                if callable(reply):
+                    reply = reply(payload)
+                start = time.perf_counter()
+                time.sleep(stub.delays.get(model, 0.0))
+                stats = {"prompt_eval_count": prompt_eval_count, "eval_count": max(1, len(reply) // 4), "load_duration": 0}
+
+                if not payload.get("stream", True):
+                    time.sleep(stub.token_delay * len(range(0, len(reply), 4)))  # Same generation time, just not visible
+                    return self._send_json(200, dict(model=model, done=True, total_duration=int((time.perf_counter() - start) * 1e9),
+                                                     message={"role": "assistant", "content": reply}, **stats))
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def chunk(body):
+                    data = (json.dumps(body) + "\n").encode()
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+
+                try:
+                    for i in range(0, len(reply), 4):
+                        chunk({"model": model, "done": False, "message": {"role": "assistant", "content": reply[i:i + 4]}})
+                        time.sleep(stub.token_delay)
+                    chunk(dict(model=model, done=True, total_duration=int((time.perf_counter() - start) * 1e9),
+                               message={"role": "assistant", "content": ""}, **stats))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # Client abandoned the stream; Ollama stops generating too
+
+        return Handler
+
+    def start(self) -> "StubOllamaServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def _pairs(values):
+    result = {}
+    for value in values or []:
+        key, _, item = value.partition("=")
+        result[key] = item
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--delay", action="append", help="MODEL=SECONDS before the reply starts")
+    parser.add_argument("--reply", action="append", help="MODEL=TEXT content to return")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds of generation per 4-character chunk")
+    parser.add_argument("--fail-first", type=int, default=0, help="answer the first N requests with 503")
+    args = parser.parse_args()
+    server = StubOllamaServer(args.port, {k: float(v) for k, v in _pairs(args.delay).items()}, _pairs(args.reply),
+                              args.token_delay, args.fail_first)
+    print(f"Stub Ollama listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
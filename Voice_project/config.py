@@ -1,5 +1,45 @@
 import os
 
-MODEL_PATH =r"C:\Users\Parth Dhengle\Desktop\Projects\Gen Ai\Ai-extension\Voice_project\models\models--openai--whisper-medium"
+WHISPER_MODEL_SIZE = "medium"  # tiny, base, small, medium, large-v3
+# Whisper: a local model directory if it exists (models/whisper-<size> next to this file, or the
+# WHISPER_MODEL_PATH environment variable), otherwise openai/whisper-<WHISPER_MODEL_SIZE> from the Hugging Face cache
+MODEL_PATH = os.getenv("WHISPER_MODEL_PATH",
+                       os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", f"whisper-{WHISPER_MODEL_SIZE}"))
+# "transformers", "transformers-int8" (dynamic int8 quantization, CPU) or "faster-whisper" (CTranslate2).
+# On CPU-only machines faster-whisper with a small model is usually the best trade-off; run
+# benchmarks/bench_asr_backends.py to check on a given box
+ASR_BACKEND = "transformers"
+ASR_COMPUTE_TYPE = "int8"  # faster-whisper only: int8, int8_float16, float16, float32
+FASTER_WHISPER_MODEL_PATH = os.getenv("FASTER_WHISPER_MODEL_PATH", "")  # A converted CTranslate2 model directory
+WHISPER_WARMUP = True  # Run one silent inference after loading so the first voice turn does not pay for it
 TRANSFORMERS_OFFLINE = True
-USE_CUDA = True
\ No newline at end of file
+USE_CUDA = True
+MEMORY_BACKEND = "json"  # "json" (one JSONL log per session) or "sqlite" (memory/memory.db with FTS5 search)
+
+# Token budgeting for the chat prompt
+# Hugging Face tokenizer matching LARGE_MODEL (Ollama's mistral:7b is v0.3). The mistralai repos are gated,
+# so this is an ungated copy; with TRANSFORMERS_OFFLINE it must already be in the local cache
+TOKENIZER_NAME = "unsloth/mistral-7b-instruct-v0.3"
+LLM_CONTEXT_TOKENS = 4096  # Sent to Ollama as num_ctx on every call, so the packer and the server agree on the window
+RESPONSE_RESERVE_TOKENS = 512
+
+# Ollama server
+OLLAMA_URL = "http://localhost:11434"
+OLLAMA_KEEP_ALIVE = "30m"  # How long Ollama keeps a model loaded after the last call
+OLLAMA_MAX_RETRIES = 2
+STREAM_RESPONSES = True  # Speak assistant replies sentence by sentence while the model is still generating
+SPECULATIVE_CODEGEN = True  # Start code generation before the intent call returns when the prompt is clearly a coding request
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_SIMILARITY = 0.92  # Cosine similarity of MiniLM prompt embeddings needed for a semantic hit
+INTENT_ROUTER_ENABLED = True  # Dispatch simple OS commands without calling the LLM
+INTENT_ROUTER_THRESHOLD = 0.55  # Mean cosine similarity to the closest labeled examples
+STRUCTURED_OUTPUT = False  # Constrain mistral to the response JSON schema via Ollama's format parameter
+STRUCTURED_OUTPUT_RETRIES = 1
+MODEL_TIERING = True  # Send short conversational and simple OS turns to SMALL_MODEL, escalating when its reply is unusable
+SMALL_MODEL = "phi3:3.8b"
+LARGE_MODEL = "mistral:7b"
+MODEL_TARGET_LATENCY_MS = 2000  # Borderline prompts go to LARGE_MODEL only while its median latency stays under this
+SAVE_RECORDINGS = False  # Also archive each voice recording as a WAV file; the ASR always gets the audio in memory
+RECORDINGS_DIR = "memory/recordings"
+STREAMING_ASR = True  # Transcribe each pause-delimited segment while the user is still speaking
@@ -1,36 +1,117 @@
-from transformers import pipeline
-import torch
 import os
+import threading
+import time
+import numpy as np
+from utils.model_registry import registry
+from config import (MODEL_PATH, WHISPER_MODEL_SIZE, WHISPER_WARMUP, USE_CUDA, ASR_BACKEND, ASR_COMPUTE_TYPE,
+                    FASTER_WHISPER_MODEL_PATH)
+
+ASR_BACKENDS = ["transformers", "transformers-int8", "faster-whisper"]
+
+def resolve_whisper_model(backend=ASR_BACKEND, size=WHISPER_MODEL_SIZE, path=None):
+    """
+    The model to load for ``backend``: the configured local directory if it exists, else the
+    published model for ``size`` (a hub id for transformers, a size name for faster-whisper,
+    which fetches the CTranslate2 conversion itself).
+    """
+    if path is None:
+        path = FASTER_WHISPER_MODEL_PATH if backend == "faster-whisper" else MODEL_PATH
+    if path and os.path.isdir(path):
+        return path
+    return size if backend == "faster-whisper" else f"openai/whisper-{size}"
 
 class ASRTranscriber:
-    def __init__(self, model_path):
-        print("🔧 Loading Whisper model...")
+    """One Whisper model per process, built by the model registry.
+
+    ``backend`` picks the runtime: "transformers" (float32 on CPU, float16 on GPU),
+    "transformers-int8" (the same model with its Linear layers dynamically quantized to int8,
+    CPU only), or "faster-whisper" (CTranslate2, with ``compute_type`` such as "int8").
+    Calls are serialised with a lock because neither runtime is safe to call from several
+    threads at once (the voice thread and a background warmup can overlap).
+    """
+
+    def __init__(self, model_path, backend="transformers", use_cuda=True, warmup=True, compute_type="int8"):
+        print(f"🔧 Loading Whisper model from {model_path} ({backend})...")
+        self.backend = backend
+        self._lock = threading.Lock()
         try:
-            self.asr = pipeline(
-                "automatic-speech-recognition",
-                model=model_path,
-                device=0 if torch.cuda.is_available() else -1,
-                return_timestamps=True,
-            )
+            if backend == "faster-whisper":
+                self._load_faster_whisper(model_path, use_cuda, compute_type)
+            elif backend in ("transformers", "transformers-int8"):
+                self._load_transformers(model_path, use_cuda, quantize=backend == "transformers-int8")
+            else:
+                raise ValueError(f"Unknown ASR backend '{backend}', expected one of {ASR_BACKENDS}")
             print("✅ Whisper model loaded successfully")
         except Exception as model_error:
             print(f"❌ Error loading Whisper model: {model_error}")
             raise
+        if warmup:
+            self.warmup()
 
-    def transcribe_audio(self, path):
-        if not path or not os.path.exists(path):
-            print(f"❌ Audio file not found: {path}")
-            return None
+    def _load_transformers(self, model_path, use_cuda, quantize):
+        from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+        import torch
+        cuda = use_cuda and torch.cuda.is_available()
+        if quantize and cuda:
+            print("⚠️ int8 dynamic quantization only runs on CPU; using float16 on the GPU instead")
+            quantize = False
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(model_path, torch_dtype=torch.float16 if cuda else torch.float32)
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        processor = AutoProcessor.from_pretrained(model_path)
+        self.asr = pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            torch_dtype=torch.float16 if cuda else torch.float32,
+            device=0 if cuda else -1,
+            return_timestamps=True,
+        )
+        self._run = lambda inputs: self.asr(inputs).get("text", "")
+
+    def _load_faster_whisper(self, model_path, use_cuda, compute_type):
+        import ctranslate2
+        from faster_whisper import WhisperModel
+        device = "cuda" if use_cuda and ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        self.asr = WhisperModel(model_path, device=device, compute_type=compute_type)
+
+        def run(inputs):
+            if isinstance(inputs, dict):
+                if inputs["sampling_rate"] != 16000:
+                    raise ValueError("faster-whisper expects 16 kHz audio")
+                inputs = inputs["raw"]
+            segments, _ = self.asr.transcribe(inputs, beam_size=1)  # Greedy, like the pipeline default
+            return "".join(segment.text for segment in segments)
+        self._run = run
+
+    def warmup(self, sampling_rate=16000):
+        """One inference on a second of silence, so weights and kernels are ready before the first turn."""
+        start = time.perf_counter()
+        with self._lock:
+            self._run({"raw": np.zeros(sampling_rate, dtype=np.float32), "sampling_rate": sampling_rate})
+        print(f"⏱️ Whisper warmup inference: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def transcribe_audio(self, audio, sampling_rate=16000):
+        """
+        Transcribe a float32 mono array at ``sampling_rate``, as returned by record_until_silence.
+        A WAV path is still accepted (e.g. an archived recording); it is left on disk.
+        """
+        if isinstance(audio, str):
+            if not os.path.exists(audio):
+                print(f"❌ Audio file not found: {audio}")
+                return None
+            inputs = audio
+        else:
+            if audio is None or len(audio) < sampling_rate * 0.1:
+                print("⚠️ Audio too short, likely empty")
+                return None
+            # The pipeline takes raw samples directly: no WAV encode/decode and no int16 rounding
+            inputs = {"raw": audio, "sampling_rate": sampling_rate}
         print("🧠 Transcribing...")
         try:
-            file_size = os.path.getsize(path)
-            print(f"📁 Audio file size: {file_size} bytes")
-            if file_size < 1000:
-                print("⚠️ Audio file too small, likely empty")
-                return None
-            result = self.asr(path)
-            transcript = result.get("text", "") if isinstance(result, dict) else str(result)
-            transcript = transcript.strip()
+            with self._lock:
+                transcript = self._run(inputs).strip()
             if not transcript or len(transcript) > 500 and transcript.count('.') / len(transcript) > 0.8 or transcript.lower() in ['', ' ', 'you', 'thank you', '.']:
                 print("⚠️ Transcription invalid or empty")
                 return None
@@ -39,13 +120,9 @@ class ASRTranscriber:
         except Exception as transcribe_error:
             print(f"❌ Transcription error: {transcribe_error}")
             return None
-        finally:
-            try:
-                if os.path.exists(path):
-                    os.unlink(path)
-            except Exception as cleanup_error:
-                print(f"⚠️ Could not clean up temp file: {cleanup_error}")
-
-def transcribe_audio(path):
-    transcriber = ASRTranscriber(model_path=r"C:\Users\Parth Dhengle\Desktop\Projects\Gen Ai\Ai-extension\Voice_project\models\models--openai--whisper-medium")
-    return transcriber.transcribe_audio(path)
\ No newline at end of file
+
+registry.register("whisper", lambda: ASRTranscriber(resolve_whisper_model(), backend=ASR_BACKEND, use_cuda=USE_CUDA,
+                                                    warmup=WHISPER_WARMUP, compute_type=ASR_COMPUTE_TYPE))
+
+def transcribe_audio(audio, sampling_rate=16000):
+    return registry.get("whisper").transcribe_audio(audio, sampling_rate)
\ No newline at end of file
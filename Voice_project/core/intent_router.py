@@ -0,0 +1,177 @@
+import re
+import threading
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from core.task_executor import SEARCH_PLATFORMS
+
+KNOWN_WEBSITES = {
+    "youtube": "youtube.com", "google": "google.com", "github": "github.com", "gmail": "mail.google.com",
+    "facebook": "facebook.com", "twitter": "twitter.com", "amazon": "amazon.com", "wikipedia": "wikipedia.org",
+    "reddit": "reddit.com", "netflix": "netflix.com", "linkedin": "linkedin.com", "stackoverflow": "stackoverflow.com",
+    "stack overflow": "stackoverflow.com", "chatgpt": "chatgpt.com", "instagram": "instagram.com",
+}
+# open_application goes to a shell, so only names we know are applications are routed locally
+KNOWN_APPLICATIONS = {
+    "chrome": "chrome", "google chrome": "chrome", "firefox": "firefox", "edge": "msedge", "notepad": "notepad",
+    "calculator": "calc", "calc": "calc", "file explorer": "explorer", "explorer": "explorer", "paint": "mspaint",
+    "spotify": "spotify", "vs code": "code", "vscode": "code", "visual studio code": "code", "word": "winword",
+    "excel": "excel", "powerpoint": "powerpnt", "terminal": "wt", "command prompt": "cmd", "cmd": "cmd",
+    "task manager": "taskmgr", "settings": "start ms-settings:",
+}
+
+# Labeled examples for the embedding classifier; "llm" is everything the router must leave alone
+INTENT_EXAMPLES = {
+    "open_website": ["open youtube", "open github.com", "go to wikipedia", "open gmail", "take me to reddit",
+                     "visit stackoverflow", "open the google website", "launch netflix in the browser"],
+    "open_application": ["open chrome", "launch notepad", "start the calculator", "open file explorer",
+                         "open vs code", "run spotify", "open task manager", "start excel"],
+    "search_platform": ["search for laptops on amazon", "search google for pizza near me",
+                        "look up python tutorials on youtube", "find running shoes on amazon",
+                        "search youtube for lofi beats", "google the weather in paris"],
+    "play_youtube_video": ["play lofi music on youtube", "play despacito", "play some jazz on youtube",
+                           "put on taylor swift on youtube", "play the latest mrbeast video", "play chihiro song"],
+    "create_folder": ["create a folder called projects", "make a new folder named photos", "make directory backups",
+                      "create a directory called notes", "new folder reports"],
+    "create_file": ["create a file named notes.txt", "make a new file called todo.md", "create file main.py",
+                    "new file report.docx"],
+    "llm": ["what is the capital of france", "tell me a joke", "how are you today", "write a python script that sorts a list",
+            "create a folder and copy report.txt into it", "delete the file notes.txt", "explain how transformers work",
+            "what did we talk about yesterday", "generate code for a web scraper", "open the pod bay doors",
+            "why is the sky blue", "summarize our conversation", "move data.csv to archive", "shutdown the computer",
+            "what time is it", "can you help me plan a trip", "open a new chapter in my life", "play it cool"],
+}
+
+_POLITE_PREFIX = r"(?:(?:hey |hi |ok |okay )?spark,? )?(?:(?:please|can you|could you|would you|will you) )*"
+_POLITE_SUFFIX = r"(?:,? please)?[.!?]*"
+_MULTI_STEP_RE = re.compile(r"\b(and then|then|after that|also|followed by)\b|,\s*and\b")
+
+def _website(name: str) -> Optional[str]:
+    name = name.strip().lower()
+    if name in KNOWN_WEBSITES:
+        return KNOWN_WEBSITES[name]
+    if re.fullmatch(r"[a-z0-9\-]+(\.[a-z0-9\-]+)*\.(com|org|net|io|dev|ai|edu|gov|in|co|uk)", name):
+        return name
+    return None
+
+def _open_website(m: re.Match) -> Optional[Dict]:
+    url = _website(m.group("site"))
+    return url and {"type": "os", "action": "open_website", "url": url, "message": f"Opening {url}"}
+
+def _open_application(m: re.Match) -> Optional[Dict]:
+    app_name = KNOWN_APPLICATIONS.get(m.group("app").strip().lower())
+    return app_name and {"type": "os", "action": "open_application", "app_name": app_name,
+                         "message": f"Opening {m.group('app').strip()}"}
+
+def _search_platform(m: re.Match) -> Optional[Dict]:
+    platform, query = m.group("platform").lower(), m.group("query").strip()
+    return {"type": "os", "action": "search_platform", "platform": platform, "query": query,
+            "message": f"Searching for {query} on {platform.capitalize()}"}
+
+def _play_youtube(m: re.Match) -> Optional[Dict]:
+    query = m.group("query").strip()
+    return {"type": "os", "action": "play_youtube_video", "query": query, "message": f"Playing {query} on YouTube"}
+
+def _create_folder(m: re.Match) -> Optional[Dict]:
+    target = m.group("target")
+    return {"type": "os", "action": "create_folder", "target": target, "message": f"Creating folder {target}"}
+
+def _create_file(m: re.Match) -> Optional[Dict]:
+    target = m.group("target")
+    return {"type": "os", "action": "create_file", "target": target, "message": f"Creating file {target}"}
+
+_PLATFORMS = "|".join(SEARCH_PLATFORMS)
+# (label, pattern matched against the whole normalised utterance, builder returning the parsed intent)
+_RULES = [
+    ("search_platform", rf"(?:search|look up|find)(?: for)? (?P<query>.+?) on (?P<platform>{_PLATFORMS})", _search_platform),
+    ("search_platform", rf"(?:search|look up) (?P<platform>{_PLATFORMS}) for (?P<query>.+)", _search_platform),
+    ("play_youtube_video", r"(?:play|put on) (?P<query>.+?)(?: on youtube| from youtube)", _play_youtube),
+    ("create_folder", r"(?:create|make)(?: me)?(?: a)?(?: new)? (?:folder|directory)(?: named| called)? (?P<target>[\w\-]+)", _create_folder),
+    ("create_file", r"(?:create|make)(?: me)?(?: a)?(?: new)? file(?: named| called)? (?P<target>[\w\-]+\.\w{1,5})", _create_file),
+    ("open_website", r"(?:open|go to|visit|take me to)(?: the)? (?P<site>[\w.\- ]+?)(?: website| site| in the browser)?", _open_website),
+    ("open_application", r"(?:open|launch|start|run)(?: the)? (?P<app>[\w.\- ]+?)(?: app| application)?", _open_application),
+]
+_COMPILED_RULES = [(label, re.compile(_POLITE_PREFIX + pattern + _POLITE_SUFFIX, re.IGNORECASE), build)
+                   for label, pattern, build in _RULES]
+
+class IntentRouter:
+    """Fast path that answers simple OS commands without calling the LLM.
+
+    Anchored patterns propose an intent and extract its arguments; a nearest-neighbour
+    classifier over ``INTENT_EXAMPLES`` (MiniLM embeddings) must agree with the pattern with
+    at least ``threshold`` cosine similarity before the intent is dispatched. Without an
+    embedder the patterns alone decide. Anything else returns None and goes to the LLM.
+    """
+
+    def __init__(self, embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None, threshold: float = 0.6,
+                 neighbours: int = 3):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.neighbours = neighbours
+        self.stats = {"routed": 0, "rejected": 0, "no_match": 0}
+        self.last_confidence = 0.0
+        self.last_latency_ms = 0.0
+        self._labels: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def _examples(self) -> Optional[np.ndarray]:
+        with self._lock:
+            if self._matrix is None:
+                self._labels = [label for label, texts in INTENT_EXAMPLES.items() for _ in texts]
+                texts = [text for examples in INTENT_EXAMPLES.values() for text in examples]
+                self._matrix = self._normalize(np.asarray(self.embed_fn(texts), dtype=np.float32))
+            return self._matrix
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def classify(self, text: str) -> Dict[str, float]:
+        """Mean similarity of the closest examples, per label."""
+        matrix = self._examples()
+        query = self._normalize(np.asarray(self.embed_fn([text]), dtype=np.float32))[0]
+        similarities = matrix @ query
+        scores: Dict[str, float] = {}
+        for label in INTENT_EXAMPLES:
+            label_sims = np.sort(similarities[[i for i, l in enumerate(self._labels) if l == label]])[::-1]
+            scores[label] = float(label_sims[:self.neighbours].mean())
+        return scores
+
+    def route(self, text: str) -> Optional[Dict]:
+        """Parsed intent for a simple command, or None if the LLM should handle it."""
+        start = time.perf_counter()
+        intent = self._route(" ".join(text.strip().split()))
+        self.last_latency_ms = (time.perf_counter() - start) * 1000
+        return intent
+
+    def _route(self, normalized: str) -> Optional[Dict]:
+        self.last_confidence = 0.0
+        if _MULTI_STEP_RE.search(normalized.lower()):
+            self.stats["no_match"] += 1
+            return None
+        for label, pattern, build in _COMPILED_RULES:
+            match = pattern.fullmatch(normalized)
+            intent = build(match) if match else None
+            if not intent:
+                continue
+            confidence = 1.0
+            if self.embed_fn is not None:
+                try:
+                    scores = self.classify(normalized)
+                except Exception as e:
+                    print(f"⚠️ Intent classifier unavailable, using patterns only: {e}")
+                    scores = None
+                if scores:
+                    best = max(scores, key=scores.get)
+                    confidence = scores[label] if best == label else 0.0
+            if confidence < self.threshold:
+                self.stats["rejected"] += 1
+                self.last_confidence = confidence
+                return None
+            self.stats["routed"] += 1
+            self.last_confidence = confidence
+            return intent
+        self.stats["no_match"] += 1
+        return None
@@ -0,0 +1,90 @@
+import re
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Optional
+from core.response_schema import validation_errors
+
+_COMPLEX_RE = re.compile(
+    r"\b(explain|why|how (?:does|do|can|would)|compare|analy[sz]e|summari[sz]e|plan|write|generate|code|script|"
+    r"program|debug|translate|calculate|difference between|pros and cons|step by step)\b",
+    re.IGNORECASE
+)
+_MULTI_STEP_RE = re.compile(r"\b(and then|then|after that|also|followed by|first .* then)\b", re.IGNORECASE)
+_HEDGE_RE = re.compile(r"\b(i'?m not sure|i don'?t know|i cannot|i can'?t help|unclear|as an ai)\b", re.IGNORECASE)
+
+class ModelRouter:
+    """Sends simple turns to the small model and escalates to the large one when needed.
+
+    ``choose`` scores the prompt (length, multi-step wording, reasoning or coding verbs); clear
+    cases go straight to one model, borderline ones go to the large model only while the median
+    of its recent intent calls, as reported to ``record_latency``, is within ``target_latency_ms``.
+    The client's own per-model latencies are not used, since they include the much longer
+    codegen calls on the same model. ``should_escalate`` re-asks the large model
+    when the small one's reply does not parse, fails the response schema, or hedges.
+    """
+
+    def __init__(self, client, small_model: str = "phi3:3.8b", large_model: str = "mistral:7b",
+                 target_latency_ms: float = 2000, long_prompt_words: int = 25):
+        self.client = client
+        self.small_model = small_model
+        self.large_model = large_model
+        self.target_latency_ms = target_latency_ms
+        self.long_prompt_words = long_prompt_words
+        self._lock = threading.Lock()
+        self._counts = {"small": 0, "large": 0, "escalations": 0}
+        self._latencies_ms = defaultdict(lambda: deque(maxlen=50))
+
+    def complexity(self, prompt: str) -> float:
+        """0 for a short plain command, 1 for a long multi-step or reasoning request."""
+        score = 0.0
+        if _COMPLEX_RE.search(prompt):
+            score += 0.5
+        if _MULTI_STEP_RE.search(prompt):
+            score += 0.5
+        score += min(0.5, 0.5 * len(prompt.split()) / self.long_prompt_words)
+        return min(1.0, score)
+
+    def record_latency(self, model: str, latency_ms: float) -> None:
+        """Duration of one routed intent call."""
+        with self._lock:
+            self._latencies_ms[model].append(latency_ms)
+
+    def _percentile(self, model: str, q: float) -> float:
+        with self._lock:
+            latencies = sorted(self._latencies_ms.get(model, ()))
+        return latencies[min(int(len(latencies) * q), len(latencies) - 1)] if latencies else 0.0
+
+    def _large_within_target(self) -> bool:
+        p50 = self._percentile(self.large_model, 0.5)
+        return p50 == 0.0 or p50 <= self.target_latency_ms  # No data yet: give it the benefit of the doubt
+
+    def choose(self, prompt: str) -> str:
+        score = self.complexity(prompt)
+        use_large = score >= 0.5 or (score >= 0.25 and self._large_within_target())
+        with self._lock:
+            self._counts["large" if use_large else "small"] += 1
+        return self.large_model if use_large else self.small_model
+
+    def should_escalate(self, model: str, parsed: Optional[Dict]) -> bool:
+        """Whether a reply from ``model`` (already decoded, None if it did not parse) needs the large model."""
+        if model == self.large_model:
+            return False
+        escalate = (parsed is None or bool(validation_errors(parsed))
+                    or bool(_HEDGE_RE.search(str(parsed.get("message", "")))))
+        if escalate:
+            with self._lock:
+                self._counts["escalations"] += 1
+        return escalate
+
+    def stats(self) -> Dict:
+        """Routing counts, escalation rate and per-model intent-call latency percentiles."""
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "small_turns": counts["small"],
+            "large_turns": counts["large"],
+            "escalations": counts["escalations"],
+            "escalation_rate": counts["escalations"] / counts["small"] if counts["small"] else 0.0,
+            "latency_ms": {model: {"p50": self._percentile(model, 0.5), "p95": self._percentile(model, 0.95)}
+                           for model in (self.small_model, self.large_model)},
+        }
@@ -1,9 +1,34 @@
 import requests
 import re
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from core.task_executor import get_contextual_os_info
-from utils.prompt_templates import SYSTEM_PROMPT
-from utils.helpers import extract_json_from_text
+from utils.prompt_templates import build_system_prompt
+from utils.helpers import extract_json_from_text, find_json_object
+from memory.context_packer import ContextPacker, PackSection
+from memory.utils.token_counter import get_token_counter
+from core.ollama_client import get_client
+from core.stream_parser import StreamingResponseParser
+from core.response_cache import ResponseCache
+from core.intent_router import IntentRouter
+from core.response_schema import RESPONSE_FORMAT_SCHEMA, validate_response
+from core.model_router import ModelRouter
+from core.turn_worker import TurnCancelled
+from config import (LLM_CONTEXT_TOKENS, RESPONSE_RESERVE_TOKENS, STREAM_RESPONSES, SPECULATIVE_CODEGEN,
+                    RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_SIMILARITY,
+                    INTENT_ROUTER_ENABLED, INTENT_ROUTER_THRESHOLD, STRUCTURED_OUTPUT, STRUCTURED_OUTPUT_RETRIES,
+                    MODEL_TIERING, SMALL_MODEL, LARGE_MODEL, MODEL_TARGET_LATENCY_MS)
+
+# Code generation and its summary are independent calls; run them side by side
+_llm_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm")
+
+_CODING_REQUEST_RE = re.compile(
+    r"\b(write|generate|create|make|build|implement|code)\b.{0,40}?"
+    r"\b(code|script|program|function|class|module|python|algorithm)\b",
+    re.IGNORECASE
+)
 
 def clean_text(text):
     """Clean text to remove problematic unicode characters"""
@@ -18,6 +43,140 @@ def extract_code(text):
     return code_blocks[0].strip() if code_blocks else text.strip()
 
 
+# Per output mode: turns, replies valid against the schema as sent, retries, and replies that
+# could not be used at all (structured) or needed the fallback chain (free text)
+parse_stats = {mode: {"turns": 0, "first_try_valid": 0, "retries": 0, "failures": 0}
+               for mode in ("free_text", "structured")}
+
+_response_cache = None
+
+def get_response_cache(memory_manager):
+    """Process-wide response cache; its semantic tier reuses the memory embedder"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(embed_fn=memory_manager.vector_db.embed, max_entries=RESPONSE_CACHE_SIZE,
+                                        similarity_threshold=RESPONSE_CACHE_SIMILARITY)
+    return _response_cache
+
+_intent_router = None
+
+def get_intent_router(memory_manager):
+    """Process-wide fast-path router; its classifier reuses the memory embedder"""
+    global _intent_router
+    if _intent_router is None:
+        _intent_router = IntentRouter(embed_fn=memory_manager.vector_db.embed, threshold=INTENT_ROUTER_THRESHOLD)
+    return _intent_router
+
+_model_router = None
+
+def get_model_router():
+    """Process-wide small/large model router sharing the Ollama client's latency stats"""
+    global _model_router
+    if _model_router is None:
+        _model_router = ModelRouter(get_client(), small_model=SMALL_MODEL, large_model=LARGE_MODEL,
+                                    target_latency_ms=MODEL_TARGET_LATENCY_MS)
+    return _model_router
+
+def parse_strict(content):
+    """The reply as a schema-valid object, or None; no extraction or repair"""
+    try:
+        return validate_response(json.loads(content))
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+def _request_reply(client, messages, on_sentence=None, format=None, model=LARGE_MODEL, cancel_event=None):
+    """
+    One chat call, streamed through on_sentence when given; returns (content, stream parser, final body).
+    With ``cancel_event`` the call is always streamed so it can be abandoned between chunks;
+    closing the connection also stops Ollama generating.
+    """
+    parser = None
+    streaming = bool(on_sentence and STREAM_RESPONSES)
+    if streaming or cancel_event:
+        parser = StreamingResponseParser() if streaming else None
+        content, response_data = "", {}
+        for chunk in client.chat_stream(model, messages, timeout=30, format=format):
+            if cancel_event and cancel_event.is_set():
+                raise TurnCancelled()
+            delta = chunk.get('message', {}).get('content', '')
+            content += delta
+            if parser:
+                for sentence in parser.feed(delta):
+                    on_sentence(clean_text(sentence))
+            if chunk.get('done'):
+                response_data = chunk
+    else:
+        response_data = client.chat(model, messages, timeout=30, format=format)
+        content = response_data.get('message', {}).get('content', '')
+    return clean_text(content), parser, response_data
+
+def report_prompt_eval(response_data, prompt_tokens):
+    """Print how much of the prompt Ollama had to evaluate, i.e. what its prompt cache did not cover"""
+    evaluated = response_data.get('prompt_eval_count')
+    if evaluated is None:
+        return
+    reused = max(0.0, 1 - evaluated / prompt_tokens) if prompt_tokens else 0.0
+    print(f"📊 Prompt eval: {evaluated} of ~{prompt_tokens} tokens ({reused:.0%} reused from cache)")
+
+def looks_like_coding_request(prompt):
+    """Cheap check used to start code generation before intent classification confirms it"""
+    return bool(_CODING_REQUEST_RE.search(prompt))
+
+def _chat_text(client, model, messages, timeout, cancel_event=None):
+    """A chat reply's text; with ``cancel_event`` it is streamed and abandoned at the next chunk once set"""
+    if cancel_event is None:
+        return client.chat_content(model, messages, timeout=timeout)
+    content = ""
+    for chunk in client.chat_stream(model, messages, timeout=timeout):
+        if cancel_event.is_set():
+            raise TurnCancelled()
+        content += chunk.get('message', {}).get('content', '')
+    return content
+
+def _generate_code(client, prompt, cancel_event=None):
+    code_content = _chat_text(
+        client,
+        LARGE_MODEL,
+        [
+            {"role": "system", "content": "Generate only Python code, no explanation. Write clean, functional code."},
+            {"role": "user", "content": prompt}
+        ],
+        timeout=60,
+        cancel_event=cancel_event
+    )
+    return extract_code(clean_text(code_content))
+
+def _summarize_code_task(client, prompt, cancel_event=None):
+    followup_content = _chat_text(
+        client,
+        SMALL_MODEL,
+        [
+            {"role": "system", "content": "You are Spark. Summarize the code generation task in one sentence."},
+            {"role": "user", "content": f"I generated code for: {prompt}"}
+        ],
+        timeout=30,
+        cancel_event=cancel_event
+    )
+    return clean_text(followup_content)
+
+def start_code_tasks(client, prompt, cancel_event=None):
+    """Submit code generation and its summary message concurrently; returns both futures.
+    Both calls stop at their next streamed chunk once ``cancel_event`` is set."""
+    return (_llm_pool.submit(_generate_code, client, prompt, cancel_event),
+            _llm_pool.submit(_summarize_code_task, client, prompt, cancel_event))
+
+def await_result(future, cancel_event=None):
+    """future.result(), given up with TurnCancelled as soon as cancel_event is set.
+    The task itself sees the same event and closes its stream; cancel() only drops it if it never started."""
+    while cancel_event is not None:
+        try:
+            return future.result(timeout=0.1)
+        except FutureTimeout:
+            if cancel_event.is_set():
+                future.cancel()
+                raise TurnCancelled()
+    return future.result()
+
 def validate_parsed_response(parsed):
     """Validate and fix common issues in parsed responses"""
     if not isinstance(parsed, dict):
@@ -57,12 +216,26 @@ def validate_parsed_response(parsed):
     
     return parsed
 
-def generate_response(prompt, memory_manager):
+def generate_response(prompt, memory_manager, on_sentence=None, cancel_event=None):
     """
-    Generate response using Ollama with improved error handling and JSON parsing
+    Generate response using Ollama with improved error handling and JSON parsing.
+    With ``on_sentence``, the reply is streamed and each finished sentence of an assistant
+    message is passed to it while the rest is still generating; such results carry ``streamed``.
+    Setting ``cancel_event`` aborts the model call and raises TurnCancelled.
     """
+    # Stops the code tasks, speculative or not, on every way out of this turn; by the time a
+    # code reply returns both have finished, so setting it then costs nothing
+    code_stop = threading.Event()
     try:
         print(f"🧠 Processing: '{prompt}'")
+
+        if INTENT_ROUTER_ENABLED:
+            router = get_intent_router(memory_manager)
+            routed = router.route(prompt)
+            if routed:
+                print(f"⚡ Routed locally as {routed['action']} "
+                      f"(confidence {router.last_confidence:.2f}, {router.last_latency_ms:.1f} ms)")
+                return routed
         
         # Get contextual information
         cwd, folders, files = get_contextual_os_info()
@@ -73,58 +246,80 @@ def generate_response(prompt, memory_manager):
             "Use these paths when deciding where to create, delete, or move files."
         )
 
+        cache = get_response_cache(memory_manager) if RESPONSE_CACHE_ENABLED else None
+        if cache:
+            # Only what the answer depends on; recent history would make every key unique
+            digest = cache.context_digest(
+                os_context, json.dumps(memory_manager.user_profile_manager.get_profile(), sort_keys=True))
+            cached = cache.get(prompt, digest)
+            if cached:
+                print(f"⚡ Response cache hit (hit rate {cache.hit_rate():.0%}): {cached}")
+                return cached
+
         context = memory_manager.get_context_for_llm(prompt)
         
-        # Extract and format context components
-        user_profile_str = json.dumps(context['user_profile']) if context['user_profile'] else "No user profile available"
-        summary_str = context['summary'] if context['summary'] else "No summary available"
-        recent_str = '\n'.join([f"{msg['role']}: {msg['content']}" for msg in context['recent_messages']]) if context['recent_messages'] else "No recent messages"
-        relevant_past_str = '\n'.join(context['relevant_past']) if context['relevant_past'] else "No relevant past messages"
-        
-        # Format the system prompt
-        formatted_prompt = f"""
-        SYSTEM:
-        You are Spark, a voice assistant.
-        User profile: {user_profile_str}
-        Summary of previous conversation: {summary_str}
-        Recent conversation:
-        {recent_str}
-        Relevant past messages:
-        {relevant_past_str}
-        Current user query: {prompt}
-        {os_context}
-        """
+        # Pack the variable sections into whatever the fixed text and the reply leave of the window
+        counter = get_token_counter()
+        fixed_tokens = counter.count(build_system_prompt({})) + counter.count(prompt)
+        packer = ContextPacker(LLM_CONTEXT_TOKENS - RESPONSE_RESERVE_TOKENS - fixed_tokens, counter)
+        packed = packer.pack([
+            PackSection("os_context", [os_context], priority=0, max_tokens=400),
+            PackSection("user_profile", [json.dumps(context['user_profile'], sort_keys=True)] if context['user_profile'] else [],
+                        priority=1, max_tokens=300, empty_text="No user profile available"),
+            PackSection("recent", [f"{msg['role']}: {msg['content']}" for msg in reversed(context['recent_messages'])],
+                        priority=2, reverse_output=True, empty_text="No recent messages"),
+            PackSection("summary", [context['summary']] if context['summary'] else [],
+                        priority=3, max_tokens=600, empty_text="No summary available"),
+            PackSection("relevant_past", context['relevant_past'], priority=4, empty_text="No relevant past messages"),
+        ])
+        formatted_prompt = build_system_prompt(packed)
         
         print("🔍 Sending request to Ollama...")
         
-        response = requests.post(
-            "http://localhost:11434/api/chat",
-            
-            json={
-                "model": "mistral:7b",
-                "messages": [
-                    {"role": "system", "content": formatted_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                "stream": False
-            },
-            timeout=30
-        )
-        response.raise_for_status()
-
-        # Parse response safely
-        if not response.text.strip():
-            print("⚠️ Empty response from API")
-            return {
-                "type": "assistant",
-                "message": "I received an empty response. Please try again."
-            }
-        
+        client = get_client()
+        speculative = None
+        if SPECULATIVE_CODEGEN and looks_like_coding_request(prompt):
+            print("📝 Looks like a coding request, starting code generation early...")
+            speculative = start_code_tasks(client, prompt, code_stop)
+        messages = [
+            {"role": "system", "content": formatted_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        mode = "structured" if STRUCTURED_OUTPUT else "free_text"
+        stats = parse_stats[mode]
+        stats["turns"] += 1
+        structured_parsed = None
+        model_router = get_model_router() if MODEL_TIERING else None
+        model = model_router.choose(prompt) if model_router else LARGE_MODEL
+        first_model = model
         try:
-            response_data = response.json()
-            content = response_data.get('message', {}).get('content', '')
-            content = clean_text(content)
+            while True:
+                attempts = 1 + (STRUCTURED_OUTPUT_RETRIES if STRUCTURED_OUTPUT else 0)
+                for attempt in range(attempts):
+                    call_start = time.perf_counter()
+                    content, parser, response_data = _request_reply(
+                        client, messages, on_sentence, RESPONSE_FORMAT_SCHEMA if STRUCTURED_OUTPUT else None, model,
+                        cancel_event)
+                    if model_router:
+                        model_router.record_latency(model, (time.perf_counter() - call_start) * 1000)
+                    report_prompt_eval(response_data, counter.count(formatted_prompt) + counter.count(prompt))
+                    structured_parsed = parse_strict(content)
+                    if structured_parsed and attempt == 0 and model == first_model:
+                        stats["first_try_valid"] += 1
+                    if structured_parsed or not STRUCTURED_OUTPUT or (parser and parser.spoken):
+                        break
+                    if attempt + 1 < attempts:
+                        stats["retries"] += 1
+                        print("⚠️ Reply did not match the response schema, retrying...")
+                if not model_router or (parser and parser.spoken):
+                    break  # Whatever was spoken stands
+                candidate = structured_parsed if STRUCTURED_OUTPUT else (structured_parsed or find_json_object(content))
+                if not model_router.should_escalate(model, candidate):
+                    break
+                print(f"⚠️ {model} reply was not usable, escalating to {model_router.large_model}...")
+                model = model_router.large_model
         except json.JSONDecodeError as json_err:
+            # Also covers an empty body
             print(f"⚠️ Invalid JSON response from API: {json_err}")
             return {
                 "type": "assistant",
@@ -138,68 +333,77 @@ def generate_response(prompt, memory_manager):
                 "message": "I didn't receive any content to process."
             }
         
-        print(f"🔍 Raw Phi3 Output: {content[:200]}...")  # Show first 200 chars
+        print(f"🔍 Raw {model} output: {content[:200]}...")  # Show first 200 chars
         
         # Extract and validate JSON
-        try:
-            parsed = extract_json_from_text(content)
-            parsed = validate_parsed_response(parsed)
-        except Exception as json_error:
-            print(f"⚠️ JSON parsing failed: {json_error}")
-            # Fallback: treat as assistant response
-            parsed = {
-                "type": "assistant",
-                "message": content[:500] if len(content) > 500 else content  # Limit length
-            }
+        parsed_ok = False
+        if STRUCTURED_OUTPUT:
+            # The schema was enforced while sampling, so there is nothing to extract or repair
+            parsed_ok = structured_parsed is not None
+            if parsed_ok:
+                parsed = validate_parsed_response(structured_parsed)
+            elif parser and parser.spoken:
+                parsed = {"type": "assistant", "message": parser.message}
+            else:
+                stats["failures"] += 1
+                print(f"⚠️ Reply failed schema validation after {attempts} attempt(s)")
+                return {
+                    "type": "assistant",
+                    "message": "I couldn't make sense of that reply. Please try again."
+                }
+        else:
+            try:
+                parsed = structured_parsed or find_json_object(content)
+                parsed_ok = parsed is not None
+                if not parsed_ok:
+                    stats["failures"] += 1
+                    parsed = extract_json_from_text(content)  # Keyword and intent guesses
+                parsed = validate_parsed_response(parsed)
+            except Exception as json_error:
+                print(f"⚠️ JSON parsing failed: {json_error}")
+                stats["failures"] += 1
+                # Fallback: treat as assistant response
+                parsed = {
+                    "type": "assistant",
+                    "message": content[:500] if len(content) > 500 else content  # Limit length
+                }
+
+        if parser and parser.spoken and parsed.get("type") == "assistant":
+            # Part of the message is already out; finish it rather than repeating it
+            for sentence in parser.finish():
+                on_sentence(clean_text(sentence))
+            parsed["message"] = clean_text(parser.message)
+            parsed["streamed"] = True
 
         print(f"✅ Parsed response: {parsed}")
+        if cache and parsed_ok:
+            cache.put(prompt, digest, parsed)
 
         # Handle code generation
         if parsed.get("type") == "code":
             print("📝 Generating code with secondary model...")
+            code_future, summary_future = speculative or start_code_tasks(client, prompt, code_stop)
             try:
-                code_response = requests.post(
-                    "http://localhost:11434/api/chat",
-                    json={
-                        "model": "mistral:7b",
-                        "messages": [
-                            {"role": "system", "content": "Generate only Python code, no explanation. Write clean, functional code."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "stream": False
-                    },
-                    timeout=60
-                )
-                code_response.raise_for_status()
-                
-                code_content = code_response.json().get('message', {}).get('content', '')
-                code_content = clean_text(code_content)
-                parsed["code"] = extract_code(code_content)
-
-                # Generate summary message
-                followup_response = requests.post(
-                    "http://localhost:11434/api/chat",
-                    json={
-                        "model": "phi3:3.8b",
-                        "messages": [
-                            {"role": "system", "content": "You are Spark. Summarize the code generation task in one sentence."},
-                            {"role": "user", "content": f"I generated code for: {prompt}"}
-                        ],
-                        "stream": False
-                    },
-                    timeout=30
-                )
-                followup_response.raise_for_status()
-                followup_content = followup_response.json().get('message', {}).get('content', '')
-                parsed["message"] = clean_text(followup_content) or "I've generated the requested code."
-                
+                parsed["code"] = await_result(code_future, cancel_event)
+            except TurnCancelled:
+                raise
             except Exception as code_e:
                 print(f"❌ Code generation failed: {code_e}")
                 parsed["message"] = f"I tried to generate code but encountered an error: {str(code_e)}"
                 parsed["code"] = f"# Code generation failed\n# Error: {str(code_e)}"
+                return parsed
+            try:
+                parsed["message"] = await_result(summary_future, cancel_event) or "I've generated the requested code."
+            except TurnCancelled:
+                raise
+            except Exception as summary_e:
+                print(f"⚠️ Code summary failed: {summary_e}")
+                parsed["message"] = "I've generated the requested code."
 
         return parsed
 
+    except TurnCancelled:
+        raise
     except requests.exceptions.ConnectionError:
         print("❌ Connection error: Cannot connect to Ollama")
         return {
@@ -223,4 +427,6 @@ def generate_response(prompt, memory_manager):
         return {
             "type": "assistant", 
             "message": f"I encountered an unexpected error: {str(e)}"
-        }
\ No newline at end of file
+        }
+    finally:
+        code_stop.set()
\ No newline at end of file
@@ -0,0 +1,175 @@
+import json
+import requests
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Iterator, List, Optional
+
+class OllamaClient:
+    """Shared client for the local Ollama server.
+
+    One pooled ``requests.Session`` keeps connections alive across turns, ``keep_alive`` keeps
+    models resident between calls, and failed connections or 5xx responses are retried a
+    bounded number of times with jittered exponential backoff. Read timeouts are not retried:
+    the model was already generating, and a retry would only double the wait.
+
+    ``options`` are sent with every call, under any per-call options. ``num_ctx`` belongs
+    there: Ollama reloads a model whose runner was started with a different context size.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434", pool_size: int = 4, max_retries: int = 2,
+                 backoff_base: float = 0.25, backoff_max: float = 2.0, keep_alive: Optional[str] = "30m",
+                 options: Optional[Dict] = None):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.keep_alive = keep_alive
+        self.options = dict(options or {})
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+            "calls": 0, "failures": 0, "retries": 0,
+            "latencies_ms": deque(maxlen=200), "load_ms": deque(maxlen=200), "first_token_ms": deque(maxlen=200),
+            "prompt_eval": deque(maxlen=200)
+        })
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_max, self.backoff_base * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+    def _post(self, path: str, payload: Dict, timeout: float, stream: bool = False) -> requests.Response:
+        """POST with bounded retries on connection errors and 5xx responses."""
+        model = payload.get("model", "?")
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=timeout, stream=stream)
+                if response.status_code >= 500 and attempt < self.max_retries:
+                    response.close()
+                    raise requests.exceptions.HTTPError(f"{response.status_code} from Ollama", response=response)
+                response.raise_for_status()
+                return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout,
+                    requests.exceptions.HTTPError) as e:
+                retryable = not isinstance(e, requests.exceptions.HTTPError) or (
+                    e.response is not None and e.response.status_code >= 500)
+                if not retryable or attempt == self.max_retries:
+                    raise
+                with self._metrics_lock:
+                    self._metrics[model]["retries"] += 1
+                delay = self._backoff(attempt)
+                print(f"⚠️ Ollama request failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    def _payload(self, model: str, messages: List[Dict], stream: bool, format: Any, options: Optional[Dict],
+                 keep_alive: Optional[str]) -> Dict:
+        payload = {"model": model, "messages": messages, "stream": stream}
+        if format is not None:
+            payload["format"] = format
+        options = {**self.options, **(options or {})}
+        if options:
+            payload["options"] = options
+        keep_alive = self.keep_alive if keep_alive is None else keep_alive
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return payload
+
+    def _record(self, model: str, start: float, ok: bool, data: Optional[Dict] = None) -> None:
+        with self._metrics_lock:
+            metrics = self._metrics[model]
+            metrics["calls"] += 1
+            if not ok:
+                metrics["failures"] += 1
+                return
+            metrics["latencies_ms"].append((time.perf_counter() - start) * 1000)
+            if data and "load_duration" in data:
+                metrics["load_ms"].append(data["load_duration"] / 1e6)
+            if data and "prompt_eval_count" in data:
+                metrics["prompt_eval"].append(data["prompt_eval_count"])
+
+    def chat(self, model: str, messages: List[Dict], timeout: float = 30, format: Any = None,
+             options: Optional[Dict] = None, keep_alive: Optional[str] = None) -> Dict:
+        """Non-streaming /api/chat call; returns the decoded response body."""
+        start = time.perf_counter()
+        try:
+            response = self._post("/api/chat", self._payload(model, messages, False, format, options, keep_alive), timeout)
+            data = response.json()
+        except Exception:
+            self._record(model, start, ok=False)
+            raise
+        self._record(model, start, ok=True, data=data)
+        return data
+
+    def chat_stream(self, model: str, messages: List[Dict], timeout: float = 30, format: Any = None,
+                    options: Optional[Dict] = None, keep_alive: Optional[str] = None) -> Iterator[Dict]:
+        """Streaming /api/chat call; yields each NDJSON chunk as it arrives, the last one with ``done`` set."""
+        start = time.perf_counter()
+        final = None
+        try:
+            response = self._post("/api/chat", self._payload(model, messages, True, format, options, keep_alive),
+                                  timeout, stream=True)
+            with response:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise requests.exceptions.RequestException(f"Ollama error: {chunk['error']}")
+                    if final is None:
+                        final = {}
+                        with self._metrics_lock:
+                            self._metrics[model]["first_token_ms"].append((time.perf_counter() - start) * 1000)
+                    if chunk.get("done"):
+                        final = chunk
+                    yield chunk
+        except Exception:
+            self._record(model, start, ok=False)
+            raise
+        self._record(model, start, ok=True, data=final)
+
+    def chat_content(self, model: str, messages: List[Dict], **kwargs) -> str:
+        """Convenience wrapper returning just the assistant message text."""
+        return self.chat(model, messages, **kwargs).get('message', {}).get('content', '')
+
+    def preload(self, model: str, keep_alive: Optional[str] = None) -> None:
+        """Ask Ollama to load a model into memory without generating anything."""
+        self.chat(model, [], timeout=120, keep_alive=keep_alive)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-model call counts and latency percentiles in milliseconds."""
+        summary = {}
+        with self._metrics_lock:
+            for model, metrics in self._metrics.items():
+                latencies = sorted(metrics["latencies_ms"])
+                first_tokens = sorted(metrics["first_token_ms"])
+                summary[model] = {
+                    "calls": metrics["calls"],
+                    "failures": metrics["failures"],
+                    "retries": metrics["retries"],
+                    "p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+                    "p95_ms": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+                    "p50_first_token_ms": first_tokens[len(first_tokens) // 2] if first_tokens else 0.0,
+                    "mean_prompt_eval_tokens": (sum(metrics["prompt_eval"]) / len(metrics["prompt_eval"])
+                                                if metrics["prompt_eval"] else 0.0),
+                    "mean_load_ms": sum(metrics["load_ms"]) / len(metrics["load_ms"]) if metrics["load_ms"] else 0.0,
+                }
+        return summary
+
+_client: Optional[OllamaClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> OllamaClient:
+    """The process-wide client every LLM call goes through."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from config import OLLAMA_URL, OLLAMA_KEEP_ALIVE, OLLAMA_MAX_RETRIES, LLM_CONTEXT_TOKENS
+            # One context size for every model and call, so no call makes Ollama reload a runner
+            _client = OllamaClient(OLLAMA_URL, max_retries=OLLAMA_MAX_RETRIES, keep_alive=OLLAMA_KEEP_ALIVE,
+                                   options={"num_ctx": LLM_CONTEXT_TOKENS})
+        return _client
@@ -0,0 +1,150 @@
+import copy
+import hashlib
+import re
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+# OS actions that are safe to replay from cache: nothing that creates, deletes or moves files
+CACHEABLE_OS_ACTIONS = {"open_application", "open_website", "open_file", "play_youtube_video",
+                        "play_local_media", "search_platform"}
+# Fields of an OS action that carry what the user asked for; a semantic hit must mention them
+ARGUMENT_FIELDS = ("target", "url", "query", "app_name", "file_path", "platform", "source", "destination", "command")
+# Answers to these depend on when or to whom they are given, so they are never served from cache
+_VOLATILE_RE = re.compile(
+    r"\b(time|date|today|tonight|tomorrow|yesterday|now|current|latest|news|weather|remember|my|me|i|we|our)\b",
+    re.IGNORECASE
+)
+
+# Ignored when checking that a cached URL is mentioned in the prompt ("youtube" for youtube.com)
+_URL_NOISE = {"http", "https", "www", "com", "org", "net"}
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(re.sub(r"[^\w\s.]", " ", prompt.lower()).split())
+
+def _words(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", text.lower())) - _URL_NOISE
+
+class ResponseCache:
+    """Two-level cache of parsed LLM responses in front of generate_response.
+
+    The exact tier keys on the normalised prompt plus a digest of the context the answer
+    depends on (working directory listing and user profile). The semantic tier compares the
+    MiniLM embedding of a new prompt with cached prompts that share the same context digest
+    and reuses the closest one above ``similarity_threshold``. Entries expire after their
+    type's TTL and the least recently used are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None, max_entries: int = 256,
+                 similarity_threshold: float = 0.92, os_ttl: float = 24 * 3600, assistant_ttl: float = 600):
+        self.embed_fn = embed_fn
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttls = {"os": os_ttl, "assistant": assistant_ttl}
+        self.stats = {"lookups": 0, "exact_hits": 0, "semantic_hits": 0, "misses": 0,
+                      "stored": 0, "uncacheable": 0, "evictions": 0, "expired": 0}
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def context_digest(*parts: str) -> str:
+        return hashlib.sha1("\0".join(parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _key(prompt: str, digest: str) -> str:
+        return hashlib.sha1(f"{normalize_prompt(prompt)}\0{digest}".encode('utf-8')).hexdigest()
+
+    def is_cacheable(self, prompt: str, result: Dict) -> bool:
+        """Per-type rules: replayable OS actions and context-free assistant replies only."""
+        response_type = result.get("type")
+        if response_type == "os":
+            return result.get("action") in CACHEABLE_OS_ACTIONS
+        if response_type == "assistant":
+            return not _VOLATILE_RE.search(prompt)
+        return False  # code writes files, sequences chain actions; both should run fresh
+
+    @staticmethod
+    def _grounded(result: Dict, prompt: str) -> bool:
+        """A near-match may only be reused if every argument of the cached action is in the new prompt."""
+        words = _words(prompt)
+        return all(_words(result[field]) <= words for field in ARGUMENT_FIELDS if isinstance(result.get(field), str))
+
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        try:
+            vector = np.asarray(self.embed_fn([prompt])[0], dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ Response cache could not embed the prompt: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _expire(self, now: float) -> None:
+        for key in [k for k, e in self._entries.items() if e["expires"] <= now]:
+            del self._entries[key]
+            self.stats["expired"] += 1
+
+    def get(self, prompt: str, digest: str) -> Optional[Dict]:
+        """Cached parsed result for the prompt, or None."""
+        now = time.time()
+        key = self._key(prompt, digest)
+        with self._lock:
+            self.stats["lookups"] += 1
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return copy.deepcopy(entry["result"])
+            candidates = [(k, e) for k, e in self._entries.items() if e["digest"] == digest and e["vector"] is not None]
+        vector = self._embed(prompt) if candidates else None
+        if vector is not None:
+            similarities = np.stack([e["vector"] for _, e in candidates]) @ vector
+            for i in np.argsort(-similarities):
+                if similarities[i] < self.similarity_threshold:
+                    break
+                best_key, best = candidates[i]
+                if self._grounded(best["result"], prompt) and self.is_cacheable(prompt, best["result"]):
+                    with self._lock:
+                        if best_key in self._entries:
+                            self._entries.move_to_end(best_key)
+                        self.stats["semantic_hits"] += 1
+                    print(f"⚡ Semantic cache hit ({similarities[i]:.2f}): '{best['prompt']}'")
+                    return copy.deepcopy(best["result"])
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, prompt: str, digest: str, result: Dict) -> bool:
+        """Store a parsed result if its type allows it; returns whether it was cached."""
+        if not self.is_cacheable(prompt, result):
+            with self._lock:
+                self.stats["uncacheable"] += 1
+            return False
+        entry = {
+            "prompt": prompt,
+            "digest": digest,
+            "result": copy.deepcopy({k: v for k, v in result.items() if k != "streamed"}),
+            "vector": self._embed(prompt),
+            "expires": time.time() + self.ttls[result["type"]],
+        }
+        key = self._key(prompt, digest)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self.stats["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return True
+
+    def hit_rate(self) -> float:
+        hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+        return hits / self.stats["lookups"] if self.stats["lookups"] else 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
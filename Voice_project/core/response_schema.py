@@ -0,0 +1,76 @@
+from typing import Dict, List, Optional
+
+try:
+    from jsonschema import Draft7Validator
+except ImportError:  # Optional; the hand-written checks below cover the same rules
+    Draft7Validator = None
+
+RESPONSE_TYPES = ["assistant", "os", "code", "sequence"]
+OS_ACTIONS = ["create_file", "delete_file", "create_folder", "delete_folder", "copy_file", "move_file",
+              "open_application", "open_website", "open_file", "system_command", "play_youtube_video",
+              "play_local_media", "search_platform"]
+_ARGUMENTS = ["target", "source", "destination", "app_name", "url", "file_path", "command", "query", "platform"]
+
+_ACTION_SCHEMA = {
+    "type": "object",
+    "properties": dict({"type": {"type": "string", "enum": ["os"]},
+                        "action": {"type": "string", "enum": OS_ACTIONS},
+                        "message": {"type": "string"}},
+                       **{name: {"type": "string"} for name in _ARGUMENTS}),
+    "required": ["action", "message"],
+}
+
+# Sent to Ollama as ``format``. Kept flat (no anyOf/if-then) because Ollama turns the schema
+# into a sampling grammar and only handles the plain keywords reliably.
+RESPONSE_FORMAT_SCHEMA = {
+    "type": "object",
+    "properties": dict({"type": {"type": "string", "enum": RESPONSE_TYPES},
+                        "message": {"type": "string"},
+                        "action": {"type": "string", "enum": OS_ACTIONS},
+                        "actions": {"type": "array", "items": _ACTION_SCHEMA}},
+                       **{name: {"type": "string"} for name in _ARGUMENTS}),
+    "required": ["type", "message"],
+}
+
+# What a response must satisfy locally: the format schema plus the per-type requirements
+RESPONSE_SCHEMA = dict(RESPONSE_FORMAT_SCHEMA, allOf=[
+    {"if": {"properties": {"type": {"const": "os"}}}, "then": {"required": ["action"]}},
+    {"if": {"properties": {"type": {"const": "sequence"}}}, "then": {"required": ["actions"]}},
+])
+
+_validator = Draft7Validator(RESPONSE_SCHEMA) if Draft7Validator else None
+
+def _fallback_errors(response: Dict) -> List[str]:
+    errors = []
+    if response.get("type") not in RESPONSE_TYPES:
+        errors.append(f"type must be one of {RESPONSE_TYPES}")
+    if not isinstance(response.get("message"), str):
+        errors.append("message must be a string")
+    for name in _ARGUMENTS:
+        if name in response and not isinstance(response[name], str):
+            errors.append(f"{name} must be a string")
+    if response.get("type") == "os" and response.get("action") not in OS_ACTIONS:
+        errors.append("os responses need a supported action")
+    if response.get("type") == "sequence":
+        actions = response.get("actions")
+        if not isinstance(actions, list) or not actions:
+            errors.append("sequence responses need a list of actions")
+        else:
+            for i, action in enumerate(actions):
+                if not isinstance(action, dict) or action.get("action") not in OS_ACTIONS:
+                    errors.append(f"actions[{i}] needs a supported action")
+                elif not isinstance(action.get("message"), str):
+                    errors.append(f"actions[{i}].message must be a string")
+    return errors
+
+def validation_errors(response) -> List[str]:
+    """Schema violations of a decoded response; empty when it is valid."""
+    if not isinstance(response, dict):
+        return ["response must be a JSON object"]
+    if _validator is not None:
+        return [error.message for error in _validator.iter_errors(response)]
+    return _fallback_errors(response)
+
+def validate_response(response) -> Optional[Dict]:
+    """The response if it satisfies RESPONSE_SCHEMA, else None."""
+    return response if not validation_errors(response) else None
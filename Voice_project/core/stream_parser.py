@@ -0,0 +1,105 @@
+import re
+from typing import List, Optional
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+
+class StreamingResponseParser:
+    """Pulls ``type`` and whole sentences of ``message`` out of a JSON reply while it streams.
+
+    Feed it each content delta; once the reply is known to be an ``assistant`` message it
+    returns the sentences completed so far, so they can be spoken before generation ends.
+    The ``message`` string is decoded by hand (escapes included) since the JSON around it is
+    not complete yet.
+    """
+
+    _TYPE_RE = re.compile(r'"type"\s*:\s*"([^"\\]*)"')
+    _MESSAGE_RE = re.compile(r'"message"\s*:\s*"')
+    _BOUNDARY_RE = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars  # Short fragments ("Hi.", "e.g.") are merged into the next sentence
+        self.buffer = ""
+        self.type: Optional[str] = None
+        self.message = ""
+        self.message_complete = False
+        self._message_start = 0
+        self._message_pos: Optional[int] = None
+        self._emitted = 0
+
+    def feed(self, delta: str) -> List[str]:
+        """Consume the next chunk of model output; returns newly completed sentences."""
+        self.buffer += delta
+        if self._message_pos is None:
+            match = self._MESSAGE_RE.search(self.buffer)
+            if match:
+                self._message_start, self._message_pos = match.start(), match.end()
+        if self._message_pos is not None and not self.message_complete:
+            self._decode()
+        if self.type is None:
+            self._detect_type()
+        return self._sentences()
+
+    def finish(self) -> List[str]:
+        """Flush whatever is left of the message once the stream has ended."""
+        self.message_complete = True
+        return self._sentences()
+
+    @property
+    def spoken(self) -> bool:
+        return self._emitted > 0
+
+    def _detect_type(self) -> None:
+        """Look for ``type`` outside the message string, so quoted text cannot fool it."""
+        if self._message_pos is None:
+            match = self._TYPE_RE.search(self.buffer)
+        else:
+            match = self._TYPE_RE.search(self.buffer, 0, self._message_start)
+            if match is None and self.message_complete:
+                match = self._TYPE_RE.search(self.buffer, self._message_pos)
+        if match:
+            self.type = match.group(1)
+
+    def _decode(self) -> None:
+        buffer, i, out = self.buffer, self._message_pos, []
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.message_complete = True
+                i += 1
+                break
+            if char != '\\':
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break  # Escape split across chunks; wait for the rest
+            code = buffer[i + 1]
+            if code == 'u':
+                if i + 6 > len(buffer):
+                    break
+                try:
+                    out.append(chr(int(buffer[i + 2:i + 6], 16)))
+                except ValueError:
+                    pass
+                i += 6
+            else:
+                out.append(_ESCAPES.get(code, code))
+                i += 2
+        self.message += "".join(out)
+        self._message_pos = i
+
+    def _sentences(self) -> List[str]:
+        if self.type != "assistant":
+            return []
+        pending = self.message[self._emitted:]
+        sentences, start = [], 0
+        for match in self._BOUNDARY_RE.finditer(pending):
+            if match.end() - start < self.min_chars:
+                continue
+            sentences.append(pending[start:match.end()].strip())
+            start = match.end()
+        if self.message_complete and pending[start:].strip():
+            sentences.append(pending[start:].strip())
+            start = len(pending)
+        self._emitted += start
+        return [s for s in sentences if s]
@@ -0,0 +1,67 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+import numpy as np
+
+def _norm(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+def stitch_transcripts(previous: str, new: str, max_overlap_words: int = 8) -> str:
+    """
+    Append ``new`` to ``previous``, dropping words at its start that repeat the end of
+    ``previous`` (segments overlap by a few hundred ms, so a word can be transcribed twice).
+    Comparison ignores case and punctuation; the longest repeated run wins.
+    """
+    prev_words, new_words = previous.split(), new.split()
+    for k in range(min(max_overlap_words, len(prev_words), len(new_words)), 0, -1):
+        if [_norm(w) for w in prev_words[-k:]] == [_norm(w) for w in new_words[:k]]:
+            new_words = new_words[k:]
+            break
+    return " ".join(prev_words + new_words)
+
+class StreamingTranscriber:
+    """Transcribes speech segments in the background while recording continues.
+
+    Segments are transcribed one at a time, in order, on a single worker thread, and stitched
+    into ``text``; ``on_partial`` gets the running transcript after each one. When recording
+    stops, ``finish`` only has to wait for the segments still in flight, normally just the last.
+    """
+
+    def __init__(self, transcribe_fn: Callable[[np.ndarray, int], Optional[str]], sampling_rate: int = 16000,
+                 on_partial: Optional[Callable[[str], None]] = None):
+        self.transcribe_fn = transcribe_fn
+        self.sampling_rate = sampling_rate
+        self.on_partial = on_partial
+        self.text = ""
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr-stream")
+        self._futures: List = []
+        self._cancelled = False
+
+    def add_segment(self, audio: np.ndarray) -> None:
+        self._futures.append(self._pool.submit(self._transcribe, audio))
+
+    def _transcribe(self, audio: np.ndarray) -> None:
+        piece = self.transcribe_fn(audio, self.sampling_rate)
+        if piece and not self._cancelled:
+            self.text = stitch_transcripts(self.text, piece)
+            if self.on_partial:
+                self.on_partial(self.text)
+
+    @property
+    def segments(self) -> int:
+        return len(self._futures)
+
+    def finish(self) -> Optional[str]:
+        """Wait for every segment; the stitched transcript, or None if nothing was understood."""
+        for future in self._futures:
+            try:
+                future.result()
+            except Exception as segment_error:
+                print(f"⚠️ Segment transcription failed: {segment_error}")
+        self._pool.shutdown(wait=False)
+        return self.text or None
+
+    def cancel(self) -> None:
+        """Drop segments not yet started and silence ``on_partial``; safe to call after ``finish``."""
+        self._cancelled = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
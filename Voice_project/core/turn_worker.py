@@ -0,0 +1,77 @@
+import queue
+import threading
+from typing import Callable, Optional
+
+class TurnCancelled(Exception):
+    """Raised inside a turn once a newer input has superseded it."""
+
+class TurnJob:
+    def __init__(self, fn: Callable, args: tuple):
+        self.fn = fn
+        self.args = args
+        self.cancel_event = threading.Event()
+        self.generation = 0
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+class TurnWorker:
+    """Runs conversation turns one at a time on a dedicated thread, off the Tk main loop.
+
+    Submitting a job cancels the one in flight and drops any still queued, so only the newest
+    input is answered. Jobs are called as ``fn(*args, cancel_event=event)`` and are expected to
+    check the event (or let the LLM stream check it) and raise TurnCancelled.
+    """
+
+    def __init__(self, name: str = "turns"):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._current: Optional[TurnJob] = None
+        self._generation = 0  # Bumped by cancel_all; jobs submitted before it are stale
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                # cancel_all may have run after the job left the queue but before it became
+                # current, when it was in neither place; the generation tells
+                if job.generation != self._generation:
+                    job.cancel()
+                if job.cancel_event.is_set():
+                    continue
+                self._current = job
+            try:
+                job.fn(*job.args, cancel_event=job.cancel_event)
+            except TurnCancelled:
+                print("⏹️ Turn cancelled by a newer input")
+            except Exception as e:
+                print(f"❌ Turn failed: {e}")
+            finally:
+                with self._lock:
+                    self._current = None
+
+    def cancel_all(self) -> None:
+        """Cancel the running job and everything queued behind it."""
+        with self._lock:
+            self._generation += 1
+            if self._current:
+                self._current.cancel()
+        while True:
+            try:
+                self._queue.get_nowait().cancel()
+            except queue.Empty:
+                break
+
+    def submit(self, fn: Callable, *args, supersede: bool = True) -> TurnJob:
+        job = TurnJob(fn, args)
+        if supersede:
+            self.cancel_all()
+        with self._lock:
+            job.generation = self._generation
+        self._queue.put(job)
+        return job
+
+    def busy(self) -> bool:
+        with self._lock:
+            return self._current is not None
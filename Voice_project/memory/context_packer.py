@@ -0,0 +1,59 @@
+from typing import List, Dict, Optional
+from .utils.token_counter import TokenCounter, get_token_counter
+
+class PackSection:
+    """One prompt section competing for the token budget.
+
+    ``items`` are kept or dropped whole, in order, so put the most valuable item first (for
+    recent history that means newest first; pass ``reverse_output=True`` to render it back in
+    chronological order). The first item that does not fit is truncated to fill the remainder.
+    """
+
+    def __init__(self, name: str, items: List[str], priority: int, max_tokens: Optional[int] = None,
+                 separator: str = "\n", reverse_output: bool = False, empty_text: str = ""):
+        self.name = name
+        self.items = items
+        self.priority = priority
+        self.max_tokens = max_tokens
+        self.separator = separator
+        self.reverse_output = reverse_output
+        self.empty_text = empty_text
+
+class ContextPacker:
+    """Fills prompt sections up to an exact token budget, highest priority first."""
+
+    def __init__(self, budget: int, counter: Optional[TokenCounter] = None):
+        self.budget = budget
+        self.counter = counter or get_token_counter()
+
+    def pack(self, sections: List[PackSection]) -> Dict[str, str]:
+        """Rendered text per section name; the sum of their token counts never exceeds the budget."""
+        remaining = self.budget
+        packed: Dict[str, str] = {}
+        for section in sorted(sections, key=lambda s: s.priority):
+            allowance = remaining if section.max_tokens is None else min(remaining, section.max_tokens)
+            separator_tokens = self.counter.count(section.separator) if section.separator.strip() else 1
+            counts = self.counter.count_batch(section.items)
+            kept, used = [], 0
+            for item, tokens in zip(section.items, counts):
+                cost = tokens + (separator_tokens if kept else 0)
+                if used + cost <= allowance:
+                    kept.append(item)
+                    used += cost
+                    continue
+                room = allowance - used - (separator_tokens if kept else 0)
+                if room > 0:
+                    kept.append(self.counter.truncate(item, room))
+                    used = allowance
+                break
+            if section.reverse_output:
+                kept.reverse()
+            text = section.separator.join(kept) or section.empty_text
+            used = self.counter.count(text) if text else 0  # Exact count of what is actually sent
+            if used > allowance:
+                # Tokens can merge across item boundaries; trim the joined text to be exact
+                text = self.counter.truncate(text, allowance)
+                used = self.counter.count(text) if text else 0
+            remaining -= used
+            packed[section.name] = text
+        return packed
@@ -0,0 +1,167 @@
+import numpy as np
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+class EmbeddingCache:
+    """Two-tier cache of text embeddings keyed by a hash of the normalised text.
+
+    Tier one is an in-process LRU of recent vectors. Tier two lives on disk as a flat float32
+    file (read through a memory map) plus a parallel file of keys, one per row, so every
+    embedding ever computed survives restarts and costs a page read instead of a forward pass.
+    """
+
+    def __init__(self, cache_dir: str = "memory/embedding_cache", dim: int = 384, lru_size: int = 2048):
+        self.dim = dim
+        self.lru_size = lru_size
+        self.vectors_file = os.path.join(cache_dir, "vectors.f32")
+        self.keys_file = os.path.join(cache_dir, "keys.txt")
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._rows: Dict[str, int] = {}
+        self._row_count = 0
+        self._keys_size = 0
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+        self._vectors_out = open(self.vectors_file, 'ab')
+        self._keys_out = open(self.keys_file, 'a', encoding='utf-8')
+
+    @staticmethod
+    def key(text: str) -> str:
+        """Hash of the text with case and whitespace normalised.
+
+        all-MiniLM-L6-v2 is uncased and splits on whitespace, so this normalisation never maps
+        two texts with different embeddings to the same key.
+        """
+        normalized = " ".join(text.lower().split())
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    def _load(self) -> None:
+        """Read the key file and drop any rows left half-written by a crash."""
+        keys: List[str] = []
+        if os.path.exists(self.keys_file):
+            with open(self.keys_file, 'r', encoding='utf-8') as f:
+                keys = [line.strip() for line in f if len(line.strip()) == 40]
+        row_bytes = self.dim * 4
+        stored_rows = os.path.getsize(self.vectors_file) // row_bytes if os.path.exists(self.vectors_file) else 0
+        rows = min(len(keys), stored_rows)
+        if os.path.exists(self.vectors_file) and os.path.getsize(self.vectors_file) != rows * row_bytes:
+            os.truncate(self.vectors_file, rows * row_bytes)
+        if len(keys) != rows:
+            keys = keys[:rows]
+            with open(self.keys_file, 'w', encoding='utf-8') as f:
+                f.write("".join(k + "\n" for k in keys))
+        for row, k in enumerate(keys):
+            self._rows.setdefault(k, row)
+        # Rows on disk, not distinct keys: a duplicate key still occupies a row
+        self._row_count = rows
+        self._keys_size = os.path.getsize(self.keys_file) if os.path.exists(self.keys_file) else 0
+
+    def _read_row(self, row: int) -> np.ndarray:
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            # The file only grows, so remap lazily when a newer row is requested
+            self._vectors_out.flush()
+            rows = os.path.getsize(self.vectors_file) // (self.dim * 4)
+            self._mmap = np.memmap(self.vectors_file, dtype=np.float32, mode='r', shape=(rows, self.dim))
+        return np.array(self._mmap[row])
+
+    def _remember(self, k: str, vector: np.ndarray) -> None:
+        self._lru[k] = vector
+        self._lru.move_to_end(k)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for text, or None."""
+        k = self.key(text)
+        with self._lock:
+            return self._get(k)
+
+    def _get(self, k: str) -> Optional[np.ndarray]:
+        vector = self._lru.get(k)
+        if vector is not None:
+            self._lru.move_to_end(k)
+            self.stats["memory_hits"] += 1
+            return vector
+        row = self._rows.get(k)
+        if row is not None:
+            vector = self._read_row(row)
+            self._remember(k, vector)
+            self.stats["disk_hits"] += 1
+            return vector
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        """Store an embedding in both tiers."""
+        with self._lock:
+            self._put(self.key(text), np.asarray(vector, dtype=np.float32).reshape(self.dim))
+
+    def _put(self, k: str, vector: np.ndarray) -> None:
+        self._remember(k, vector)
+        if k in self._rows:
+            return
+        try:
+            # Vector before key: on reload a key never points past the end of the vector file
+            self._vectors_out.write(vector.tobytes())
+            self._vectors_out.flush()
+            self._keys_out.write(k + "\n")
+            self._keys_out.flush()
+        except IOError as e:
+            print(f"⚠️ Error writing embedding cache: {e}")
+            self._rollback()
+            return
+        self._rows[k] = self._row_count
+        self._row_count += 1
+        self._keys_size += len(k) + 1
+
+    def _rollback(self) -> None:
+        """Cut both files back to the last complete row after a failed write, so rows stay aligned."""
+        for handle in (self._vectors_out, self._keys_out):
+            try:
+                handle.close()  # Discards whatever the failed flush left in the buffer
+            except (IOError, ValueError):
+                pass
+        self._mmap = None
+        try:
+            os.truncate(self.vectors_file, self._row_count * self.dim * 4)
+            os.truncate(self.keys_file, self._keys_size)
+        except OSError as e:
+            print(f"⚠️ Error rolling back embedding cache: {e}")
+        self._vectors_out = open(self.vectors_file, 'ab')
+        self._keys_out = open(self.keys_file, 'a', encoding='utf-8')
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Embed texts, running encode_fn once over just the cache misses."""
+        keys = [self.key(text) for text in texts]
+        result = np.empty((len(texts), self.dim), dtype=np.float32)
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, k in enumerate(keys):
+                vector = self._get(k) if k not in missing else None
+                if vector is None:
+                    missing.setdefault(k, []).append(i)
+                else:
+                    result[i] = vector
+        if missing:
+            first_texts = [texts[positions[0]] for positions in missing.values()]
+            encoded = np.asarray(encode_fn(first_texts), dtype=np.float32).reshape(len(first_texts), self.dim)
+            with self._lock:
+                for (k, positions), vector in zip(missing.items(), encoded):
+                    result[positions] = vector
+                    self._put(k, vector)
+        return result
+
+    def hit_rate(self) -> float:
+        total = sum(self.stats.values())
+        return (self.stats["memory_hits"] + self.stats["disk_hits"]) / total if total else 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            self._vectors_out.close()
+            self._keys_out.close()
+            self._mmap = None
@@ -0,0 +1,131 @@
+import numpy as np
+import bisect
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple
+from .tiered_index import TieredIndex
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = 60) -> List[int]:
+    """Merge ranked id lists; each list contributes 1 / (k + rank) per id."""
+    scores: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+class LexicalIndex:
+    """Incremental BM25 inverted index plus metadata postings for prefiltering.
+
+    Document ids are the same row ids the vector index uses, so both retrievers can be fused
+    and filtered with one candidate set.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.doc_lengths: List[int] = []
+        self.total_length = 0
+        self.by_session: Dict[str, List[int]] = defaultdict(list)
+        self.by_role: Dict[str, List[int]] = defaultdict(list)
+        self.timestamps: List[str] = []
+        self._timestamps_sorted = True
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, text: str, metadata: Dict) -> int:
+        doc_id = len(self.doc_lengths)
+        terms = tokenize(text)
+        for term in terms:
+            posting = self.postings[term]
+            posting[doc_id] = posting.get(doc_id, 0) + 1
+        self.doc_lengths.append(len(terms))
+        self.total_length += len(terms)
+        if metadata.get("session_id") is not None:
+            self.by_session[metadata["session_id"]].append(doc_id)
+        if metadata.get("role") is not None:
+            self.by_role[metadata["role"]].append(doc_id)
+        timestamp = metadata.get("timestamp") or ""
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            self._timestamps_sorted = False
+        self.timestamps.append(timestamp)
+        return doc_id
+
+    def filter(self, session_id: Optional[str] = None, since: Optional[str] = None,
+               until: Optional[str] = None, role: Optional[str] = None) -> Optional[np.ndarray]:
+        """Sorted ids matching every given filter, or None when no filter is set."""
+        selections = []
+        if session_id is not None:
+            selections.append(np.asarray(self.by_session.get(session_id, []), dtype=np.int64))
+        if role is not None:
+            selections.append(np.asarray(self.by_role.get(role, []), dtype=np.int64))
+        if since is not None or until is not None:
+            if self._timestamps_sorted:
+                # Messages are indexed in arrival order, so a time window is a contiguous id range
+                start = bisect.bisect_left(self.timestamps, since) if since is not None else 0
+                end = bisect.bisect_left(self.timestamps, until) if until is not None else len(self.timestamps)
+                selections.append(np.arange(start, end, dtype=np.int64))
+            else:
+                selections.append(np.asarray([i for i, ts in enumerate(self.timestamps)
+                                              if (since is None or ts >= since) and (until is None or ts < until)],
+                                             dtype=np.int64))
+        if not selections:
+            return None
+        selections.sort(key=len)
+        result = selections[0]
+        for selection in selections[1:]:
+            result = np.intersect1d(result, selection, assume_unique=True)
+        return result
+
+    def search(self, query: str, k: int, candidates: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Top-k BM25 matches, scoring only candidate ids when a filter is given."""
+        if not self.doc_lengths:
+            return []
+        allowed = set(candidates.tolist()) if candidates is not None else None
+        doc_count = len(self.doc_lengths)
+        avg_length = self.total_length / doc_count or 1.0
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            if allowed is None:
+                matches = posting.items()
+            elif len(allowed) < len(posting):
+                matches = ((doc_id, posting[doc_id]) for doc_id in allowed if doc_id in posting)
+            else:
+                matches = ((doc_id, tf) for doc_id, tf in posting.items() if doc_id in allowed)
+            for doc_id, tf in matches:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+class HybridRetriever:
+    """Dense + BM25 retrieval fused with reciprocal rank fusion, with metadata prefilters."""
+
+    def __init__(self, index: TieredIndex, lexical: LexicalIndex, pool_size: int = 20, rrf_k: int = 60):
+        self.index = index
+        self.lexical = lexical
+        self.pool_size = pool_size
+        self.rrf_k = rrf_k
+
+    def search(self, query: str, query_vector: np.ndarray, k: int = 2, session_id: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None, role: Optional[str] = None) -> List[int]:
+        """Row ids of the k best matches among the rows passing every filter."""
+        candidates = self.lexical.filter(session_id=session_id, since=since, until=until, role=role)
+        if candidates is not None and len(candidates) == 0:
+            return []
+        pool = max(self.pool_size, k)
+        _, dense_ids = self.index.search(query_vector.reshape(1, -1), pool, ids=candidates)
+        dense_ranking = [int(i) for i in dense_ids[0] if i >= 0]
+        lexical_ranking = [doc_id for doc_id, _ in self.lexical.search(query, pool, candidates)]
+        return reciprocal_rank_fusion([dense_ranking, lexical_ranking], k=self.rrf_k)[:k]
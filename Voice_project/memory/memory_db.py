@@ -1,14 +1,23 @@
 from .session_manager import SessionManager
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class MemoryDB:
     def __init__(self, session_manager: SessionManager):
+        """Works with either SessionManager (JSONL files) or SQLiteSessionManager."""
         self.session_manager = session_manager
 
-    def add_message(self, role: str, content: str) -> None:
+    def add_message(self, role: str, content: str) -> Optional[Dict]:
         """Add a message to the current session."""
-        self.session_manager.add_message_to_session(role, content)
+        return self.session_manager.add_message_to_session(role, content)
 
     def get_recent_messages(self, n: int = 5) -> List[Dict]:
         """Retrieve the last N messages from the current session."""
-        return self.session_manager.get_last_n_messages(n)
\ No newline at end of file
+        return self.session_manager.get_last_n_messages(n)
+
+    def get_messages_between(self, since=None, until=None, session_id: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Messages from any session in a time window, e.g. everything since a week ago."""
+        return self.session_manager.get_messages_between(since, until, session_id=session_id, limit=limit)
+
+    def search(self, query: str, limit: int = 10, session_id: Optional[str] = None, since=None, until=None) -> List[Dict]:
+        """Keyword search across all sessions."""
+        return self.session_manager.search_messages(query, limit=limit, session_id=session_id, since=since, until=until)
@@ -1,13 +1,19 @@
 from .session_manager import SessionManager
+from .sqlite_store import SQLiteSessionManager
 from .memory_db import MemoryDB
 from .vector_db import VectorDB
 from .summarizer import Summarizer
 from .user_profile import UserProfileManager
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 class MemoryManager:
-    def __init__(self):
-        self.session_manager = SessionManager()
+    def __init__(self, backend: str = "json"):
+        if backend == "sqlite":
+            self.session_manager = SQLiteSessionManager()
+        elif backend == "json":
+            self.session_manager = SessionManager()
+        else:
+            raise ValueError(f"Unknown memory backend: {backend}")
         self.memory_db = MemoryDB(self.session_manager)
         self.vector_db = VectorDB()
         self.summarizer = Summarizer()
@@ -20,26 +26,29 @@ class MemoryManager:
         if message:
             self.vector_db.add_message(content, {
                 "session_id": self.current_session_id,
-                "message_id": len(self.session_manager.current_session["messages"]) - 1,
+                "message_id": self.session_manager.current_session["message_count"] - 1,
                 "timestamp": message["timestamp"],
+                "role": role,
                 "topics": []  # Can be extended with topic extraction
             })
 
-    def get_context_for_llm(self, query: str) -> Dict[str, Any]:
-        """Prepare context for LLM query."""
-        recent_messages = self.memory_db.get_recent_messages(5)
-        similar_messages = self.vector_db.search_similar(query, k=2)
+    def get_context_for_llm(self, query: str, session_id: Optional[str] = None, since: Optional[str] = None,
+                            until: Optional[str] = None, role: Optional[str] = None) -> Dict[str, Any]:
+        """Prepare context for LLM query; the filters narrow which past messages are retrieved."""
+        recent_messages = self.memory_db.get_recent_messages(self.summarizer.keep_recent)
+        similar_messages = self.vector_db.search_hybrid(query, k=2, session_id=session_id, since=since,
+                                                        until=until, role=role)
         relevant_past = [msg["text"] for msg in similar_messages]
         user_profile = self.user_profile_manager.get_profile()
 
-        all_messages = recent_messages
-        if self.summarizer.check_token_limit(all_messages):
-            all_messages = self.summarizer.summarize_old_messages(all_messages)
+        # Summaries are built in the background; here we only read the latest checkpoint
+        session = self.session_manager.current_session
+        self.summarizer.maybe_schedule(self.current_session_id, session["messages"], session["message_count"])
 
         context = {
             "user_profile": user_profile,
-            "summary": all_messages[0]["content"] if all_messages and all_messages[0]["role"] == "system" else "",
-            "recent_messages": all_messages if not all_messages or all_messages[0]["role"] != "system" else all_messages[1:],
+            "summary": self.summarizer.get_summary(self.current_session_id),
+            "recent_messages": recent_messages,
             "relevant_past": relevant_past
         }
         return context
@@ -0,0 +1,193 @@
+import faiss
+import numpy as np
+import json
+import os
+import re
+import threading
+from typing import List, Dict, Optional, Tuple
+
+_SEGMENT_RE = re.compile(r"^seg_(\d{6})\.(vec|jsonl)$")
+
+class SegmentStore:
+    """Append-only on-disk format for the vector index.
+
+    The directory holds one compacted snapshot (``snapshot_<n>.faiss`` + ``snapshot_<n>.json``)
+    plus write-ahead segments (``seg_<n>.vec`` raw float32 rows, ``seg_<n>.jsonl`` one record
+    per line). ``manifest.json`` names the live snapshot and the last segment it already covers,
+    and is only ever replaced atomically, so a crash at any point leaves a loadable state.
+    """
+
+    def __init__(self, index_dir: str = "memory/faiss_index", dim: int = 384,
+                 segment_max_records: int = 1000, compact_after_segments: int = 8, fsync: bool = True):
+        self.index_dir = index_dir
+        self.dim = dim
+        self.segment_max_records = segment_max_records
+        self.compact_after_segments = compact_after_segments
+        self.fsync = fsync
+        self.manifest_file = os.path.join(index_dir, "manifest.json")
+        self.legacy_index_file = os.path.join(index_dir, "index.faiss")
+        self.legacy_texts_file = os.path.join(index_dir, "texts.json")
+        self.manifest: Dict = {"snapshot": None, "covers_through": 0}
+        self._lock = threading.Lock()
+        self._active_id: Optional[int] = None
+        self._active_count = 0
+        self._vec_file = None
+        self._meta_file = None
+        self._next_id = 1
+        os.makedirs(index_dir, exist_ok=True)
+
+    def _segment_path(self, segment_id: int, ext: str) -> str:
+        return os.path.join(self.index_dir, f"seg_{segment_id:06d}.{ext}")
+
+    def _snapshot_path(self, name: str, ext: str) -> str:
+        return os.path.join(self.index_dir, f"{name}.{ext}")
+
+    def _segment_ids(self) -> List[int]:
+        ids = set()
+        for name in os.listdir(self.index_dir):
+            match = _SEGMENT_RE.match(name)
+            if match:
+                ids.add(int(match.group(1)))
+        return sorted(ids)
+
+    def _fsync(self, f) -> None:
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def load(self) -> Tuple[Optional[faiss.Index], List[Dict], np.ndarray, List[Dict]]:
+        """Load the snapshot and replay newer segments.
+
+        Returns ``(snapshot_index, snapshot_texts, replay_vectors, replay_texts)``; the caller adds
+        the replayed rows on top of the snapshot index.
+        """
+        for name in os.listdir(self.index_dir):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.index_dir, name))
+
+        index, texts = None, []
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            snapshot = self.manifest.get("snapshot")
+            if snapshot:
+                index = faiss.read_index(self._snapshot_path(snapshot, "faiss"))
+                with open(self._snapshot_path(snapshot, "json"), 'r', encoding='utf-8') as f:
+                    texts = json.load(f)
+        elif os.path.exists(self.legacy_index_file):
+            # Pre-segment layout: treat the old full dump as the initial snapshot
+            index = faiss.read_index(self.legacy_index_file)
+            with open(self.legacy_texts_file, 'r', encoding='utf-8') as f:
+                texts = json.load(f)
+
+        covers_through = self.manifest.get("covers_through", 0)
+        segment_ids = self._segment_ids()
+        vectors, records = [], []
+        for segment_id in segment_ids:
+            if segment_id <= covers_through:
+                continue
+            seg_vectors, seg_records = self._read_segment(segment_id)
+            vectors.append(seg_vectors)
+            records.extend(seg_records)
+
+        # Never append to a segment left over from a previous run: its tail may be torn
+        self._next_id = max(segment_ids + [covers_through]) + 1
+        replay = np.concatenate(vectors) if vectors else np.zeros((0, self.dim), dtype=np.float32)
+        return index, texts, replay, records
+
+    def _read_segment(self, segment_id: int) -> Tuple[np.ndarray, List[Dict]]:
+        """Read one segment, keeping only rows present in both the vector and record files."""
+        vec_path = self._segment_path(segment_id, "vec")
+        meta_path = self._segment_path(segment_id, "jsonl")
+        vectors = np.zeros((0, self.dim), dtype=np.float32)
+        if os.path.exists(vec_path):
+            raw = np.fromfile(vec_path, dtype=np.float32)
+            rows = raw.size // self.dim
+            vectors = raw[:rows * self.dim].reshape(rows, self.dim)
+        records = []
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        print(f"⚠️ Truncated record in segment {segment_id}, ignoring the rest")
+                        break
+        count = min(len(vectors), len(records))
+        return vectors[:count], records[:count]
+
+    def append(self, vectors: np.ndarray, records: List[Dict]) -> None:
+        """Append rows to the active segment; cost depends only on the batch size."""
+        with self._lock:
+            if self._active_id is None or self._active_count >= self.segment_max_records:
+                self._open_segment()
+            # Vectors first: on replay a record without its vector is dropped, never misaligned
+            self._vec_file.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            self._fsync(self._vec_file)
+            self._meta_file.write("".join(json.dumps(record) + "\n" for record in records))
+            self._fsync(self._meta_file)
+            self._active_count += len(records)
+
+    def _open_segment(self) -> None:
+        self._close_segment()
+        self._active_id = self._next_id
+        self._next_id += 1
+        self._active_count = 0
+        self._vec_file = open(self._segment_path(self._active_id, "vec"), 'ab')
+        self._meta_file = open(self._segment_path(self._active_id, "jsonl"), 'a', encoding='utf-8')
+
+    def _close_segment(self) -> None:
+        if self._vec_file:
+            self._vec_file.close()
+            self._meta_file.close()
+        self._vec_file = self._meta_file = None
+        self._active_id = None
+
+    def seal(self) -> Optional[int]:
+        """Close the active segment and return the id of the newest segment on disk, if any."""
+        with self._lock:
+            self._close_segment()
+            return self._next_id - 1 if self._next_id - 1 > self.manifest.get("covers_through", 0) else None
+
+    def needs_compaction(self) -> bool:
+        """True when enough segments have piled up since the last snapshot."""
+        return self._next_id - 1 - self.manifest.get("covers_through", 0) >= self.compact_after_segments
+
+    def write_snapshot(self, index: faiss.Index, texts: List[Dict], covers_through: int) -> None:
+        """Write a new snapshot covering every segment up to ``covers_through`` and drop them."""
+        name = f"snapshot_{covers_through:06d}"
+        index_path = self._snapshot_path(name, "faiss")
+        texts_path = self._snapshot_path(name, "json")
+        faiss.write_index(index, index_path + ".tmp")
+        with open(texts_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(texts, f)
+            self._fsync(f)
+        os.replace(index_path + ".tmp", index_path)
+        os.replace(texts_path + ".tmp", texts_path)
+
+        old_snapshot = self.manifest.get("snapshot")
+        manifest = {"snapshot": name, "covers_through": covers_through}
+        with open(self.manifest_file + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+            self._fsync(f)
+        os.replace(self.manifest_file + ".tmp", self.manifest_file)
+        self.manifest = manifest
+
+        # Everything below is garbage collection; a crash here only leaves stale files behind
+        for segment_id in self._segment_ids():
+            if segment_id <= covers_through:
+                for ext in ("vec", "jsonl"):
+                    path = self._segment_path(segment_id, ext)
+                    if os.path.exists(path):
+                        os.remove(path)
+        stale = [self.legacy_index_file, self.legacy_texts_file]
+        if old_snapshot and old_snapshot != name:
+            stale += [self._snapshot_path(old_snapshot, "faiss"), self._snapshot_path(old_snapshot, "json")]
+        for path in stale:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close(self) -> None:
+        """Close the active segment files."""
+        with self._lock:
+            self._close_segment()
@@ -1,49 +1,199 @@
 import json
 import os
 import uuid
+import time
+import atexit
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
+from .utils.token_counter import get_token_counter
 
 class SessionManager:
-    def __init__(self, sessions_dir: str = "memory/sessions"):
+    """Stores each session as an append-only JSONL log.
+
+    The first line of ``<session_id>.jsonl`` is a header with the session id and start time,
+    every following line is one message. Adding a message appends a single line; fsyncs are
+    batched every ``fsync_every`` messages or ``fsync_interval`` seconds.
+    """
+
+    def __init__(self, sessions_dir: str = "memory/sessions", fsync_every: int = 8,
+                 fsync_interval: float = 2.0, compact_every: int = 0):
         self.sessions_dir = sessions_dir
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every  # 0 disables periodic compaction
         os.makedirs(sessions_dir, exist_ok=True)
         self.current_session: Optional[Dict] = None
+        self._log = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.RLock()
+        atexit.register(self.close)
+
+    def _session_file(self, session_id: str) -> str:
+        return os.path.join(self.sessions_dir, f"{session_id}.jsonl")
+
+    def _legacy_session_file(self, session_id: str) -> str:
+        return os.path.join(self.sessions_dir, f"{session_id}.json")
 
     def start_new_session(self) -> str:
         """Start a new session with a unique ID."""
         session_id = f"session_{uuid.uuid4().hex}"
-        self.current_session = {
-            "session_id": session_id,
-            "start_time": datetime.now().isoformat(),
-            "messages": []
-        }
-        self._save_session()
+        with self._lock:
+            self.current_session = {
+                "session_id": session_id,
+                "start_time": datetime.now().isoformat(),
+                "messages": [],
+                "message_count": 0
+            }
+            self._open_log()
+            self._append_line(self._header())
+            self._sync()
         return session_id
 
-    def load_session(self, session_id: str) -> bool:
-        """Load an existing session by ID."""
-        session_file = os.path.join(self.sessions_dir, f"{session_id}.json")
+    def load_session(self, session_id: str, last_n: Optional[int] = None) -> bool:
+        """Load an existing session by ID; with last_n only the tail of the log is parsed."""
+        session_file = self._session_file(session_id)
         try:
-            if os.path.exists(session_file):
-                with open(session_file, 'r', encoding='utf-8') as f:
-                    self.current_session = json.load(f)
+            with self._lock:
+                if not os.path.exists(session_file):
+                    if not os.path.exists(self._legacy_session_file(session_id)):
+                        return False
+                    self._migrate_legacy_session(session_id)
+                header = self._read_header(session_file)
+                messages = self.tail_messages(session_id, last_n) if last_n is not None else list(self.iter_messages(session_id))
+                self._close_log()
+                self.current_session = {
+                    "session_id": session_id,
+                    "start_time": header.get("start_time"),
+                    "messages": messages,
+                    "message_count": self._count_lines(session_file) - 1
+                }
+                self._open_log()
                 return True
-            return False
         except (json.JSONDecodeError, IOError) as e:
             print(f"⚠️ Error loading session {session_id}: {e}")
             return False
 
-    def _save_session(self) -> None:
-        """Save the current session to disk."""
-        if not self.current_session:
-            return
-        session_file = os.path.join(self.sessions_dir, f"{self.current_session['session_id']}.json")
+    def _migrate_legacy_session(self, session_id: str) -> None:
+        """Convert a pre-JSONL ``<session_id>.json`` file into a log."""
+        legacy_file = self._legacy_session_file(session_id)
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            session = json.load(f)
+        self._write_log(self._session_file(session_id),
+                        {"session_id": session_id, "start_time": session.get("start_time")},
+                        session.get("messages", []))
+        os.remove(legacy_file)
+
+    def _read_header(self, session_file: str) -> Dict:
+        with open(session_file, 'r', encoding='utf-8') as f:
+            return json.loads(f.readline())
+
+    @staticmethod
+    def _count_lines(path: str) -> int:
+        count = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                count += block.count(b'\n')
+        return count
+
+    @staticmethod
+    def _parse_message(line) -> Optional[Dict]:
         try:
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(self.current_session, f, indent=2)
-        except IOError as e:
-            print(f"❌ Error saving session: {e}")
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            return None  # Torn write from a crash
+        if not isinstance(record, dict) or "session_id" in record:
+            return None  # Header
+        return record
+
+    def iter_messages(self, session_id: str) -> Iterator[Dict]:
+        """Stream the messages of a session one line at a time."""
+        with open(self._session_file(session_id), 'r', encoding='utf-8') as f:
+            for line in f:
+                message = self._parse_message(line)
+                if message is not None:
+                    yield message
+
+    def tail_messages(self, session_id: str, n: int, block_size: int = 8192) -> List[Dict]:
+        """Return the last n messages, reading the log backwards from the end."""
+        if n <= 0:
+            return []
+        with open(self._session_file(session_id), 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            while position > 0 and data.count(b'\n') <= n:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        lines = data.splitlines()
+        if position > 0:
+            lines = lines[1:]  # Starts mid-line
+        messages = [m for m in (self._parse_message(line) for line in lines) if m is not None]
+        return messages[-n:]
+
+    def _header(self) -> Dict:
+        return {"session_id": self.current_session["session_id"], "start_time": self.current_session["start_time"]}
+
+    def _open_log(self) -> None:
+        self._close_log()
+        session_file = self._session_file(self.current_session["session_id"])
+        torn_tail = False
+        if os.path.exists(session_file) and os.path.getsize(session_file):
+            with open(session_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn_tail = f.read(1) != b'\n'
+        self._log = open(session_file, 'a', encoding='utf-8')
+        if torn_tail:
+            self._log.write("\n")  # Keep the next message off the half-written line
+
+    def _close_log(self) -> None:
+        if self._log:
+            self._sync()
+            self._log.close()
+            self._log = None
+
+    def _append_line(self, record: Dict) -> None:
+        self._log.write(json.dumps(record) + "\n")
+        self._log.flush()  # Survives a process crash; fsync below covers power loss
+        self._unsynced += 1
+
+    def _sync(self) -> None:
+        if self._log and self._unsynced:
+            os.fsync(self._log.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def _write_log(self, path: str, header: Dict, messages: List[Dict]) -> None:
+        """Atomically write a complete log."""
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header) + "\n")
+            for message in messages:
+                f.write(json.dumps(message) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def compact_session(self, session_id: Optional[str] = None) -> None:
+        """Rewrite a log without torn or stray lines."""
+        with self._lock:
+            if session_id is None:
+                if not self.current_session:
+                    return
+                session_id = self.current_session["session_id"]
+            is_current = self.current_session is not None and session_id == self.current_session["session_id"]
+            session_file = self._session_file(session_id)
+            if is_current:
+                self._close_log()
+            try:
+                self._write_log(session_file, self._read_header(session_file), list(self.iter_messages(session_id)))
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"❌ Error compacting session {session_id}: {e}")
+            finally:
+                if is_current:
+                    self._open_log()
 
     def add_message_to_session(self, role: str, content: str) -> Optional[Dict]:
         """Add a message to the current session."""
@@ -52,14 +202,60 @@ class SessionManager:
         message = {
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
+            "tokens": get_token_counter().count(content)  # Cached so budgets never recount
         }
-        self.current_session["messages"].append(message)
-        self._save_session()
+        with self._lock:
+            try:
+                self._append_line(message)
+                if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                    self._sync()
+            except IOError as e:
+                print(f"❌ Error saving session: {e}")
+            self.current_session["messages"].append(message)
+            self.current_session["message_count"] += 1
+            if self.compact_every and self.current_session["message_count"] % self.compact_every == 0:
+                self.compact_session()
         return message
 
     def get_last_n_messages(self, n: int = 5) -> List[Dict]:
         """Get the last N messages from the current session."""
         if not self.current_session:
             return []
-        return self.current_session["messages"][-n:]
\ No newline at end of file
+        return self.current_session["messages"][-n:]
+
+    def _iter_all_messages(self) -> Iterator[Dict]:
+        for name in sorted(os.listdir(self.sessions_dir)):
+            if name.endswith(".jsonl"):
+                session_id = name[:-len(".jsonl")]
+                for message in self.iter_messages(session_id):
+                    yield dict(message, session_id=session_id)
+
+    def get_messages_between(self, since=None, until=None, session_id: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Messages from any session in [since, until), oldest first. Scans every log; see SQLiteSessionManager."""
+        since = since.isoformat() if isinstance(since, datetime) else since
+        until = until.isoformat() if isinstance(until, datetime) else until
+        matches = [m for m in self._iter_all_messages()
+                   if (session_id is None or m["session_id"] == session_id)
+                   and (since is None or m.get("timestamp", "") >= since)
+                   and (until is None or m.get("timestamp", "") < until)]
+        return sorted(matches, key=lambda m: m.get("timestamp", ""))[:limit]
+
+    def search_messages(self, query: str, limit: int = 10, session_id: Optional[str] = None,
+                        since=None, until=None) -> List[Dict]:
+        """Keyword search across sessions, most matching terms first. Scans every log."""
+        terms = set(query.lower().split())
+        if not terms:
+            return []
+        scored = []
+        for message in self.get_messages_between(since, until, session_id, limit=None):
+            score = len(terms & set(message.get("content", "").lower().split()))
+            if score:
+                scored.append((score, message))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [message for _, message in scored[:limit]]
+
+    def close(self) -> None:
+        """Fsync and close the current log (registered with atexit)."""
+        with self._lock:
+            self._close_log()
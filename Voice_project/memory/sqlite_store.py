@@ -0,0 +1,237 @@
+import sqlite3
+import json
+import os
+import uuid
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Iterator, Union
+from .utils.token_counter import get_token_counter
+
+TimeBound = Optional[Union[str, datetime]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    start_time TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session_ts ON messages(session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_messages_session_seq ON messages(session_id, seq);
+CREATE INDEX IF NOT EXISTS idx_messages_ts ON messages(timestamp);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+# Statements are module constants with bound parameters so sqlite3's statement cache reuses them
+_INSERT_SESSION = "INSERT INTO sessions (session_id, start_time) VALUES (?, ?)"
+_SELECT_SESSION = "SELECT start_time FROM sessions WHERE session_id = ?"
+_INSERT_MESSAGE = "INSERT INTO messages (session_id, seq, role, content, timestamp, tokens) VALUES (?, ?, ?, ?, ?, ?)"
+_COUNT_MESSAGES = "SELECT COUNT(*) FROM messages WHERE session_id = ?"
+_SELECT_ALL = "SELECT role, content, timestamp, tokens FROM messages WHERE session_id = ? ORDER BY seq"
+_SELECT_TAIL = ("SELECT role, content, timestamp, tokens FROM "
+                "(SELECT seq, role, content, timestamp, tokens FROM messages WHERE session_id = ? ORDER BY seq DESC LIMIT ?) "
+                "ORDER BY seq")
+_SELECT_RANGE = ("SELECT session_id, role, content, timestamp, tokens FROM messages "
+                 "WHERE timestamp >= ? AND timestamp < ? AND (? IS NULL OR session_id = ?) "
+                 "ORDER BY timestamp LIMIT ?")
+_SEARCH_FTS = ("SELECT m.session_id, m.role, m.content, m.timestamp, m.tokens FROM messages_fts "
+               "JOIN messages m ON m.id = messages_fts.rowid "
+               "WHERE messages_fts MATCH ? AND m.timestamp >= ? AND m.timestamp < ? "
+               "AND (? IS NULL OR m.session_id = ?) "
+               "ORDER BY bm25(messages_fts) LIMIT ?")
+_SEARCH_LIKE = ("SELECT session_id, role, content, timestamp, tokens FROM messages "
+                "WHERE content LIKE ? AND timestamp >= ? AND timestamp < ? AND (? IS NULL OR session_id = ?) "
+                "ORDER BY timestamp DESC LIMIT ?")
+
+_MIN_TIME = ""
+_MAX_TIME = "\uffff"  # Sorts after any ISO timestamp
+
+def _time_bound(value: TimeBound, default: str) -> str:
+    if value is None:
+        return default
+    return value.isoformat() if isinstance(value, datetime) else value
+
+class SQLiteSessionManager:
+    """SessionManager with the same interface, backed by one SQLite database.
+
+    Messages of every session live in one indexed table, with an FTS5 index over their content,
+    so cross-session and time-window lookups are indexed queries instead of directory scans.
+    """
+
+    def __init__(self, db_path: str = "memory/memory.db"):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.current_session: Optional[Dict] = None
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=64)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(messages)")}
+        if "tokens" not in columns:
+            self._conn.execute("ALTER TABLE messages ADD COLUMN tokens INTEGER")
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            print("⚠️ SQLite was built without FTS5, falling back to LIKE search")
+            self.has_fts = False
+        self._conn.commit()
+
+    def start_new_session(self) -> str:
+        """Start a new session with a unique ID."""
+        session_id = f"session_{uuid.uuid4().hex}"
+        start_time = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(_INSERT_SESSION, (session_id, start_time))
+        self.current_session = {
+            "session_id": session_id,
+            "start_time": start_time,
+            "messages": [],
+            "message_count": 0
+        }
+        return session_id
+
+    def load_session(self, session_id: str, last_n: Optional[int] = None) -> bool:
+        """Load an existing session by ID; with last_n only the newest messages are read."""
+        try:
+            with self._lock:
+                row = self._conn.execute(_SELECT_SESSION, (session_id,)).fetchone()
+                if row is None:
+                    return False
+                messages = self.tail_messages(session_id, last_n) if last_n is not None else list(self.iter_messages(session_id))
+                count = self._conn.execute(_COUNT_MESSAGES, (session_id,)).fetchone()[0]
+            self.current_session = {
+                "session_id": session_id,
+                "start_time": row[0],
+                "messages": messages,
+                "message_count": count
+            }
+            return True
+        except sqlite3.Error as e:
+            print(f"⚠️ Error loading session {session_id}: {e}")
+            return False
+
+    @staticmethod
+    def _message(row) -> Dict:
+        message = {"role": row[0], "content": row[1], "timestamp": row[2]}
+        if row[3] is not None:
+            message["tokens"] = row[3]
+        return message
+
+    def iter_messages(self, session_id: str) -> Iterator[Dict]:
+        """Messages of a session in order."""
+        with self._lock:
+            rows = self._conn.execute(_SELECT_ALL, (session_id,)).fetchall()
+        return (self._message(row) for row in rows)
+
+    def tail_messages(self, session_id: str, n: int) -> List[Dict]:
+        """The last n messages of a session."""
+        with self._lock:
+            rows = self._conn.execute(_SELECT_TAIL, (session_id, max(n, 0))).fetchall()
+        return [self._message(row) for row in rows]
+
+    def add_message_to_session(self, role: str, content: str) -> Optional[Dict]:
+        """Add a message to the current session."""
+        if not self.current_session:
+            return None
+        message = {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat(),
+            "tokens": get_token_counter().count(content)  # Cached so budgets never recount
+        }
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(_INSERT_MESSAGE, (self.current_session["session_id"], self.current_session["message_count"],
+                                                     role, content, message["timestamp"], message["tokens"]))
+        except sqlite3.Error as e:
+            print(f"❌ Error saving session: {e}")
+        self.current_session["messages"].append(message)
+        self.current_session["message_count"] += 1
+        return message
+
+    def get_last_n_messages(self, n: int = 5) -> List[Dict]:
+        """Get the last N messages from the current session."""
+        if not self.current_session:
+            return []
+        return self.current_session["messages"][-n:]
+
+    def get_messages_between(self, since: TimeBound = None, until: TimeBound = None,
+                             session_id: Optional[str] = None, limit: Optional[int] = 100) -> List[Dict]:
+        """Messages from any session in [since, until), oldest first; ``limit=None`` returns them all."""
+        try:
+            with self._lock:
+                rows = self._conn.execute(_SELECT_RANGE, (_time_bound(since, _MIN_TIME), _time_bound(until, _MAX_TIME),
+                                                          session_id, session_id,
+                                                          -1 if limit is None else limit)).fetchall()  # -1: no limit
+        except sqlite3.Error as e:
+            print(f"❌ Error reading messages: {e}")
+            return []
+        return [dict(self._message(row[1:]), session_id=row[0]) for row in rows]
+
+    def search_messages(self, query: str, limit: int = 10, session_id: Optional[str] = None,
+                        since: TimeBound = None, until: TimeBound = None) -> List[Dict]:
+        """Keyword search across sessions, best BM25 match first."""
+        terms = [t for t in "".join(c if c.isalnum() else " " for c in query).split() if t]
+        if not terms:
+            return []
+        bounds = (_time_bound(since, _MIN_TIME), _time_bound(until, _MAX_TIME), session_id, session_id, limit)
+        with self._lock:
+            if self.has_fts:
+                # Quote every term so user text can never be parsed as FTS5 syntax
+                match = " OR ".join(f'"{term}"' for term in terms)
+                rows = self._conn.execute(_SEARCH_FTS, (match,) + bounds).fetchall()
+            else:
+                rows = self._conn.execute(_SEARCH_LIKE, (f"%{query}%",) + bounds).fetchall()
+        return [dict(self._message(row[1:]), session_id=row[0]) for row in rows]
+
+    def import_json_sessions(self, sessions_dir: str = "memory/sessions") -> int:
+        """Copy sessions written by the JSON/JSONL SessionManager into the database."""
+        imported = 0
+        for name in sorted(os.listdir(sessions_dir)):
+            path = os.path.join(sessions_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    if name.endswith(".jsonl"):
+                        header = json.loads(f.readline())
+                        messages = [json.loads(line) for line in f if line.strip()]
+                    elif name.endswith(".json"):
+                        header = json.load(f)
+                        messages = header.get("messages", [])
+                    else:
+                        continue
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"⚠️ Skipping {name}: {e}")
+                continue
+            session_id = header.get("session_id") or os.path.splitext(name)[0]
+            with self._lock, self._conn:
+                if self._conn.execute(_SELECT_SESSION, (session_id,)).fetchone():
+                    continue
+                self._conn.execute(_INSERT_SESSION, (session_id, header.get("start_time") or ""))
+                self._conn.executemany(_INSERT_MESSAGE, [
+                    (session_id, seq, m.get("role", ""), m.get("content", ""), m.get("timestamp", ""), m.get("tokens"))
+                    for seq, m in enumerate(messages)
+                ])
+            imported += 1
+        return imported
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,43 +1,135 @@
-import requests
-from typing import List, Dict
-from .utils.token_counter import estimate_tokens
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional
+from .utils.token_counter import get_token_counter
+from core.ollama_client import get_client
+from config import LLM_CONTEXT_TOKENS, RESPONSE_RESERVE_TOKENS
 
 class Summarizer:
-    def __init__(self, max_tokens: int = 8000):
-        self.max_tokens = max_tokens
+    """Rolling per-session summary maintained by a background worker.
+
+    Each session has a persisted checkpoint: the summary text and how many messages it covers.
+    When the unsummarised tail grows close to the token budget, the worker folds only the new
+    messages into the previous summary, so reading the summary is a dictionary lookup.
+    The budget defaults to the prompt window the model actually gets, so older messages are
+    summarised before the packer has to drop them.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, checkpoint_file: str = "memory/summary.json",
+                 keep_recent: int = 5, trigger_ratio: float = 0.8):
+        self.max_tokens = max_tokens if max_tokens is not None else LLM_CONTEXT_TOKENS - RESPONSE_RESERVE_TOKENS
+        self.checkpoint_file = checkpoint_file
+        self.keep_recent = keep_recent
+        self.trigger_ratio = trigger_ratio
+        self._lock = threading.Lock()
+        self._pending = set()
+        self.checkpoints: Dict[str, Dict] = self._load_checkpoints()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(target=self._summarize_loop, name="summarizer", daemon=True)
+        self._worker.start()
+
+    def _load_checkpoints(self) -> Dict[str, Dict]:
+        try:
+            if os.path.exists(self.checkpoint_file) and os.path.getsize(self.checkpoint_file):
+                with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"⚠️ Error loading summary checkpoints: {e}")
+        return {}
+
+    def _save_checkpoints(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.checkpoint_file) or ".", exist_ok=True)
+            with open(self.checkpoint_file + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(self.checkpoints, f, indent=2)
+            os.replace(self.checkpoint_file + ".tmp", self.checkpoint_file)
+        except IOError as e:
+            print(f"❌ Error saving summary checkpoints: {e}")
 
     def check_token_limit(self, messages: List[Dict]) -> bool:
         """Check if total token count exceeds the limit."""
-        total_tokens = sum(estimate_tokens(msg["content"]) for msg in messages)
-        return total_tokens > self.max_tokens
+        return get_token_counter().count_messages(messages) > self.max_tokens
 
-    def summarize_old_messages(self, messages: List[Dict]) -> List[Dict]:
-        """Summarize older messages, keeping last 5 intact."""
-        if len(messages) <= 5:
-            return messages
-        recent_messages = messages[-5:]
-        older_messages = messages[:-5]
+    def get_summary(self, session_id: str) -> str:
+        """The latest ready-made summary for a session, or an empty string."""
+        checkpoint = self.checkpoints.get(session_id)
+        return checkpoint["summary"] if checkpoint else ""
 
+    def covered_count(self, session_id: str) -> int:
+        checkpoint = self.checkpoints.get(session_id)
+        return checkpoint["covered"] if checkpoint else 0
+
+    def maybe_schedule(self, session_id: str, messages: List[Dict], message_count: Optional[int] = None) -> bool:
+        """Queue a background update when the unsummarised messages approach the token budget.
+
+        ``messages`` may be only the tail of the session; ``message_count`` is the session's
+        total so positions can be mapped onto the checkpoint.
+        """
+        total = len(messages) if message_count is None else message_count
+        delta = self._delta(session_id, messages, total)
+        if not delta:
+            return False
+        start = max(0, self.covered_count(session_id) - (total - len(messages)))
+        unsummarized = get_token_counter().count_messages(messages[start:])
+        if unsummarized < self.trigger_ratio * self.max_tokens:
+            return False
+        with self._lock:
+            if session_id in self._pending:
+                return False
+            self._pending.add(session_id)
+        self._queue.put((session_id, delta, total - self.keep_recent))
+        return True
+
+    def _delta(self, session_id: str, messages: List[Dict], total: int) -> List[Dict]:
+        """Messages after the checkpoint, excluding the ones kept verbatim as recent history."""
+        offset = total - len(messages)
+        start = max(0, self.covered_count(session_id) - offset)
+        end = len(messages) - self.keep_recent
+        return messages[start:end] if end > start else []
+
+    def _summarize_loop(self) -> None:
+        while True:
+            session_id, delta, covered = self._queue.get()
+            try:
+                self._update_checkpoint(session_id, delta, covered)
+            finally:
+                with self._lock:
+                    self._pending.discard(session_id)
+                self._queue.task_done()
+
+    def _update_checkpoint(self, session_id: str, delta: List[Dict], covered: int) -> None:
+        """Fold the delta into the previous summary with phi3 and persist the new checkpoint."""
+        previous = self.get_summary(session_id)
         summary_prompt = (
-            "Summarize the following conversation history into a concise paragraph:\n" +
-            "\n".join([f"{msg['role']}: {msg['content']}" for msg in older_messages])
+            (f"Current summary of the conversation:\n{previous}\n\n" if previous else "") +
+            "Update the summary with the following new messages and return one concise paragraph:\n" +
+            "\n".join([f"{msg['role']}: {msg['content']}" for msg in delta])
         )
         try:
-            response = requests.post(
-                "http://localhost:11434/api/chat",
-                json={
-                    "model": "phi3:3.8b",
-                    "messages": [
-                        {"role": "system", "content": "You are a summarizer."},
-                        {"role": "user", "content": summary_prompt}
-                    ],
-                    "stream": False
-                },
+            summary = get_client().chat_content(
+                "phi3:3.8b",
+                [
+                    {"role": "system", "content": "You are a summarizer."},
+                    {"role": "user", "content": summary_prompt}
+                ],
                 timeout=30
             )
-            response.raise_for_status()
-            summary = response.json().get('message', {}).get('content', '')
-            return [{"role": "system", "content": f"Summary of previous messages: {summary}", "timestamp": messages[0]["timestamp"]}] + recent_messages
         except Exception as e:
             print(f"❌ Summary update failed: {e}")
-            return messages  # Fallback to original messages
\ No newline at end of file
+            return
+        if not summary:
+            return
+        with self._lock:
+            self.checkpoints[session_id] = {
+                "summary": summary,
+                "covered": covered,
+                "updated_at": datetime.now().isoformat()
+            }
+            self._save_checkpoints()
+
+    def flush(self) -> None:
+        """Block until queued summary updates have finished."""
+        self._queue.join()
@@ -0,0 +1,120 @@
+import faiss
+import math
+import numpy as np
+from typing import Optional, Tuple
+
+class TieredIndex:
+    """FAISS index that stays exact while small and is promoted to IVF or HNSW once it grows.
+
+    Ids are assigned sequentially in insertion order by every tier, so row ``i`` always maps
+    to ``VectorDB.texts[i]`` regardless of which index currently backs the store.
+    """
+
+    def __init__(self, dim: int = 384, promote_threshold: int = 20000, index_type: str = "ivf",
+                 nprobe: int = 16, ef_search: int = 64, hnsw_m: int = 32, exact_filter_limit: int = 4096,
+                 index: Optional[faiss.Index] = None):
+        if index_type not in ("ivf", "hnsw"):
+            raise ValueError(f"Unsupported index type: {index_type}")
+        self.dim = dim
+        self.promote_threshold = promote_threshold
+        self.index_type = index_type
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.hnsw_m = hnsw_m
+        self.exact_filter_limit = exact_filter_limit
+        self.index = index if index is not None else faiss.IndexFlatL2(dim)
+        self._prepare()
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    @property
+    def is_approximate(self) -> bool:
+        return not isinstance(self.index, faiss.IndexFlat)
+
+    def _prepare(self) -> None:
+        # IVF needs a direct map to reconstruct rows by id for filtered search
+        if isinstance(self.index, faiss.IndexIVF) and self.index.direct_map.type == faiss.DirectMap.NoMap:
+            self.index.make_direct_map()
+        self._apply_search_params()
+
+    def _apply_search_params(self) -> None:
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = self.nprobe
+        elif isinstance(self.index, faiss.IndexHNSW):
+            self.index.hnsw.efSearch = self.ef_search
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+        """Change the recall/latency trade-off of the approximate tier."""
+        if nprobe is not None:
+            self.nprobe = nprobe
+        if ef_search is not None:
+            self.ef_search = ef_search
+        self._apply_search_params()
+
+    def add(self, vectors: np.ndarray) -> None:
+        self.index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def search(self, queries: np.ndarray, k: int, ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """k nearest neighbours, optionally restricted to the given row ids."""
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if ids is None:
+            return self.index.search(queries, k)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) <= self.exact_filter_limit:
+            return self._search_exact(queries, k, ids)
+        # Large candidate sets: let FAISS skip non-candidates while it scans
+        selector = faiss.IDSelectorBatch(ids)
+        if isinstance(self.index, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+        elif isinstance(self.index, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+        else:
+            params = faiss.SearchParameters(sel=selector)
+        return self.index.search(queries, k, params=params)
+
+    def _search_exact(self, queries: np.ndarray, k: int, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute force over just the candidate rows; cost depends on the filter, not the corpus."""
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        labels = np.full((len(queries), k), -1, dtype=np.int64)
+        if len(ids) == 0:
+            return distances, labels
+        vectors = self.index.reconstruct_batch(ids)
+        all_distances = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2)
+        top = min(k, len(ids))
+        for row, row_distances in enumerate(all_distances):
+            best = np.argpartition(row_distances, top - 1)[:top]
+            best = best[np.argsort(row_distances[best])]
+            distances[row, :top] = row_distances[best]
+            labels[row, :top] = ids[best]
+        return distances, labels
+
+    def needs_promotion(self) -> bool:
+        """True when the exact index has outgrown the size threshold."""
+        return not self.is_approximate and self.ntotal >= self.promote_threshold
+
+    def build_promoted(self) -> Tuple[faiss.Index, int]:
+        """Train and fill an approximate index from the current vectors.
+
+        Only reads the exact index, so searches can keep running while this builds.
+        Returns the new index and how many rows it was built from.
+        """
+        count = self.ntotal
+        vectors = self.index.reconstruct_n(0, count)
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dim, self.hnsw_m)
+        else:
+            # ~4*sqrt(n) lists, capped so each list gets the ~39 training points k-means wants
+            nlist = max(1, min(int(4 * math.sqrt(count)), count // 39))
+            index = faiss.IndexIVFFlat(faiss.IndexFlatL2(self.dim), self.dim, nlist)
+            index.train(vectors)
+        index.add(vectors)
+        return index, count
+
+    def swap(self, index: faiss.Index, built_from: int) -> None:
+        """Install a promoted index, first copying over rows added after it was built."""
+        if self.ntotal > built_from:
+            index.add(self.index.reconstruct_n(built_from, self.ntotal - built_from))
+        self.index = index
+        self._prepare()
@@ -1,9 +1,96 @@
 import asyncio
+import threading
+from typing import List, Dict, Optional
+from utils.model_registry import registry
+
+DEFAULT_TOKENIZER = "unsloth/mistral-7b-instruct-v0.3"  # Ungated copy of the mistral:7b tokenizer
+
+class TokenCounter:
+    """Counts tokens with the chat model's own tokenizer.
+
+    The Hugging Face tokenizer is loaded on first use, from the local cache only when
+    ``local_files_only`` is set; if it cannot be loaded (not cached, transformers missing) counts
+    fall back to the old 4-characters-per-token estimate. Message counts are cached on the
+    message dict under ``"tokens"``.
+    """
+
+    def __init__(self, tokenizer_name: str = DEFAULT_TOKENIZER, local_files_only: bool = False):
+        self.tokenizer_name = tokenizer_name
+        self.local_files_only = local_files_only
+        self._tokenizer = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def tokenizer(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        from transformers import AutoTokenizer
+                        self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name,
+                                                                        local_files_only=self.local_files_only)
+                    except Exception as e:
+                        print(f"⚠️ Could not load tokenizer {self.tokenizer_name}: {e}, estimating tokens")
+                    self._loaded = True
+        return self._tokenizer
+
+    def count(self, text: str) -> int:
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """Token counts for many texts in one tokenizer call."""
+        if not texts:
+            return []
+        if self.tokenizer is None:
+            return [len(text) // 4 + 1 for text in texts]
+        encoded = self.tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def count_messages(self, messages: List[Dict]) -> int:
+        """Total tokens of messages, counting only those without a cached ``tokens`` value."""
+        missing = [msg for msg in messages if "tokens" not in msg]
+        for msg, tokens in zip(missing, self.count_batch([msg["content"] for msg in missing])):
+            msg["tokens"] = tokens
+        return sum(msg["tokens"] for msg in messages)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text that fits in max_tokens."""
+        if max_tokens <= 0:
+            return ""
+        if self.tokenizer is None:
+            return text[:max(0, (max_tokens - 1) * 4)]
+        ids = self.tokenizer(text, add_special_tokens=False)["input_ids"]
+        if len(ids) <= max_tokens:
+            return text
+        return self.tokenizer.decode(ids[:max_tokens])
+
+_default_counter: Optional[TokenCounter] = None
+
+def get_token_counter() -> TokenCounter:
+    """Process-wide counter shared by the memory modules and the prompt packer."""
+    global _default_counter
+    if _default_counter is None:
+        try:
+            from config import TOKENIZER_NAME, TRANSFORMERS_OFFLINE
+        except ImportError:
+            TOKENIZER_NAME, TRANSFORMERS_OFFLINE = DEFAULT_TOKENIZER, False
+        _default_counter = TokenCounter(TOKENIZER_NAME, local_files_only=TRANSFORMERS_OFFLINE)
+    return _default_counter
+
+def _load_tokenizer():
+    counter = get_token_counter()
+    if counter.tokenizer is None:
+        raise RuntimeError(f"{counter.tokenizer_name} is not available, estimating tokens")
+    return counter.tokenizer
+
+# Loaded by the startup warmup so the first turn does not pay for it
+registry.register("tokenizer", _load_tokenizer)
 
 def estimate_tokens(text: str) -> int:
-    """Roughly estimate the number of tokens (assuming 4 chars per token)."""
-    return len(text) // 4 + 1
+    """Number of tokens in text according to the shared counter."""
+    return get_token_counter().count(text)
 
 async def async_estimate_tokens(text: str) -> int:
     """Async version of token estimation."""
-    return estimate_tokens(text)
\ No newline at end of file
+    return estimate_tokens(text)
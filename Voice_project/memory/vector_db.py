@@ -1,50 +1,243 @@
-from sentence_transformers import SentenceTransformer
 import faiss
 import numpy as np
 import json
-import os
-from typing import List, Dict
+import queue
+import atexit
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple, Union
+from .segment_store import SegmentStore
+from .tiered_index import TieredIndex
+from .embedding_cache import EmbeddingCache
+from .hybrid_retriever import HybridRetriever, LexicalIndex
+from utils.model_registry import registry
+
+_STOP = object()  # Sentinel that tells the ingest worker to exit
+
+def _load_embedder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+registry.register("embedder", _load_embedder)
 
 class VectorDB:
-    def __init__(self, index_file: str = "memory/faiss_index/index.faiss", texts_file: str = "memory/faiss_index/texts.json"):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.index = faiss.IndexFlatL2(384)  # MiniLM embedding dimension
+    def __init__(self, index_dir: str = "memory/faiss_index", batch_size: int = 32, max_queue_size: int = 1000,
+                 segment_max_records: int = 1000, compact_after_segments: int = 8,
+                 index_type: str = "ivf", promote_threshold: int = 20000, nprobe: int = 16, ef_search: int = 64,
+                 cache_dir: str = "memory/embedding_cache"):
+        self.embedding_cache = EmbeddingCache(cache_dir, dim=384)
+        # Exact search until promote_threshold vectors, then IVF/HNSW; 384 is the MiniLM embedding dimension
+        self._index_options = dict(dim=384, promote_threshold=promote_threshold, index_type=index_type,
+                                   nprobe=nprobe, ef_search=ef_search)
+        self.index = TieredIndex(**self._index_options)
         self.texts: List[Dict] = []
-        self.index_file = index_file
-        self.texts_file = texts_file
+        self.lexical_index = LexicalIndex()  # BM25 + metadata postings over the same row ids
+        self.store = SegmentStore(index_dir, dim=384, segment_max_records=segment_max_records,
+                                  compact_after_segments=compact_after_segments)
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._closed = False
+        self._snapshot_pending = False  # Set by a promotion, which must be snapshotted even with no new segments
         self._load_index()
 
+        # Segments are merged into a fresh snapshot off the ingest path
+        self._compact_event = threading.Event()
+        self._compactor = threading.Thread(target=self._compact_loop, name="vector-db-compact", daemon=True)
+        self._compactor.start()
+
+        # Write-behind ingestion: add_message only enqueues, the worker embeds and persists in batches
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._worker = threading.Thread(target=self._ingest_loop, name="vector-db-ingest", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    @property
+    def model(self):
+        """The MiniLM embedder, loaded on first use (or by the startup warmup)."""
+        return registry.get("embedder")
+
     def _load_index(self) -> None:
-        """Load existing FAISS index and texts."""
-        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        """Load the latest snapshot and replay the segments written after it."""
         try:
-            if os.path.exists(self.index_file):
-                self.index = faiss.read_index(self.index_file)
-                with open(self.texts_file, 'r', encoding='utf-8') as f:
-                    self.texts = json.load(f)
-        except (IOError, json.JSONDecodeError) as e:
+            index, texts, replay_vectors, replay_texts = self.store.load()
+            if index is not None:
+                self.index = TieredIndex(index=index, **self._index_options)
+                self.texts = texts
+            if len(replay_texts):
+                self.index.add(replay_vectors)
+                self.texts.extend(replay_texts)
+        except (IOError, RuntimeError, json.JSONDecodeError) as e:
             print(f"⚠️ Error loading vector DB: {e}, starting fresh")
+            self.index = TieredIndex(**self._index_options)
+            self.texts = []
+        for record in self.texts:
+            self.lexical_index.add(record["text"], record.get("metadata", {}))
 
-    def _save_index(self) -> None:
-        """Save FAISS index and texts to disk."""
+    def _save_batch(self, embeddings: np.ndarray, records: List[Dict]) -> None:
+        """Append a batch to the segment log; the full index is only rewritten by compaction."""
         try:
-            faiss.write_index(self.index, self.index_file)
-            with open(self.texts_file, 'w', encoding='utf-8') as f:
-                json.dump(self.texts, f)
+            self.store.append(embeddings, records)
         except IOError as e:
             print(f"❌ Error saving vector DB: {e}")
+            return
+        if self.store.needs_compaction():
+            self._compact_event.set()
+
+    def _compact_loop(self) -> None:
+        while True:
+            self._compact_event.wait()
+            self._compact_event.clear()
+            if self._closed:
+                return
+            self.compact()
+
+    def compact(self) -> None:
+        """Merge all sealed segments into a new snapshot.
+
+        After a promotion the snapshot is rewritten even when there is no segment to seal, since
+        it still holds the exact index and the next startup would otherwise train again.
+        """
+        with self._lock:
+            covers_through = self.store.seal()
+            if covers_through is None:
+                if not self._snapshot_pending:
+                    return
+                covers_through = self.store.manifest.get("covers_through", 0)
+            self._snapshot_pending = False
+            # Serialising under the lock gives a consistent copy; the slow disk write happens outside it
+            index_bytes = faiss.serialize_index(self.index.index)
+            texts = list(self.texts)
+        try:
+            self.store.write_snapshot(faiss.deserialize_index(index_bytes), texts, covers_through)
+        except (IOError, RuntimeError) as e:
+            print(f"❌ Error compacting vector DB: {e}")
 
     def add_message(self, text: str, metadata: Dict) -> None:
-        """Add a message embedding to the vector DB."""
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        self.index.add(np.array([embedding]))
-        self.texts.append({"text": text, "metadata": metadata})
-        self._save_index()
+        """Queue a message for background embedding; blocks only when the queue is full."""
+        if self._closed:
+            print("⚠️ Vector DB is closed, dropping message")
+            return
+        self._queue.put((text, metadata))
+
+    def _maybe_promote(self) -> None:
+        """Migrate to the approximate tier once the exact index is big enough.
+
+        Runs on the ingest worker, the only writer, so nothing is added while the new index trains;
+        searches keep using the exact index until the swap.
+        """
+        if not self.index.needs_promotion():
+            return
+        print(f"🔧 Promoting vector index to {self.index.index_type} at {self.index.ntotal} vectors...")
+        try:
+            promoted, built_from = self.index.build_promoted()
+        except RuntimeError as e:
+            print(f"❌ Error promoting vector index: {e}")
+            return
+        with self._lock:
+            self.index.swap(promoted, built_from)
+            self._snapshot_pending = True
+        # Snapshot the trained index so the next startup does not retrain
+        self._compact_event.set()
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+        """Tune nprobe (IVF) or efSearch (HNSW) at runtime."""
+        with self._lock:
+            self.index.set_search_params(nprobe=nprobe, ef_search=ef_search)
+
+    def _ingest_loop(self) -> None:
+        """Drain the queue in batches until the stop sentinel arrives."""
+        self._maybe_promote()
+        while True:
+            item = self._queue.get()
+            batch: List[Tuple[str, Dict]] = []
+            stop = item is _STOP
+            if not stop:
+                batch.append(item)
+            # Pick up whatever else is already waiting, up to one batch
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+            try:
+                if batch:
+                    self._ingest_batch(batch)
+                    self._maybe_promote()
+            except Exception as e:
+                print(f"❌ Error ingesting {len(batch)} message(s) into vector DB: {e}")
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _ingest_batch(self, batch: List[Tuple[str, Dict]]) -> None:
+        """Embed a batch of messages in one forward pass, add them to the index and append them to disk."""
+        embeddings = self._encode([text for text, _ in batch])
+        records = [{"text": text, "metadata": metadata} for text, metadata in batch]
+        with self._lock:
+            self.index.add(embeddings)
+            self.texts.extend(records)
+            for record in records:
+                self.lexical_index.add(record["text"], record["metadata"])
+            self._save_batch(embeddings, records)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, skipping the model for anything already in the embedding cache."""
+        return self.embedding_cache.encode(
+            texts, lambda misses: self.model.encode(misses, batch_size=self.batch_size, convert_to_numpy=True))
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embeddings for arbitrary texts, sharing the model and the embedding cache."""
+        return self._encode(texts)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued message has been indexed. Returns False on timeout."""
+        if timeout is None:
+            self._queue.join()
+            return True
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Flush pending messages and stop the background workers (registered with atexit)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join()
+        self._compact_event.set()
+        self._compactor.join()
+        if self._snapshot_pending:
+            self.compact()
+        self.store.close()
+        self.embedding_cache.close()
 
     def search_similar(self, query: str, k: int = 2) -> List[Dict]:
         """Search for similar messages based on query."""
         if not self.texts:
             return []
-        query_embedding = self.model.encode(query, convert_to_numpy=True)
-        distances, indices = self.index.search(np.array([query_embedding]), k)
-        return [self.texts[i] for i in indices[0] if i < len(self.texts)]
\ No newline at end of file
+        query_embedding = self._encode([query])
+        with self._lock:
+            distances, indices = self.index.search(query_embedding, k)
+            return [self.texts[i] for i in indices[0] if 0 <= i < len(self.texts)]
+
+
+    def search_hybrid(self, query: str, k: int = 2, session_id: Optional[str] = None,
+                      since: Optional[Union[str, datetime]] = None, until: Optional[Union[str, datetime]] = None,
+                      role: Optional[str] = None) -> List[Dict]:
+        """Fuse dense and BM25 results, considering only messages that pass the metadata filters."""
+        if not self.texts:
+            return []
+        since = since.isoformat() if isinstance(since, datetime) else since
+        until = until.isoformat() if isinstance(until, datetime) else until
+        query_embedding = self._encode([query])
+        with self._lock:
+            ids = HybridRetriever(self.index, self.lexical_index).search(
+                query, query_embedding[0], k=k, session_id=session_id, since=since, until=until, role=role)
+            return [self.texts[i] for i in ids]
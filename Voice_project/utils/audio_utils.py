@@ -1,14 +1,40 @@
-import torch
+import os
+import time
 import numpy as np
 import sounddevice as sd
-import tempfile
 import scipy.io.wavfile
 import queue
+from utils.model_registry import registry
+from utils.vad import StreamingEndpointer, silero_speech_prob
+from config import SAVE_RECORDINGS, RECORDINGS_DIR
 
-model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False)
-(get_speech_timestamps, _, _, _, _) = utils
+def _load_vad():
+    import torch
+    model, _ = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False)
+    return model
 
-def record_until_silence(threshold=2.0, fs=16000, min_recording_time=1.0, max_silence_time=2.0):
+registry.register("vad", _load_vad)
+
+def save_recording(audio, fs, directory=RECORDINGS_DIR):
+    """Archive a recording as 16-bit WAV for debugging; returns the path or None."""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, time.strftime("%Y%m%d-%H%M%S") + ".wav")
+        scipy.io.wavfile.write(path, fs, (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16))
+        print(f"💾 Recording saved: {path}")
+        return path
+    except Exception as save_error:
+        print(f"❌ Error saving audio file: {save_error}")
+        return None
+
+def record_until_silence(threshold=2.0, fs=16000, min_recording_time=1.0, max_silence_time=2.0, max_duration=30.0,
+                         on_segment=None):
+    """
+    Record from the microphone until the speaker stops. Returns (audio, fs) with audio as a
+    float32 array, handed to the ASR as is; nothing is written to disk unless SAVE_RECORDINGS.
+    ``on_segment`` receives each pause-delimited stretch of speech while recording goes on.
+    """
+    model = registry.get("vad")
     print("🎙️ Speak now... (auto stops after silence)")
     
     q = queue.Queue()
@@ -20,11 +46,11 @@ def record_until_silence(threshold=2.0, fs=16000, min_recording_time=1.0, max_si
         audio_data = indata.copy().flatten()
         q.put(audio_data)
 
-    audio_chunks = []
-    silence_time = 0.0
-    total_time = 0.0
     chunk_duration = 0.1
-    speech_detected = False
+    # Each chunk is scored once as it arrives instead of re-running the VAD over the whole recording
+    endpointer = StreamingEndpointer(silero_speech_prob(model, fs), fs=fs, max_duration=max_duration,
+                                     min_recording_time=min_recording_time, max_silence_time=max_silence_time,
+                                     on_segment=on_segment)
 
     try:
         device_info = sd.query_devices(kind='input')
@@ -46,8 +72,6 @@ def record_until_silence(threshold=2.0, fs=16000, min_recording_time=1.0, max_si
             while True:
                 try:
                     chunk = q.get(timeout=1.0)
-                    audio_chunks.append(chunk)
-                    total_time += chunk_duration
                     
                     audio_level = np.abs(chunk).mean()
                     if audio_level > 0.001:
@@ -55,50 +79,19 @@ def record_until_silence(threshold=2.0, fs=16000, min_recording_time=1.0, max_si
                             print("🎤 Audio input detected")
                             recording_started = True
                     
-                    if total_time >= min_recording_time and len(audio_chunks) > 10:
-                        audio_np = np.concatenate(audio_chunks, axis=0)
-                        
-                        if audio_np.dtype != np.float32:
-                            audio_np = audio_np.astype(np.float32)
-                        
-                        if np.abs(audio_np).max() > 1.0:
-                            audio_np = audio_np / np.abs(audio_np).max()
-                        
-                        try:
-                            timestamps = get_speech_timestamps(
-                                audio_np, 
-                                model, 
-                                sampling_rate=fs,
-                                min_speech_duration_ms=100,
-                                min_silence_duration_ms=500
-                            )
-                            
-                            if timestamps:
-                                speech_detected = True
-                                last_speech_end = timestamps[-1]['end']
-                                current_sample = len(audio_np)
-                                silence_samples = current_sample - last_speech_end
-                                current_silence_time = silence_samples / fs
-                                
-                                if current_silence_time > max_silence_time:
-                                    print(f"🛑 Silence detected ({current_silence_time:.1f}s), stopping.")
-                                    break
-                                else:
-                                    silence_time = 0.0
-                            elif speech_detected:
-                                silence_time += chunk_duration
-                                if silence_time > max_silence_time:
-                                    print("🛑 Silence after speech detected, stopping.")
-                                    break
-                                    
-                        except Exception as vad_error:
-                            print(f"VAD error: {vad_error}")
-                            if total_time > 10.0:
-                                print("🛑 Maximum recording time reached.")
-                                break
+                    try:
+                        stop_reason = endpointer.feed(chunk)
+                    except Exception as vad_error:
+                        print(f"VAD error: {vad_error}")
+                        endpointer.speech_prob = lambda window: 0.0  # Keep recording, bounded below
+                        stop_reason = None
+                        max_duration = min(max_duration, 10.0)
                     
-                    if total_time > 30.0:
-                        print("🛑 Maximum recording time reached (30s).")
+                    if stop_reason == "silence":
+                        print(f"🛑 Silence detected ({endpointer.silence_time():.1f}s), stopping.")
+                        break
+                    if stop_reason == "max_duration" or endpointer.length >= max_duration * fs:
+                        print(f"🛑 Maximum recording time reached ({endpointer.length / fs:.0f}s).")
                         break
                         
                 except queue.Empty:
@@ -108,13 +101,14 @@ def record_until_silence(threshold=2.0, fs=16000, min_recording_time=1.0, max_si
     except Exception as stream_error:
         print(f"❌ Audio stream error: {stream_error}")
         return None
+    endpointer.close()
 
-    if not audio_chunks:
+    if endpointer.length == 0:
         print("❌ No audio recorded")
         return None
 
-    final_audio = np.concatenate(audio_chunks, axis=0)
-    
+    final_audio = endpointer.audio()
+
     if len(final_audio) < fs * 0.5:
         print("⚠️ Recording too short")
         return None
@@ -125,18 +119,7 @@ def record_until_silence(threshold=2.0, fs=16000, min_recording_time=1.0, max_si
         print(f"Audio level: {audio_level}")
         return None
     
-    if final_audio.dtype == np.float32:
-        final_audio = np.clip(final_audio, -1.0, 1.0)
-        final_audio_int16 = (final_audio * 32767).astype(np.int16)
-    else:
-        final_audio_int16 = final_audio.astype(np.int16)
-    
-    temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-    try:
-        scipy.io.wavfile.write(temp_file.name, fs, final_audio_int16)
-        print(f"✅ Audio saved: {temp_file.name}")
-        print(f"📊 Audio stats: {len(final_audio_int16)/fs:.1f}s, level: {audio_level:.4f}")
-        return temp_file.name
-    except Exception as save_error:
-        print(f"❌ Error saving audio file: {save_error}")
-        return None
\ No newline at end of file
+    print(f"📊 Audio stats: {len(final_audio)/fs:.1f}s, level: {audio_level:.4f}")
+    if SAVE_RECORDINGS:
+        save_recording(final_audio, fs)
+    return final_audio, fs
@@ -2,7 +2,163 @@
 import json
 import re
 
-def extract_json_from_text(text):
+_SCAN_RE = re.compile(r'[{}"\\]')
+_BARE_WORD_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_\-]*')
+_STRING_RUN_RE = re.compile(r'[^"\'\\\n]+')
+_SPACE_RE = re.compile(r'\s+')
+_KEY_COLON_RE = re.compile(r'\s*:')
+# A JSON object (or a repairable one) opens with a key or closes at once; "{x}" in prose does not
+_OBJECT_START_RE = re.compile(r'\{\s*(?:["\'}]|[A-Za-z_][\w\-]*\s*:)')
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+
+def scan_json_objects(text):
+    """
+    Find every brace-balanced {...} span in one pass over the text.
+    Strings inside objects are respected, so braces in values do not confuse the count.
+    Returns (top_level, nested, unclosed) as (start, end) offsets: closed outermost objects,
+    closed inner objects, and the outermost object still open at the end of the text
+    (truncated output) or None.
+    """
+    top_level, nested = [], []
+    stack = []
+    in_string = False
+    skip_to = -1
+    for match in _SCAN_RE.finditer(text):
+        i = match.start()
+        if i < skip_to:
+            continue
+        char = match.group()
+        if in_string:
+            if char == '\\':
+                skip_to = i + 2
+            elif char == '"':
+                in_string = False
+        elif char == '{':
+            stack.append(i)
+        elif char == '}':
+            if stack:
+                start = stack.pop()
+                (nested if stack else top_level).append((start, i + 1))
+        elif char == '"' and stack:
+            in_string = True
+    return top_level, nested, (stack[0], len(text)) if stack else None
+
+def iter_json_candidates(text, repair=True):
+    """
+    Yield (candidate, needs_repair) in order of preference: outermost objects as written,
+    then repaired (including a truncated tail), then inner objects. Spans that cannot open
+    a JSON object ("{x}" in prose) are skipped without being sliced out.
+    """
+    top_level, nested, unclosed = scan_json_objects(text)
+    order = [(top_level, False)]
+    if repair:
+        order.append((top_level + ([unclosed] if unclosed else []), True))
+    order.append((nested, False))
+    if repair:
+        order.append((nested, True))
+    for spans, needs_repair in order:
+        for start, end in spans:
+            if _OBJECT_START_RE.match(text, start):
+                yield text[start:end], needs_repair
+
+def repair_json(candidate):
+    """
+    Fix common LLM JSON mistakes in one pass: single-quoted strings, unquoted keys,
+    Python literals (True/None), trailing commas, // comments, raw newlines in strings,
+    and output cut off mid-object (open strings and brackets are closed).
+    """
+    out = []
+    closers = []
+    quote = None
+    pending_comma = False
+    i, n = 0, len(candidate)
+    while i < n:
+        char = candidate[i]
+        if quote:
+            run = _STRING_RUN_RE.match(candidate, i)
+            if run:
+                out.append(run.group())
+                i = run.end()
+                continue
+            if char == '\\' and i + 1 < n:
+                out.append(candidate[i:i + 2])
+                i += 2
+                continue
+            if char == quote:
+                out.append('"')
+                quote = None
+            elif char == '"':
+                out.append('\\"')  # Double quote inside a single-quoted string
+            elif char == '\n':
+                out.append('\\n')
+            else:
+                out.append(char)
+            i += 1
+            continue
+        if char.isspace():
+            i = _SPACE_RE.match(candidate, i).end()
+            continue
+        if char == '/' and candidate.startswith('//', i):
+            newline = candidate.find('\n', i)
+            i = n if newline == -1 else newline
+            continue
+        if char == ',':
+            pending_comma = True
+            i += 1
+            continue
+        if pending_comma:
+            if char not in '}]':
+                out.append(',')
+            pending_comma = False
+        if char in '"\'':
+            out.append('"')
+            quote = char
+        elif char in '{[':
+            out.append(char)
+            closers.append('}' if char == '{' else ']')
+        elif char in '}]':
+            if closers:
+                closers.pop()
+                out.append(char)
+        elif char.isalpha() or char == '_':
+            word = _BARE_WORD_RE.match(candidate, i).group()
+            if _KEY_COLON_RE.match(candidate, i + len(word)):
+                out.append(f'"{word}"')  # Unquoted key
+            else:
+                out.append(_LITERALS.get(word, f'"{word}"'))
+            i += len(word)
+            continue
+        else:
+            out.append(char)
+        i += 1
+    if quote:
+        out.append('"')
+    if out and out[-1] == ':':
+        out.append('null')  # Cut off between a key and its value
+    out.extend(reversed(closers))
+    return ''.join(out)
+
+def find_json_object(text, repair=True):
+    """
+    The JSON object in model output, or None: the whole text, else brace-balanced candidates
+    from a single scan, repaired if needed. Linear in the length of the text.
+    """
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, dict):
+            return parsed
+    except (ValueError, RecursionError):  # JSONDecodeError is a ValueError; deep nesting recurses
+        pass
+    for candidate, needs_repair in iter_json_candidates(text, repair):
+        try:
+            parsed = json.loads(repair_json(candidate) if needs_repair else candidate)
+            if isinstance(parsed, dict):
+                return parsed
+        except (ValueError, RecursionError):
+            continue
+    return None
+
+def extract_json_from_text(text, repair=True):
     """
     Extract JSON from text with multiple fallback strategies
     """
@@ -11,28 +167,10 @@ def extract_json_from_text(text):
     
     text = text.strip()
     
-    # Strategy 1: Direct JSON parsing
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-    
-    # Strategy 2: Find JSON blocks in text
-    json_patterns = [
-        r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}',  # Nested braces
-        r'\{.*?\}',  # Simple braces
-    ]
-    
-    for pattern in json_patterns:
-        matches = re.findall(pattern, text, re.DOTALL)
-        for match in matches:
-            try:
-                match = match.strip()
-                parsed = json.loads(match)
-                if isinstance(parsed, dict):
-                    return parsed
-            except json.JSONDecodeError:
-                continue
+    # Strategies 1 and 2: the whole text as JSON, then brace-balanced candidates
+    parsed = find_json_object(text, repair)
+    if parsed is not None:
+        return parsed
     
     # Strategy 3: Extract key-value pairs manually
     try:
@@ -0,0 +1,90 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+class ModelRegistry:
+    """Loads heavy models on first use, or ahead of time from a background warmup thread.
+
+    Modules register a loader under a name at import time (cheap); the model itself is only
+    built when ``get(name)`` is first called. Concurrent callers of the same name wait for a
+    single load. Import and load durations are recorded for the startup report.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self.import_timings: Dict[str, float] = {}
+        self.load_timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        """Return the model, loading it on the calling thread if nobody has yet."""
+        if name in self._models:
+            return self._models[name]
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+        with self._locks[name]:
+            if name not in self._models:
+                start = time.perf_counter()
+                try:
+                    self._models[name] = self._loaders[name]()
+                except Exception as e:
+                    self.errors[name] = str(e)
+                    raise
+                finally:
+                    self.load_timings[name] = time.perf_counter() - start
+        return self._models[name]
+
+    def warmup(self, names: Optional[List[str]] = None, on_done: Optional[Callable[[], None]] = None) -> threading.Thread:
+        """Load models one after another on a daemon thread; failures are reported, not raised."""
+        names = list(self._loaders) if names is None else names
+
+        def run():
+            for name in names:
+                try:
+                    self.get(name)
+                    print(f"✅ Warmed up {name} in {self.load_timings[name]:.2f}s")
+                except Exception as e:
+                    print(f"⚠️ Warmup of {name} failed: {e}")
+            if on_done:
+                on_done()
+
+        thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def timed_import(self, label: str):
+        """Record how long the imports inside the block take."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.import_timings[label] = time.perf_counter() - start
+
+    def report(self) -> str:
+        lines = ["📊 Startup report", "  Imports and startup:"]
+        lines += [f"    {label:<28} {seconds * 1000:8.1f} ms" for label, seconds in self.import_timings.items()]
+        lines.append("  Model loads:")
+        for name in self._loaders:
+            if name in self.errors:
+                status = f"failed: {self.errors[name]}"
+            elif name in self.load_timings:
+                status = f"{self.load_timings[name] * 1000:8.1f} ms"
+            else:
+                status = "not loaded"
+            lines.append(f"    {name:<28} {status}")
+        return "\n".join(lines)
+
+registry = ModelRegistry()
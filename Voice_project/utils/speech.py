@@ -1,9 +1,69 @@
-import pyttsx3
+import queue
+import threading
+from utils.model_registry import registry
 
-def speak(text):
+class SpeechWorker:
+    """Owns the pyttsx3 engine on one dedicated thread.
+
+    The engine is created once instead of per utterance; keeping it on a single thread also
+    keeps SAPI/COM happy on Windows, since every call is made from the thread that created it.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._ready = threading.Event()
+        self._error = None
+        threading.Thread(target=self._run, name="tts", daemon=True).start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+
+    def _run(self):
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.setProperty('rate', 170)
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        while True:
+            text, done, on_start = self._queue.get()
+            try:
+                if on_start:
+                    on_start()
+                engine.say(text)
+                engine.runAndWait()
+            except Exception as e:
+                print(f"❌ Speech error: {e}")
+            finally:
+                done.set()
+
+    def say(self, text, wait=True, on_start=None):
+        """Queue an utterance; ``on_start`` runs on the speech thread just before it is spoken."""
+        done = threading.Event()
+        self._queue.put((text, done, on_start))
+        if wait:
+            done.wait()
+        return done
+
+    def clear(self):
+        """Drop utterances not yet started, e.g. the rest of a reply that was superseded."""
+        while True:
+            try:
+                _, done, _ = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            done.set()
+
+registry.register("tts", SpeechWorker)
+
+def speak(text, wait=True, on_start=None):
     print("🔊 Speaking:", text)
-    engine = pyttsx3.init()
-    engine.setProperty('rate', 170)
-    engine.say(text)
-    engine.runAndWait()
-    engine.stop()
+    return registry.get("tts").say(text, wait=wait, on_start=on_start)
+
+def stop_speaking():
+    """Skip whatever is still queued; the sentence being spoken finishes."""
+    if registry.is_loaded("tts"):
+        registry.get("tts").clear()
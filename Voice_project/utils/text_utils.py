@@ -1,6 +1,4 @@
-def estimate_tokens(text):
-    """Roughly estimate the number of tokens (assuming 4 chars per token)"""
-    return len(text) // 4 + 1
+from memory.utils.token_counter import estimate_tokens  # Tokenizer-backed, shared with the memory modules
 
 def clean_text(text):
     """Clean text to remove problematic Unicode characters"""
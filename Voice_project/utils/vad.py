@@ -0,0 +1,108 @@
+import numpy as np
+from typing import Callable, Optional
+
+VAD_WINDOW = 512  # Samples per silero VAD call at 16 kHz
+
+def silero_speech_prob(model, fs: int = 16000) -> Callable[[np.ndarray], float]:
+    """Per-window speech probability from the silero model; resets its recurrent state first."""
+    import torch
+    model.reset_states()
+    return lambda window: model(torch.from_numpy(window), fs).item()
+
+class StreamingEndpointer:
+    """Tracks speech and trailing silence as audio arrives, looking at each sample once.
+
+    Chunks are copied into a buffer preallocated for ``max_duration``, and only the complete
+    VAD windows that have not been seen yet are scored, so the cost of ``feed`` does not grow
+    with the length of the utterance. Speech starts when a window scores ``threshold`` or more
+    and ends after ``min_silence_ms`` below ``threshold - 0.15``, the same hysteresis as
+    silero's VADIterator. ``feed`` returns why recording should stop, or None.
+
+    With ``on_segment``, each stretch of speech of at least ``min_segment_s`` is passed on (as a
+    view into the buffer, padded by ``segment_pad_ms`` and overlapping the previous one by at
+    most ``overlap_ms``) as soon as the pause after it is confirmed; ``close`` flushes the rest.
+    Shorter stretches are held back and merged with the next one, since Whisper does poorly on
+    fragments. The buffer is never overwritten, so the views stay valid.
+    """
+
+    def __init__(self, speech_prob: Callable[[np.ndarray], float], fs: int = 16000, max_duration: float = 30.0,
+                 min_recording_time: float = 1.0, max_silence_time: float = 2.0, threshold: float = 0.5,
+                 min_silence_ms: int = 500, window: int = VAD_WINDOW,
+                 on_segment: Optional[Callable[[np.ndarray], None]] = None, min_segment_s: float = 1.0,
+                 segment_pad_ms: int = 200, overlap_ms: int = 300):
+        self.speech_prob = speech_prob
+        self.fs = fs
+        self.min_recording_time = min_recording_time
+        self.max_silence_time = max_silence_time
+        self.threshold = threshold
+        self.min_silence_samples = int(fs * min_silence_ms / 1000)
+        self.window = window
+        self._buffer = np.zeros(int(fs * max_duration), dtype=np.float32)
+        self.length = 0
+        self._scored = 0  # Samples already passed through the VAD
+        self.speech_detected = False
+        self.in_speech = False
+        self._silence_start: Optional[int] = None
+        self._speech_end = 0
+        self.on_segment = on_segment
+        self.min_segment_samples = int(fs * min_segment_s)
+        self.segment_pad = int(fs * segment_pad_ms / 1000)
+        self.overlap = int(fs * overlap_ms / 1000)
+        self._segment_start: Optional[int] = None  # First speech not yet passed to on_segment
+        self._emitted_until = 0
+
+    def feed(self, chunk: np.ndarray) -> Optional[str]:
+        take = min(len(chunk), len(self._buffer) - self.length)
+        self._buffer[self.length:self.length + take] = chunk[:take]
+        self.length += take
+
+        while self._scored + self.window <= self.length:
+            start = self._scored
+            window = np.clip(self._buffer[start:start + self.window], -1.0, 1.0)
+            self._update(start, self.speech_prob(window))
+            self._scored += self.window
+
+        if self.length >= len(self._buffer):
+            return "max_duration"
+        if (self.speech_detected and not self.in_speech and self.length >= self.min_recording_time * self.fs
+                and self.silence_time() > self.max_silence_time):
+            return "silence"
+        return None
+
+    def _update(self, start: int, prob: float) -> None:
+        if prob >= self.threshold:
+            if self._segment_start is None:
+                self._segment_start = start
+            self.speech_detected = self.in_speech = True
+            self._silence_start = None
+        elif self.in_speech and prob < self.threshold - 0.15:
+            if self._silence_start is None:
+                self._silence_start = start
+            if start + self.window - self._silence_start >= self.min_silence_samples:
+                self.in_speech = False
+                self._speech_end = self._silence_start
+                if self._speech_end - self._segment_start >= self.min_segment_samples:
+                    self._emit(self._speech_end + self.segment_pad)
+
+    def _emit(self, end: int) -> None:
+        end = min(end, self.length)
+        start = max(0, self._segment_start - self.segment_pad, self._emitted_until - self.overlap)
+        self._segment_start = None
+        self._emitted_until = end
+        if self.on_segment and end > start:
+            self.on_segment(self._buffer[start:end])
+
+    def close(self) -> None:
+        """Pass on speech not yet emitted, e.g. when recording stopped at the maximum duration."""
+        if self._segment_start is not None:
+            self._emit(self.length if self.in_speech else self._speech_end + self.segment_pad)
+
+    def silence_time(self) -> float:
+        """Seconds since speech last ended; 0 while speech continues or before any."""
+        if not self.speech_detected or self.in_speech:
+            return 0.0
+        return (self.length - self._speech_end) / self.fs
+
+    def audio(self) -> np.ndarray:
+        """Everything recorded so far (a view into the buffer)."""
+        return self._buffer[:self.length]